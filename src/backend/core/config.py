@@ -9,6 +9,27 @@ class Settings(BaseSettings):
     postgres_port: int = 5432
     postgres_user: str = ""
     postgres_password: str = ""
+    postgres_replica_host: str = ""
+    postgres_replica_port: int = 5432
+
+    db_isolation_level: str = "SERIALIZABLE"
+    db_serialization_retries: int = 3
+    db_query_cache_size: int = 1200
+    db_prepared_statement_cache_size: int = 500
+
+    counter_shards: int = 8
+    counter_reconcile_interval: int = 60 * 60
+
+    # memory - сеточный индекс в процессе, postgres - GiST по box
+    spatial_backend: str = "memory"
+    spatial_cache_size: int = 256
+    spatial_cache_ttl: int = 300
+
+    slotting_history_days: int = 30
+    slotting_max_items: int = 500
+
+    scan_locations_cache_size: int = 100000
+    scan_warm_timeout: int = 30
 
     minio_endpoint: str = ""
     minio_access_key: str = ""
@@ -27,9 +48,31 @@ class Settings(BaseSettings):
     celery_broker_url: str = "redis://redis:6379/0"
     celery_result_backend: str = "redis://redis:6379/0"
 
+    report_buffer_size: int = 10000
+    report_flush_batch: int = 500
+    report_flush_interval_ms: int = 200
+    report_put_timeout_ms: int = 50
+    report_drain_interval: int = 30
+    report_export_chunk: int = 50000
+    report_partitions_ahead: int = 3
+    report_retention_months: int = 24
+
     jwt_secret_key: str = ""
     jwt_algorithm: str = "HS256"
     jwt_expires: int = 60 * 10
+    jwt_cache_size: int = 10000
+    jwt_revoked_capacity: int = 100000
+    jwt_revoked_sync_interval: int = 5
+
+    otp_ttl: int = 600
+    otp_max_attempts: int = 5
+    otp_request_limit: int = 3
+    otp_request_window: int = 600
+    otp_verify_limit: int = 10
+    otp_verify_window: int = 600
+    otp_ip_limit: int = 30
+    otp_ip_window: int = 60
+    otp_unknown_number_ttl: int = 60
 
     fcm_service_account_path: str = ""
     fcm_project_id: str = ""
@@ -42,6 +85,17 @@ class Settings(BaseSettings):
             f"{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def replica_db_url(self):
+        if not self.postgres_replica_host:
+            return None
+
+        return (
+            f"postgresql+asyncpg://{self.postgres_user}:"
+            f"{self.postgres_password}@{self.postgres_replica_host}:"
+            f"{self.postgres_replica_port}/{self.postgres_db}"
+        )
+
     @property
     def redis_url(self):
         return f"redis://{self.redis_host}:{self.redis_port}"
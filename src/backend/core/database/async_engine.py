@@ -1,42 +1,204 @@
+from contextlib import asynccontextmanager
 from contextvars import ContextVar
-from typing import Annotated
+from typing import (Annotated, Any, AsyncGenerator, Dict, Optional,
+                    Tuple)
 
 from fastapi.params import Depends
 from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     create_async_engine)
+from sqlalchemy.pool import NullPool
 
 from src.backend.core.config import settings
+from src.backend.core.database.pool_metrics import (instrument_pool,
+                                                    pool_snapshot,
+                                                    PoolMetrics)
+from src.backend.core.database.transactions import (CTX_TX_PROFILE,
+                                                    is_serialization_failure,
+                                                    TransactionProfile)
 from src.backend.core.exc import HTTPError
+from src.backend.core.exc.exceptions.exceptions import ConflictError
 
-__all__ = ("SessionDep", "get_session", "check_db_active", "get_engine")
+__all__ = (
+    "SessionDep",
+    "get_session",
+    "check_db_active",
+    "get_engine",
+    "get_replica_engine",
+    "uses_replica",
+    "bind_for_profile",
+    "create_task_engine",
+    "session_scope",
+    "get_pool_stats",
+)
+
+# query_cache_size - кеш скомпилированного SQL в SQLAlchemy,
+# prepared_statement_cache_size - кеш prepared statements asyncpg
+# на каждом соединении
+ENGINE_CACHE_OPTIONS = {
+    "query_cache_size": settings.db_query_cache_size,
+    "connect_args": {
+        "prepared_statement_cache_size": (
+            settings.db_prepared_statement_cache_size
+        ),
+    },
+}
 
 engine: AsyncEngine = create_async_engine(
-    settings.database_url,
+    settings.db_url,
     max_overflow=10,
     pool_recycle=3600,
     pool_size=20,
-    isolation_level="SERIALIZABLE",
+    isolation_level=settings.db_isolation_level,
+    **ENGINE_CACHE_OPTIONS,
+)
+
+replica_engine: Optional[AsyncEngine] = (
+    create_async_engine(
+        settings.replica_db_url,
+        max_overflow=10,
+        pool_recycle=3600,
+        pool_size=20,
+        **ENGINE_CACHE_OPTIONS,
+    )
+    if settings.replica_db_url
+    else None
 )
 
+pool_metrics: Dict[str, PoolMetrics] = {"primary": instrument_pool(engine)}
+if replica_engine:
+    pool_metrics["replica"] = instrument_pool(replica_engine)
+
+_profile_binds: Dict[Tuple[int, str], AsyncEngine] = {}
+
 
 def get_engine() -> AsyncEngine:
     return engine
 
 
-async def get_session(eng: AsyncEngine = Depends(get_engine)):
-    session = AsyncSession(eng, autoflush=False, expire_on_commit=False)
+def get_replica_engine() -> Optional[AsyncEngine]:
+    return replica_engine
+
+
+def uses_replica(session: AsyncSession) -> bool:
+    return bool(replica_engine) and session.bind is not None and (
+        session.bind.sync_engine.pool is replica_engine.pool
+    )
+
+
+# Чтения уходят на реплику (если она настроена), уровень изоляции
+# и read-only выставляются опциями соединения поверх общего пула
+def bind_for_profile(
+    profile: TransactionProfile,
+    eng: Optional[AsyncEngine] = None,
+) -> AsyncEngine:
+    base = eng or engine
+    if profile.read_only and base is engine and replica_engine:
+        base = replica_engine
+
+    options = {
+        "isolation_level": profile.isolation_level,
+        "postgresql_readonly": profile.read_only,
+    }
+    # движки задач создаются на каждый запуск, их не кэшируем
+    if base is not engine and base is not replica_engine:
+        return base.execution_options(**options)
+
+    key = (id(base), profile.name)
+    bind = _profile_binds.get(key)
+    if bind is None:
+        bind = base.execution_options(**options)
+        _profile_binds[key] = bind
+
+    return bind
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    stats = {"primary": pool_snapshot(engine, pool_metrics["primary"])}
+    if replica_engine:
+        stats["replica"] = pool_snapshot(
+            replica_engine, pool_metrics["replica"],
+        )
+
+    return stats
+
+
+# Соединение из пула берётся только при первом запросе к БД;
+# если сессия так и не начала транзакцию, commit не нужен
+def _has_pending_work(session: AsyncSession) -> bool:
+    return session.in_transaction() or bool(
+        session.new or session.dirty or session.deleted
+    )
+
+
+# Для celery-задач: каждая задача крутит свой event loop,
+# поэтому соединения из общего пула переиспользовать нельзя
+def create_task_engine() -> AsyncEngine:
+    return create_async_engine(
+        engine.url,
+        poolclass=NullPool,
+        isolation_level=settings.db_isolation_level,
+        **ENGINE_CACHE_OPTIONS,
+    )
+
+
+@asynccontextmanager
+async def session_scope(
+    eng: Optional[AsyncEngine] = None,
+    profile: Optional[TransactionProfile] = None,
+) -> AsyncGenerator[AsyncSession, None]:
+    session = AsyncSession(
+        bind_for_profile(profile, eng) if profile else eng or engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
     async with session:
         try:
             yield session
             await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def get_session(eng: AsyncEngine = Depends(get_engine)):
+    bind = bind_for_profile(CTX_TX_PROFILE.get(), eng)
+    metrics = pool_metrics["primary"]
+    if replica_engine and bind.sync_engine.pool is replica_engine.pool:
+        metrics = pool_metrics["replica"]
+
+    session = AsyncSession(bind, autoflush=False, expire_on_commit=False)
+    used_db = False
+    async with session:
+        try:
+            yield session
+            used_db = _has_pending_work(session)
+            if used_db:
+                await session.commit()
+        except DBAPIError as Error:
+            used_db = True
+            # Транзакцию запроса не переиграть: ответ уже сформирован,
+            # поэтому просим клиента повторить запрос
+            if is_serialization_failure(Error):
+                raise ConflictError(
+                    "Transaction conflict, retry the request",
+                    retry_after=1,
+                ) from Error
+
+            raise
         except HTTPError as Error:
-            if Error.commit_db:
+            used_db = _has_pending_work(session)
+            if Error.commit_db and used_db:
                 await session.commit()
 
             raise Error
+        except Exception:
+            used_db = _has_pending_work(session)
+            raise
         finally:
             await session.close()
+            metrics.session_finished(used_db)
 
 
 async def check_db_active(session: AsyncSession):
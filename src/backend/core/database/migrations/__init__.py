@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import text
+
+from src.backend.core.database.async_engine import create_task_engine
+from src.backend.core.database.migrations import (company_counters,
+                                                  keyset_indexes,
+                                                  product_search,
+                                                  reports_partitioning,
+                                                  reports_upsert,
+                                                  shelf_items,
+                                                  shelves_occupied_space,
+                                                  storages_box_gist,
+                                                  warehouse_stats)
+from src.backend.core.utils.date import date_time
+
+__all__ = ("MIGRATIONS", "run_migrations")
+
+# Порядок важен: дубли reports сливаются до партиционирования,
+# иначе перенос строк упрётся в уникальное ограничение
+MIGRATIONS = (
+    reports_upsert,
+    warehouse_stats,
+    reports_partitioning,
+    keyset_indexes,
+    company_counters,
+    shelf_items,
+    shelves_occupied_space,
+    storages_box_gist,
+    product_search,
+)
+
+INSERT_QUERY = text("INSERT INTO schema_migrations (name) VALUES (:name)")
+
+CREATE_TABLE_QUERY = text(
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name varchar(63) PRIMARY KEY,
+        applied_at timestamptz NOT NULL DEFAULT now()
+    )
+    """,
+)
+
+
+# Применяет к существующей базе ещё не применённые миграции, каждую
+# на своём соединении: CREATE INDEX CONCURRENTLY требует AUTOCOMMIT.
+# Запуск: python -m src.backend.core.database.migrations
+async def run_migrations() -> List[str]:
+    engine = create_task_engine()
+    applied = []
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(CREATE_TABLE_QUERY)
+            done = set((await connection.execute(
+                text("SELECT name FROM schema_migrations"),
+            )).scalars())
+
+        for migration in MIGRATIONS:
+            name = migration.__name__.rsplit(".", 1)[-1]
+            if name in done:
+                continue
+
+            async with engine.connect() as connection:
+                await migration.upgrade(connection)
+                await connection.commit()
+
+            async with engine.begin() as connection:
+                await connection.execute(INSERT_QUERY, {"name": name})
+
+            print(f"{date_time(datetime.now())}.Migration {name}: applied")
+            applied.append(name)
+    finally:
+        await engine.dispose()
+
+    return applied
@@ -0,0 +1,6 @@
+import asyncio
+
+from src.backend.core.database.migrations import run_migrations
+
+if __name__ == "__main__":
+    asyncio.run(run_migrations())
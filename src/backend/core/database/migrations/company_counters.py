@@ -0,0 +1,45 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.backend.models.company_counters import CompanyCounters
+from src.backend.repos.counters import COUNTED_MODELS
+
+__all__ = ("upgrade",)
+
+# Один запрос - один снимок: вставки, закоммиченные после него,
+# уже записали свои дельты в счётчик и в расхождение не попадут
+SEED_QUERY = """
+    INSERT INTO company_counters (company_id, entity, shard, value)
+    SELECT company_id, :entity, 0, drift FROM (
+        SELECT
+            company_id,
+            coalesce(actual.total, 0) - coalesce(stored.total, 0) AS drift
+        FROM (
+            SELECT company_id, count(*) AS total FROM {table}
+            WHERE company_id IS NOT NULL
+            GROUP BY company_id
+        ) AS actual
+        FULL JOIN (
+            SELECT company_id, sum(value) AS total FROM company_counters
+            WHERE entity = :entity
+            GROUP BY company_id
+        ) AS stored USING (company_id)
+    ) AS counted
+    WHERE drift <> 0
+    ON CONFLICT (company_id, entity, shard) DO UPDATE
+    SET value = company_counters.value + excluded.value
+"""
+
+
+# Начальные значения счётчиков. Без них до первой сверки
+# (counters.reconcile) сумма шардов - только дельты после выкладки.
+# Повторный запуск ничего не меняет
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.run_sync(
+        CompanyCounters.__table__.create, checkfirst=True,
+    )
+    for entity, model in COUNTED_MODELS.items():
+        await connection.execute(
+            text(SEED_QUERY.format(table=model.__tablename__)),
+            {"entity": entity.value},
+        )
@@ -0,0 +1,23 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+__all__ = ("upgrade",)
+
+INDEXES = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_company_id "
+    "ON products (company_id, item_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_company_id "
+    "ON users (company_id, uuid)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_warehouses_company_id "
+    "ON warehouses (company_id, warehouse_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_storages_company_id "
+    "ON storages (company_id, storage_id)",
+)
+
+
+# Индексы keyset-пагинации списков внутри компании; совпадают
+# с __table_args__ моделей
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.execution_options(isolation_level="AUTOCOMMIT")
+    for statement in INDEXES:
+        await connection.execute(text(statement))
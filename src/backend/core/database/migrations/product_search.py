@@ -0,0 +1,25 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+__all__ = ("upgrade",)
+
+INDEXES = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_document "
+    "ON products USING gin ("
+    "to_tsvector('simple'::regconfig, name) || "
+    "to_tsvector('simple'::regconfig, article))",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_name_trgm "
+    "ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_article_trgm "
+    "ON products USING gin (article gin_trgm_ops)",
+)
+
+
+# Индексы поиска товаров: tsvector для слов и префиксов, pg_trgm для
+# ILIKE и нечёткого совпадения. Выражение документа совпадает с
+# models.products.product_document
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.execution_options(isolation_level="AUTOCOMMIT")
+    await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for statement in INDEXES:
+        await connection.execute(text(statement))
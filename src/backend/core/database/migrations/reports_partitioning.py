@@ -0,0 +1,63 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.backend.core.database.partitions import (add_months,
+                                                  create_default_partition,
+                                                  create_monthly_partitions,
+                                                  month_start)
+from src.backend.models.report import Report
+
+__all__ = ("upgrade",)
+
+PARTITIONED_QUERY = text(
+    "SELECT 1 FROM pg_partitioned_table "
+    "WHERE partrelid = to_regclass('reports')",
+)
+
+
+# Перевод существующей reports на помесячное RANGE-партиционирование:
+# старая таблица переименовывается, новая создается по модели,
+# партиции нарезаются под весь диапазон данных и строки переливаются.
+# Уже партиционированную таблицу не трогает
+async def upgrade(connection: AsyncConnection) -> None:
+    if await connection.scalar(PARTITIONED_QUERY):
+        return
+
+    await connection.execute(text("ALTER TABLE reports RENAME TO reports_old"))
+    indexes = await connection.execute(
+        text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = 'reports_old'",
+        ),
+    )
+    for index in indexes.scalars().all():
+        await connection.execute(
+            text(f"ALTER INDEX {index} RENAME TO {index}_old"),
+        )
+
+    await connection.run_sync(Report.__table__.create)
+
+    first, last = (await connection.execute(
+        text("SELECT min(date), max(date) FROM reports_old"),
+    )).one()
+    if first:
+        first, last = month_start(first), month_start(last)
+        months = (last.year - first.year) * 12 + last.month - first.month
+        await create_monthly_partitions(
+            connection, Report.__tablename__, first, months + 1,
+        )
+        await create_monthly_partitions(
+            connection, Report.__tablename__, add_months(last, 1), 3,
+        )
+
+    await create_default_partition(connection, Report.__tablename__)
+
+    await connection.execute(
+        text(
+            "INSERT INTO reports "
+            "(report_id, warehouse_id, company_id, date, actions) "
+            "SELECT report_id, warehouse_id, company_id, date, actions "
+            "FROM reports_old",
+        ),
+    )
+    await connection.execute(text("DROP TABLE reports_old"))
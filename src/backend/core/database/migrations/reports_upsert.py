@@ -0,0 +1,65 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+__all__ = ("upgrade",)
+
+CONSTRAINT_QUERY = text(
+    "SELECT 1 FROM pg_constraint WHERE conname = 'uq_reports_warehouse_id'",
+)
+
+# Дубли (warehouse_id, date) сливаются в строку с меньшим report_id
+MERGE_QUERY = text(
+    """
+    UPDATE reports AS r
+    SET actions = merged.actions
+    FROM (
+        SELECT keep.report_id, jsonb_agg(
+            item.value ORDER BY other.report_id, item.position
+        ) AS actions
+        FROM (
+            SELECT min(report_id::text)::uuid AS report_id, warehouse_id, date
+            FROM reports
+            GROUP BY warehouse_id, date
+            HAVING count(*) > 1
+        ) AS keep
+        JOIN reports AS other
+        ON other.warehouse_id = keep.warehouse_id AND other.date = keep.date
+        CROSS JOIN LATERAL jsonb_array_elements(other.actions)
+        WITH ORDINALITY AS item(value, position)
+        GROUP BY keep.report_id
+    ) AS merged
+    WHERE r.report_id = merged.report_id
+    """,
+)
+
+DELETE_QUERY = text(
+    """
+    DELETE FROM reports AS r
+    USING reports AS other
+    WHERE r.warehouse_id = other.warehouse_id
+    AND r.date = other.date
+    AND r.report_id::text > other.report_id::text
+    """,
+)
+
+
+# Ограничения models.report.Report: цель ON CONFLICT для write_actions
+# и индекс выборок по компании за период (stream_report). Партиционированная
+# reports создаётся уже с ними, тогда миграция ничего не делает
+async def upgrade(connection: AsyncConnection) -> None:
+    if not await connection.scalar(CONSTRAINT_QUERY):
+        await connection.execute(MERGE_QUERY)
+        await connection.execute(DELETE_QUERY)
+        await connection.execute(
+            text(
+                "ALTER TABLE reports ADD CONSTRAINT uq_reports_warehouse_id "
+                "UNIQUE (warehouse_id, date)",
+            ),
+        )
+
+    await connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_reports_company_id "
+            "ON reports (company_id, date)",
+        ),
+    )
@@ -0,0 +1,70 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.backend.models.shelf_items import ShelfItems
+
+__all__ = ("upgrade",)
+
+BACKFILL_QUERY = text(
+    """
+    INSERT INTO shelf_items (shelf_id, item_id, quantity, updated_at)
+    SELECT s.shelf_id, item.item_id, count(*), s.updated_at
+    FROM shelves AS s
+    CROSS JOIN LATERAL unnest(s.products_list) AS item(item_id)
+    WHERE s.shelf_id > :after
+    AND s.shelf_id <= :until
+    GROUP BY s.shelf_id, item.item_id, s.updated_at
+    ON CONFLICT (shelf_id, item_id) DO UPDATE
+    SET quantity = shelf_items.quantity + excluded.quantity
+    """,
+)
+
+COLUMN_QUERY = text(
+    """
+    SELECT 1 FROM information_schema.columns
+    WHERE table_name = 'shelves' AND column_name = 'products_list'
+    """,
+)
+
+BATCH_QUERY = text(
+    """
+    SELECT max(shelf_id::text)::uuid FROM (
+        SELECT shelf_id FROM shelves
+        WHERE shelf_id > :after
+        ORDER BY shelf_id
+        LIMIT :batch
+    ) AS batch
+    """,
+)
+
+
+# Перенос products_list в shelf_items: каждое вхождение товара
+# в массив было одним размещением, поэтому quantity = count(*).
+# Полки обходятся пачками по shelf_id, после переноса массив удаляется.
+# Повторный запуск на перенесённой базе ничего не делает
+async def upgrade(connection: AsyncConnection, batch: int = 1000) -> None:
+    await connection.run_sync(
+        ShelfItems.__table__.create, checkfirst=True,
+    )
+    if not await connection.scalar(COLUMN_QUERY):
+        return
+
+    after = "00000000-0000-0000-0000-000000000000"
+    while True:
+        until = await connection.scalar(
+            BATCH_QUERY, {"after": after, "batch": batch},
+        )
+        if until is None:
+            break
+
+        await connection.execute(
+            BACKFILL_QUERY, {"after": after, "until": until},
+        )
+        after = until
+
+    await connection.execute(
+        text("DROP INDEX IF EXISTS ix_shelves_products_list"),
+    )
+    await connection.execute(
+        text("ALTER TABLE shelves DROP COLUMN IF EXISTS products_list"),
+    )
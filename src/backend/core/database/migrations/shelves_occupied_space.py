@@ -0,0 +1,57 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+__all__ = ("upgrade",)
+
+RECOMPUTE_QUERY = text(
+    """
+    UPDATE shelves AS s
+    SET occupied_space = used.volume
+    FROM (
+        SELECT shelf.shelf_id, coalesce(sum(
+            item.quantity * p.dekart_parameters[1]
+            * p.dekart_parameters[2] * p.dekart_parameters[3]
+        ) FILTER (
+            WHERE array_length(p.dekart_parameters, 1) >= 3
+        ), 0) AS volume
+        FROM shelves AS shelf
+        LEFT JOIN shelf_items AS item ON item.shelf_id = shelf.shelf_id
+        LEFT JOIN products AS p ON p.item_id = item.item_id
+        WHERE shelf.shelf_id > :after
+        AND shelf.shelf_id <= :until
+        GROUP BY shelf.shelf_id
+    ) AS used
+    WHERE s.shelf_id = used.shelf_id
+    AND s.occupied_space IS DISTINCT FROM used.volume
+    """,
+)
+
+BATCH_QUERY = text(
+    """
+    SELECT max(shelf_id::text)::uuid FROM (
+        SELECT shelf_id FROM shelves
+        WHERE shelf_id > :after
+        ORDER BY shelf_id
+        LIMIT :batch
+    ) AS batch
+    """,
+)
+
+
+# occupied_space раньше копил dekart_parameters[0] * кол-во, теперь -
+# реальный объём (д * ш * в * кол-во), как в packing.unit_volume.
+# Пересчёт по shelf_items, пачками по shelf_id; товары без габаритов
+# места не занимают. Повторный запуск ничего не меняет
+async def upgrade(connection: AsyncConnection, batch: int = 1000) -> None:
+    after = "00000000-0000-0000-0000-000000000000"
+    while True:
+        until = await connection.scalar(
+            BATCH_QUERY, {"after": after, "batch": batch},
+        )
+        if until is None:
+            break
+
+        await connection.execute(
+            RECOMPUTE_QUERY, {"after": after, "until": until},
+        )
+        after = until
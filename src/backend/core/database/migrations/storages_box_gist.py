@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+__all__ = ("upgrade",)
+
+
+# GiST по прямоугольникам стеллажей для запросов "точка внутри",
+# "пересекает регион" и сортировки по расстоянию (<->). Выражение
+# совпадает с models.storage.storage_box
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.execution_options(isolation_level="AUTOCOMMIT")
+    await connection.execute(
+        text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_storages_box "
+            "ON storages USING gist (box("
+            "point(coordinates[1], coordinates[2]), "
+            "point(coordinates[3], coordinates[4])))",
+        ),
+    )
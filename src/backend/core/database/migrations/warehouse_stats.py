@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.backend.models.warehouse_stats import WarehouseStats
+
+__all__ = ("upgrade",)
+
+
+# Почасовые агрегаты складов вместе с индексами модели
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.run_sync(
+        WarehouseStats.__table__.create, checkfirst=True,
+    )
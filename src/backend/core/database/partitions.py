@@ -0,0 +1,152 @@
+from datetime import date
+import re
+from typing import Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+__all__ = (
+    "month_start",
+    "add_months",
+    "partition_name",
+    "partition_month",
+    "default_partition_name",
+    "create_default_partition",
+    "create_monthly_partitions",
+    "list_partitions",
+    "detach_partition",
+    "drop_partition",
+)
+
+Executor = Union[AsyncSession, AsyncConnection]
+
+PARTITION_RE = re.compile(
+    r"^(?P<table>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$",
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = PARTITION_RE.match(name)
+    if not match:
+        return None
+
+    return date(int(match["year"]), int(match["month"]), 1)
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+async def _exists(session: Executor, name: str) -> bool:
+    return bool(await session.scalar(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name},
+    ))
+
+
+# Строки вне нарезанных месяцев попадают сюда, а не в ошибку вставки
+async def create_default_partition(session: Executor, table: str) -> str:
+    name = default_partition_name(table)
+    await session.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} DEFAULT",
+        ),
+    )
+    return name
+
+
+# Имена таблиц и границы генерируются здесь же, поэтому DDL
+# собирается строкой - bind-параметры в DDL не поддерживаются.
+# Если есть DEFAULT-партиция, месяц создаётся отдельной таблицей:
+# его строки переносятся из DEFAULT и таблица подключается через
+# ATTACH, иначе CREATE ... PARTITION OF упал бы на этих строках
+async def create_monthly_partitions(
+    session: Executor,
+    table: str,
+    start: date,
+    months: int,
+    partition_key: str = "date",
+) -> list[str]:
+    default = default_partition_name(table)
+    has_default = await _exists(session, default)
+    created = []
+    month = month_start(start)
+    for _ in range(months):
+        upper = add_months(month, 1)
+        name = partition_name(table, month)
+        bounds = f"FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        if not has_default:
+            await session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES {bounds}",
+                ),
+            )
+        elif not await _exists(session, name):
+            in_month = (
+                f"{partition_key} >= '{month.isoformat()}' "
+                f"AND {partition_key} < '{upper.isoformat()}'"
+            )
+            await session.execute(
+                text(
+                    f"CREATE TABLE {name} (LIKE {table} "
+                    f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+                ),
+            )
+            await session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default} "
+                    f"WHERE {in_month} RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved",
+                ),
+            )
+            await session.execute(
+                text(
+                    f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                    f"FOR VALUES {bounds}",
+                ),
+            )
+
+        created.append(name)
+        month = upper
+
+    return created
+
+
+async def list_partitions(session: Executor, table: str) -> list[str]:
+    result = await session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table ORDER BY child.relname",
+        ),
+        {"table": table},
+    )
+    return list(result.scalars().all())
+
+
+async def detach_partition(
+    session: Executor,
+    table: str,
+    name: str,
+) -> None:
+    await session.execute(
+        text(f"ALTER TABLE {table} DETACH PARTITION {name}"),
+    )
+
+
+async def drop_partition(session: Executor, name: str) -> None:
+    await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
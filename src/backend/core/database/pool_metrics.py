@@ -0,0 +1,88 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+__all__ = (
+    "PoolMetrics",
+    "instrument_pool",
+    "pool_snapshot",
+)
+
+
+class PoolMetrics:
+    __slots__ = (
+        "connects",
+        "checkouts",
+        "checkins",
+        "invalidations",
+        "hold_seconds_total",
+        "hold_seconds_max",
+        "sessions",
+        "sessions_without_db",
+    )
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.hold_seconds_total = 0.0
+        self.hold_seconds_max = 0.0
+        self.sessions = 0
+        self.sessions_without_db = 0
+
+    def session_finished(self, used_db: bool) -> None:
+        self.sessions += 1
+        if not used_db:
+            self.sessions_without_db += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["hold_seconds_avg"] = (
+            self.hold_seconds_total / self.checkins if self.checkins else 0.0
+        )
+        return data
+
+
+# Время удержания соединения: от checkout до возврата в пул
+def instrument_pool(engine: AsyncEngine) -> PoolMetrics:
+    metrics = PoolMetrics()
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(*_: Any) -> None:
+        metrics.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(_: Any, record: Any, __: Any) -> None:
+        metrics.checkouts += 1
+        record.info["checkout_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(_: Any, record: Any) -> None:
+        started = record.info.pop("checkout_at", None)
+        if started is None:
+            return
+
+        held = time.perf_counter() - started
+        metrics.checkins += 1
+        metrics.hold_seconds_total += held
+        metrics.hold_seconds_max = max(metrics.hold_seconds_max, held)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(*_: Any) -> None:
+        metrics.invalidations += 1
+
+    return metrics
+
+
+def pool_snapshot(engine: AsyncEngine, metrics: PoolMetrics) -> Dict[str, Any]:
+    pool = engine.sync_engine.pool
+    data = metrics.as_dict()
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            data[f"pool_{name}"] = getattr(pool, name)()
+
+    return data
@@ -0,0 +1,139 @@
+import asyncio
+from contextvars import ContextVar
+from functools import wraps
+import random
+from typing import Any, Awaitable, Callable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.core.config import settings
+
+__all__ = (
+    "TransactionProfile",
+    "READ_COMMITTED",
+    "READ_SNAPSHOT",
+    "SERIALIZABLE",
+    "ATOMIC_WRITES",
+    "CTX_TX_PROFILE",
+    "use_profile",
+    "read_only",
+    "snapshot",
+    "atomic_writes",
+    "is_serialization_failure",
+    "retry_on_serialization_failure",
+    "after_commit",
+)
+
+T = TypeVar("T")
+
+# serialization_failure, deadlock_detected
+RETRYABLE_SQLSTATES = ("40001", "40P01")
+
+# ссылки на фоновые задачи after_commit, чтобы их не собрал GC
+_background: set = set()
+
+
+class TransactionProfile:
+    __slots__ = ("name", "isolation_level", "read_only")
+
+    def __init__(self, name: str, isolation_level: str, read_only: bool):
+        self.name = name
+        self.isolation_level = isolation_level
+        self.read_only = read_only
+
+    def __repr__(self) -> str:
+        return f"TransactionProfile({self.name})"
+
+
+# Чтения без согласованности между запросами
+READ_COMMITTED = TransactionProfile("read_committed", "READ COMMITTED", True)
+# Несколько запросов в одном снимке (отчёты, выгрузки)
+READ_SNAPSHOT = TransactionProfile("snapshot", "REPEATABLE READ", True)
+# Профиль записи по умолчанию
+SERIALIZABLE = TransactionProfile(
+    "serializable", settings.db_isolation_level, False,
+)
+# Записи из условных атомарных UPDATE (... WHERE x + v <= limit):
+# в READ COMMITTED условие перепроверяется после ожидания блокировки
+# строки, поэтому конкурентные запросы не падают с 40001
+ATOMIC_WRITES = TransactionProfile("atomic", "READ COMMITTED", False)
+
+CTX_TX_PROFILE: ContextVar[TransactionProfile] = ContextVar(
+    "CTX_TX_PROFILE",
+    default=SERIALIZABLE,
+)
+
+
+# Зависимость уровня роута: dependencies=[Depends(read_only)].
+# Роутовые зависимости решаются раньше параметров эндпоинта,
+# поэтому get_session уже видит выбранный профиль
+def use_profile(
+    profile: TransactionProfile,
+) -> Callable[[], Awaitable[TransactionProfile]]:
+    async def dependency() -> TransactionProfile:
+        CTX_TX_PROFILE.set(profile)
+        return profile
+
+    return dependency
+
+
+read_only = use_profile(READ_COMMITTED)
+snapshot = use_profile(READ_SNAPSHOT)
+atomic_writes = use_profile(ATOMIC_WRITES)
+
+
+def is_serialization_failure(exc: BaseException) -> bool:
+    if not isinstance(exc, DBAPIError):
+        return False
+
+    orig = exc.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(
+        getattr(orig, "__cause__", None), "sqlstate", None,
+    )
+    return sqlstate in RETRYABLE_SQLSTATES
+
+
+# Повторяет единицу работы целиком: функция должна сама открывать
+# свою транзакцию (session_scope), иначе повтор бессмыслен
+def retry_on_serialization_failure(
+    attempts: int = settings.db_serialization_retries,
+    base_delay: float = 0.05,
+) -> Callable[
+    [Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]],
+]:
+    def decorator(
+        func: Callable[..., Awaitable[T]],
+    ) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            for attempt in range(attempts):
+                try:
+                    return await func(*args, **kwargs)
+                except DBAPIError as exc:
+                    if attempt == attempts - 1 or (
+                        not is_serialization_failure(exc)
+                    ):
+                        raise
+
+                    await asyncio.sleep(
+                        base_delay * 2 ** attempt * (1 + random.random()),
+                    )
+
+        return wrapper
+
+    return decorator
+
+
+# Запускает action после успешного commit сессии (например, рассылку
+# об изменениях): при откате подписчики ничего не узнают
+def after_commit(
+    session: AsyncSession, action: Callable[[], Awaitable[None]],
+) -> None:
+    def schedule(_: Any) -> None:
+        task = asyncio.get_running_loop().create_task(action())
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+    event.listen(session.sync_session, "after_commit", schedule, once=True)
@@ -1,6 +1,16 @@
 from enum import Enum
 
-__all__ = ("AccessLevel", "ProductType", "ProductStatus", "StopListReason")
+__all__ = (
+    "AccessLevel",
+    "ProductType",
+    "ProductStatus",
+    "StopListReason",
+    "StatsGranularity",
+    "ReportFormat",
+    "ExportFormat",
+    "CounterEntity",
+    "ReportAction",
+)
 
 
 class AccessLevel(Enum):
@@ -25,3 +35,30 @@ class ProductStatus(Enum):
 class StopListReason(Enum):
     fitting = "fitting"
     acceptance = "acceptance"
+
+
+class StatsGranularity(Enum):
+    hour = "hour"
+    day = "day"
+
+
+class ReportFormat(Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ExportFormat(Enum):
+    parquet = "parquet"
+    csv = "csv"
+
+
+class CounterEntity(Enum):
+    products = "products"
+    users = "users"
+    warehouses = "warehouses"
+    storages = "storages"
+
+
+class ReportAction(Enum):
+    received = "received"
+    picked = "picked"
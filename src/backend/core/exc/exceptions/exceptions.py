@@ -12,6 +12,8 @@ __all__ = (
     "NotFoundError",
     "UnauthorizedError",
     "UniqueViolationError",
+    "ConflictError",
+    "TooManyRequestsError",
 )
 
 
@@ -26,8 +28,8 @@ class HTTPError(Exception):
     ) -> None:
         self.http_code = http_code
         self.message = message
-        self.additional_details = additional_details | {}
-        self.headers = headers | {}
+        self.additional_details = additional_details or {}
+        self.headers = headers or {}
         self.commit_db = commit_db
 
     @staticmethod
@@ -77,6 +79,32 @@ class UniqueViolationError(HTTPError):
         super().__init__(409, message)
 
 
+class ConflictError(HTTPError):
+    def __init__(
+        self,
+        message: str = "Conflict",
+        retry_after: int | None = None,
+    ):
+        super().__init__(
+            409,
+            message,
+            headers={"Retry-After": str(retry_after)} if retry_after else None,
+        )
+
+
+class TooManyRequestsError(HTTPError):
+    def __init__(
+        self,
+        message: str = "Too Many Requests",
+        retry_after: int | None = None,
+    ):
+        super().__init__(
+            429,
+            message,
+            headers={"Retry-After": str(retry_after)} if retry_after else None,
+        )
+
+
 class ValidationError(HTTPError):
     def __init__(self, message: str = "Validation Error"):
         super().__init__(423, message)
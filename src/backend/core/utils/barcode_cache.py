@@ -0,0 +1,173 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+import json
+from typing import (Any, Awaitable, Callable, Dict, Iterable, List,
+                    Optional, Tuple)
+
+from src.backend.core.utils.date import date_time
+from src.backend.core.utils.redis import get_redis_client
+
+__all__ = ("BarcodeCache",)
+
+Loader = Callable[[], Awaitable[Iterable[Any]]]
+
+
+# Каталог штрихкодов в памяти процесса: company_id -> barcode -> товар
+# (объект с атрибутами item_id, company_id, barcode). Загружается
+# целиком при старте и синхронизируется через Redis pub/sub:
+#   {"op": "upsert", "product": {...}}
+#   {"op": "delete", "item_id": ...}
+#   {"op": "stock", "item_ids": [...]} - сбросить кэш размещений
+#   (без item_ids - сбросить целиком).
+# После переподключения к Redis каталог перечитывается заново, так
+# что пропущенные за это время сообщения не теряются
+class BarcodeCache:
+    def __init__(
+        self,
+        channel: str,
+        loader: Loader,
+        parse: Callable[[Dict[str, Any]], Any],
+        locations_size: int = 100000,
+        reconnect_delay: float = 1.0,
+    ):
+        self.channel = channel
+        self.loader = loader
+        self.parse = parse
+        self.locations_size = locations_size
+        self.reconnect_delay = reconnect_delay
+        self.products: Dict[str, Dict[str, Any]] = {}
+        self.barcodes: Dict[str, Tuple[str, str]] = {}
+        self.locations: "OrderedDict[str, List[Any]]" = OrderedDict()
+        # растёт с каждым сообщением об остатках: размещения,
+        # прочитанные до него, в кэш не кладутся
+        self.stock_epoch = 0
+        self.ready = False
+        self._warmed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def get(self, company_id: str, barcode: str) -> Optional[Any]:
+        return self.products.get(str(company_id), {}).get(barcode)
+
+    def put(self, product: Any) -> None:
+        self.remove(str(product.item_id))
+        company_id = str(product.company_id)
+        self.products.setdefault(company_id, {})[product.barcode] = product
+        self.barcodes[str(product.item_id)] = (company_id, product.barcode)
+
+    def remove(self, item_id: str) -> None:
+        self.locations.pop(item_id, None)
+        key = self.barcodes.pop(item_id, None)
+        if key:
+            company_id, barcode = key
+            self.products.get(company_id, {}).pop(barcode, None)
+
+    def get_locations(self, item_id: str) -> Optional[List[Any]]:
+        locations = self.locations.get(item_id)
+        if locations is not None:
+            self.locations.move_to_end(item_id)
+
+        return locations
+
+    def put_locations(
+        self, item_id: str, locations: List[Any], epoch: int,
+    ) -> None:
+        if epoch != self.stock_epoch:
+            return
+
+        self.locations[item_id] = locations
+        self.locations.move_to_end(item_id)
+        if len(self.locations) > self.locations_size:
+            self.locations.popitem(last=False)
+
+    def apply(self, message: Dict[str, Any]) -> None:
+        op = message.get("op")
+        if op == "upsert":
+            self.put(self.parse(message["product"]))
+        elif op == "delete":
+            self.remove(str(message["item_id"]))
+        elif op == "stock":
+            self.stock_epoch += 1
+            item_ids = message.get("item_ids")
+            if item_ids is None:
+                self.locations.clear()
+
+            for item_id in item_ids or []:
+                self.locations.pop(str(item_id), None)
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        self.apply(message)
+        async with get_redis_client() as redis:
+            await redis.publish(self.channel, json.dumps(message))
+
+    async def warm(self) -> None:
+        products, barcodes = {}, {}
+        for product in await self.loader():
+            company_id = str(product.company_id)
+            products.setdefault(company_id, {})[product.barcode] = product
+            barcodes[str(product.item_id)] = (company_id, product.barcode)
+
+        self.products, self.barcodes = products, barcodes
+        self.locations.clear()
+        self.stock_epoch += 1
+        self.ready = True
+        if self._warmed:
+            self._warmed.set()
+
+    def start(self) -> None:
+        if not self.running:
+            self._warmed = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    # До первой загрузки запросы идут в БД; старт приложения может
+    # подождать прогрева, но не дольше timeout
+    async def wait_ready(self, timeout: float) -> bool:
+        if self._warmed:
+            try:
+                await asyncio.wait_for(self._warmed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        return self.ready
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+        self.ready = False
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.ready = False
+                print(f"{date_time(datetime.now())}.Barcode cache: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    # Сначала подписка, потом загрузка: изменения, пришедшие во время
+    # загрузки, применятся поверх снимка
+    async def _listen(self) -> None:
+        async with get_redis_client() as redis:
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(self.channel)
+            try:
+                await self.warm()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.apply(json.loads(message["data"]))
+            finally:
+                await pubsub.unsubscribe(self.channel)
+                await pubsub.close()
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from src.backend.core.utils.date import date_time
+
+__all__ = ("BatchBuffer",)
+
+BatchHandler = Callable[[list[Any]], Awaitable[None]]
+
+# будит сборщик, ждущий пустую очередь, при остановке
+_STOP = object()
+
+
+# Копит записи в ограниченной очереди и сбрасывает их пачками:
+# каждые flush_interval секунд или по достижении batch_size записей.
+# Если очередь переполнена дольше put_timeout или запись в БД упала,
+# записи уходят в spill (durable-fallback), чтобы не терять их.
+# stop() не отменяет сборщик, а дожидается, пока он сбросит очередь:
+# отмена посреди flush потеряла бы уже вынутую пачку
+class BatchBuffer:
+    def __init__(
+        self,
+        flush: BatchHandler,
+        spill: BatchHandler,
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        put_timeout: float = 0.05,
+        stop_timeout: float = 10.0,
+    ):
+        self.flush = flush
+        self.spill = spill
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.stop_timeout = stop_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._inflight: list[Any] = []
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def put(self, item: Any) -> None:
+        if not self.running or self._stopping:
+            await self._safe_spill([item])
+            return
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(
+                    self._queue.put(item),
+                    timeout=self.put_timeout,
+                )
+            except asyncio.TimeoutError:
+                await self._safe_spill([item])
+
+    def start(self) -> None:
+        if not self.running:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._stopping = True
+            try:
+                self._queue.put_nowait(_STOP)
+            except asyncio.QueueFull:
+                # сборщик не ждёт пустую очередь и сам увидит _stopping
+                pass
+
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(self._task), self.stop_timeout,
+                )
+            except asyncio.TimeoutError:
+                # flush завис: отменяем его, вынутая пачка уходит в spill
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+
+                if self._inflight:
+                    await self._safe_spill(self._inflight)
+
+            self._task = None
+            self._inflight = []
+
+        batch = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+
+        if batch:
+            await self._safe_flush(batch)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            if batch:
+                self._inflight = batch
+                await self._safe_flush(batch)
+                self._inflight = []
+            elif self._stopping:
+                return
+
+    async def _collect(self) -> list[Any]:
+        if self._stopping and self._queue.empty():
+            return []
+
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size and not self._stopping:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout),
+                )
+            except asyncio.TimeoutError:
+                break
+
+        return [item for item in batch if item is not _STOP]
+
+    async def _safe_flush(self, batch: list[Any]) -> None:
+        try:
+            await self.flush(batch)
+        except Exception as e:
+            print(f"{date_time(datetime.now())}.Batch flush failed: {e}")
+            await self._safe_spill(batch)
+
+    async def _safe_spill(self, batch: list[Any]) -> None:
+        try:
+            await self.spill(batch)
+        except Exception as e:
+            print(
+                f"{date_time(datetime.now())}.Batch spill failed, "
+                f"{len(batch)} entries lost: {e}",
+            )
@@ -0,0 +1,38 @@
+from hashlib import blake2b
+import math
+from typing import Iterable
+
+__all__ = ("BloomFilter",)
+
+
+# Компактный фильтр Блума: ложноположительные ответы возможны,
+# ложноотрицательные - нет. Индексы бит считаются двойным хешированием
+class BloomFilter:
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.size = max(
+            8,
+            int(-capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterable[int]:
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return (
+            (first + i * second) % self.size for i in range(self.hashes)
+        )
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    def clear(self) -> None:
+        self.bits = bytearray(len(self.bits))
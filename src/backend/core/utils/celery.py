@@ -13,7 +13,7 @@ def get_celery_client() -> Celery:
             "SmartBin",
             broker=settings.celery_broker_url,
             backend=settings.celery_result_backend,
-            include=["backend.tasks"],
+            include=["src.backend.services.tasks"],
             config={
                 "task_serializer": "json",
                 "accept_content": ["json"],
@@ -1,14 +1,114 @@
-from typing import Type, TypeVar
+from functools import lru_cache
+from typing import (Any, Dict, Iterable, List, Sequence, Tuple, Type,
+                    TypeVar)
+from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import cast, inspect, String, Uuid
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
+__all__ = (
+    "to_dto",
+    "to_dto_list",
+    "rows_to_dto",
+    "dto_columns",
+)
+
 T = TypeVar("T", bound=BaseModel)
 
 
+# Поля DTO, которые есть среди колонок модели; UUID-колонки,
+# описанные в DTO как str, приводим к строке заранее
+@lru_cache(maxsize=None)
+def _field_map(
+    model: type, dto: Type[BaseModel],
+) -> Tuple[Tuple[str, bool], ...]:
+    columns = inspect(model).columns
+    return tuple(
+        (
+            name,
+            field.annotation is str and isinstance(columns[name].type, Uuid),
+        )
+        for name, field in dto.model_fields.items()
+        if name in columns
+    )
+
+
+# Остальные поля DTO берём из загруженных атрибутов экземпляра
+@lru_cache(maxsize=None)
+def _extra_fields(model: type, dto: Type[BaseModel]) -> Tuple[str, ...]:
+    columns = inspect(model).columns
+    return tuple(name for name in dto.model_fields if name not in columns)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(dto: Type[T]) -> TypeAdapter:
+    return TypeAdapter(List[dto])
+
+
+def _as_dict(
+    model: AsyncAttrs,
+    fields: Tuple[Tuple[str, bool], ...],
+    extras: Tuple[str, ...],
+) -> Dict[str, Any]:
+    state = model.__dict__
+    data = {}
+    for name, stringify in fields:
+        if name not in state:
+            continue
+
+        value = state[name]
+        data[name] = (
+            str(value) if stringify and isinstance(value, UUID) else value
+        )
+
+    for name in extras:
+        if name in state:
+            data[name] = state[name]
+
+    return data
+
+
 def to_dto(model: AsyncAttrs, dto: Type[T]) -> T:
     if not model:
         raise ValueError("Model cannot be None")
 
-    return dto(**{k: v for k, v, in model.__dict__.items()
-                  if not k.startswith("_")})
+    model_type = type(model)
+    return dto.model_validate(
+        _as_dict(
+            model,
+            _field_map(model_type, dto),
+            _extra_fields(model_type, dto),
+        ),
+    )
+
+
+# Весь список валидируется одним вызовом TypeAdapter
+def to_dto_list(models: Sequence[AsyncAttrs], dto: Type[T]) -> List[T]:
+    if not models:
+        return []
+
+    model_type = type(models[0])
+    fields = _field_map(model_type, dto)
+    extras = _extra_fields(model_type, dto)
+    return _list_adapter(dto).validate_python(
+        [_as_dict(model, fields, extras) for model in models],
+    )
+
+
+# Колонки под DTO для select(*dto_columns(...)): строки из БД
+# сразу идут в DTO без материализации ORM-объектов
+def dto_columns(model: type, dto: Type[BaseModel]) -> List[Any]:
+    columns = inspect(model).columns
+    return [
+        (
+            cast(columns[name], String) if stringify else columns[name]
+        ).label(name)
+        for name, stringify in _field_map(model, dto)
+    ]
+
+
+def rows_to_dto(rows: Iterable[Any], dto: Type[T]) -> List[T]:
+    return _list_adapter(dto).validate_python(
+        [dict(row._mapping) for row in rows],
+    )
@@ -1,24 +1,62 @@
+import asyncio
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict
+from hashlib import sha256
+import time
+from typing import Dict, Optional
 
+from aioredis import Redis
 import jwt
 import pytz
 
 from src.backend.core.config import settings
+from src.backend.core.utils.bloom import BloomFilter
+from src.backend.core.utils.date import date_time
+from src.backend.core.utils.redis import get_redis_client
 from src.backend.models.users import Users
 
-__all__ = ("create_jwt", "validate_jwt")
+__all__ = (
+    "create_jwt",
+    "validate_jwt",
+    "token_hash",
+    "revoke_jwt",
+    "revoke_subject",
+    "is_jwt_revoked",
+    "sync_revocations",
+    "prune_revocations",
+    "start_revocation_sync",
+    "stop_revocation_sync",
+)
+
+REVOKED_TOKENS_KEY = "jwt:revoked"
+REVOKED_SUBJECTS_KEY = "jwt:revoked:subjects"
+PRUNE_LOCK_KEY = "jwt:revoked:prune"
+
+# token_hash -> (payload, exp): повторный токен не проверяем заново
+_verified: "OrderedDict[str, tuple[Dict, float]]" = OrderedDict()
+
+
+class _RevocationMirror:
+    def __init__(self):
+        self.filter = BloomFilter(settings.jwt_revoked_capacity)
+        self.synced_at = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+_revoked = _RevocationMirror()
 
 
 async def create_jwt(user: Users) -> str:
     try:
+        now = datetime.now(pytz.UTC)
         payload = {
             "sub": user.number,
-            "exp": (
-                datetime.now(pytz.UTC) + timedelta(
-                    seconds=settings.jwt_expires,
-                )
-            ),
+            "iat": now,
+            "exp": now + timedelta(seconds=settings.jwt_expires),
         }
         token = jwt.encode(
             payload,
@@ -30,9 +68,23 @@ async def create_jwt(user: Users) -> str:
         raise ValueError(f"Error while creating jwt: {e}")
 
 
+def token_hash(token: str) -> str:
+    return sha256(token.encode()).hexdigest()
+
+
 def validate_jwt(token: str) -> Dict:
+    key = token_hash(token)
+    cached = _verified.get(key)
+    if cached:
+        payload, expires = cached
+        if expires > time.time():
+            _verified.move_to_end(key)
+            return payload
+
+        del _verified[key]
+
     try:
-        return jwt.decode(
+        payload = jwt.decode(
             token,
             settings.jwt_secret_key,
             algorithms=[settings.jwt_algorithm],
@@ -41,3 +93,126 @@ def validate_jwt(token: str) -> Dict:
         raise ValueError("Token expired")
     except jwt.InvalidKeyError:
         raise ValueError("Invalid token")
+
+    _verified[key] = (payload, float(payload.get("exp", 0)))
+    if len(_verified) > settings.jwt_cache_size:
+        _verified.popitem(last=False)
+
+    return payload
+
+
+# Чистка общая для всех процессов, поэтому её делает один из них
+# под коротким замком. Отзыв субъекта старше срока жизни токена
+# уже ничего не отсекает: все токены до него истекли
+async def prune_revocations(redis: Redis) -> None:
+    interval = max(settings.jwt_revoked_sync_interval, 1)
+    if not await redis.set(PRUNE_LOCK_KEY, "1", nx=True, ex=interval):
+        return
+
+    now = time.time()
+    await redis.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", now)
+    stale = [
+        subject
+        for subject, revoked_at in (
+            await redis.hgetall(REVOKED_SUBJECTS_KEY)
+        ).items()
+        if float(revoked_at) < now - settings.jwt_expires
+    ]
+    if stale:
+        await redis.hdel(REVOKED_SUBJECTS_KEY, *stale)
+
+
+async def sync_revocations(redis: Redis) -> None:
+    await prune_revocations(redis)
+    mirror = BloomFilter(settings.jwt_revoked_capacity)
+    for key in await redis.zrange(REVOKED_TOKENS_KEY, 0, -1):
+        mirror.add(key)
+
+    for subject in await redis.hkeys(REVOKED_SUBJECTS_KEY):
+        mirror.add(f"sub:{subject}")
+
+    _revoked.filter = mirror
+    _revoked.synced_at = time.monotonic()
+
+
+async def _sync_loop() -> None:
+    while True:
+        try:
+            async with get_redis_client() as redis:
+                await sync_revocations(redis)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"{date_time(datetime.now())}.Revocation sync: {e}")
+
+        await asyncio.sleep(settings.jwt_revoked_sync_interval)
+
+
+# Зеркало отзывов обновляется фоновой задачей процесса, а не
+# на пути запроса
+def start_revocation_sync() -> None:
+    if not _revoked.running:
+        _revoked.task = asyncio.create_task(_sync_loop())
+
+
+async def stop_revocation_sync() -> None:
+    if _revoked.task:
+        _revoked.task.cancel()
+        try:
+            await _revoked.task
+        except asyncio.CancelledError:
+            pass
+
+        _revoked.task = None
+
+
+async def revoke_jwt(token: str, redis: Redis) -> None:
+    payload = jwt.decode(
+        token,
+        settings.jwt_secret_key,
+        algorithms=[settings.jwt_algorithm],
+        options={"verify_exp": False},
+    )
+    key = token_hash(token)
+    await redis.zadd(REVOKED_TOKENS_KEY, {key: float(payload.get("exp", 0))})
+    _revoked.filter.add(key)
+    _verified.pop(key, None)
+
+
+# Отзывает все токены пользователя, выданные раньше revoked_at.
+# iat в токене - целые секунды, поэтому и момент отзыва хранится
+# с точностью до секунды: токен, выданный в ту же секунду, остаётся
+async def revoke_subject(
+    subject: str,
+    redis: Redis,
+    revoked_at: Optional[datetime] = None,
+) -> None:
+    moment = int((revoked_at or datetime.now(pytz.UTC)).timestamp())
+    await redis.hset(REVOKED_SUBJECTS_KEY, subject, moment)
+    _revoked.filter.add(f"sub:{subject}")
+
+
+# Фильтр Блума отсекает почти все живые токены без похода в Redis;
+# зеркало перечитывается раз в jwt_revoked_sync_interval секунд.
+# Без фоновой задачи (вне приложения) зеркало грузится здесь
+async def is_jwt_revoked(token: str, payload: Dict, redis: Redis) -> bool:
+    if not _revoked.running and time.monotonic() - _revoked.synced_at > (
+        settings.jwt_revoked_sync_interval
+    ):
+        await sync_revocations(redis)
+
+    key = token_hash(token)
+    if key in _revoked.filter and (
+        await redis.zscore(REVOKED_TOKENS_KEY, key) is not None
+    ):
+        return True
+
+    subject = payload.get("sub")
+    if f"sub:{subject}" in _revoked.filter:
+        revoked_at = await redis.hget(REVOKED_SUBJECTS_KEY, subject)
+        if revoked_at and int(payload.get("iat", 0)) < int(
+            float(revoked_at),
+        ):
+            return True
+
+    return False
@@ -0,0 +1,120 @@
+from itertools import permutations
+from typing import Optional, Sequence
+
+import numpy as np
+
+__all__ = (
+    "ROTATIONS",
+    "shelf_dimensions",
+    "fit_counts",
+    "best_rotations",
+    "unit_volume",
+)
+
+# Все 6 ориентаций коробки, выровненных по осям (длина, ширина, высота)
+ROTATIONS = np.array(list(permutations(range(3))))
+
+
+def shelf_dimensions(parameters: Sequence[Optional[Sequence[float]]]):
+    dims = np.full((len(parameters), 3), np.nan)
+    for index, values in enumerate(parameters):
+        if values and len(values) >= 3:
+            dims[index] = values[:3]
+
+    return dims
+
+
+# Объём одной единицы товара, 0 - если габариты неизвестны
+def unit_volume(parameters: Optional[Sequence[float]]) -> float:
+    dims = parameters or []
+    return float(np.prod(dims[:3])) if len(dims) >= 3 else 0.0
+
+
+def _grid(space: np.ndarray, item: np.ndarray) -> np.ndarray:
+    # space (..., 3), item (R, 3) -> (R, ...): сколько коробок
+    # встаёт ровной решёткой в каждой ориентации
+    counts = np.floor(
+        space[np.newaxis, ...] / item.reshape(
+            (len(item),) + (1,) * (space.ndim - 1) + (3,),
+        ),
+    )
+    return np.prod(np.clip(counts, 0, None), axis=-1)
+
+
+# Guillotine-эвристика: основной блок в лучшей ориентации, затем
+# два остатка (полоса по длине и полоса по ширине под блоком)
+# заполняются независимо в своей лучшей ориентации. Считается сразу
+# для всех полок и всех ориентаций: массивы (6, 6, S)
+def _guillotine(
+    dims: np.ndarray, item: np.ndarray, rotations: np.ndarray,
+) -> np.ndarray:
+    oriented = item[rotations]
+    per_axis = np.floor(
+        dims[np.newaxis, :, :] / oriented[:, np.newaxis, :],
+    )
+    per_axis = np.clip(per_axis, 0, None)
+    main = np.prod(per_axis, axis=-1)
+
+    used = per_axis * oriented[:, np.newaxis, :]
+    length_slab = dims[np.newaxis].repeat(len(rotations), axis=0)
+    length_slab[..., 0] = dims[:, 0] - used[..., 0]
+    width_slab = dims[np.newaxis].repeat(len(rotations), axis=0)
+    width_slab[..., 0] = used[..., 0]
+    width_slab[..., 1] = dims[:, 1] - used[..., 1]
+
+    extra = (
+        _grid(length_slab, oriented).max(axis=0)
+        + _grid(width_slab, oriented).max(axis=0)
+    )
+    return main + extra
+
+
+# Сколько единиц товара помещается на каждую из полок dims.
+# Занятое место считается уложенным снизу: свободная высота
+# уменьшается пропорционально occupied / space. Полки без габаритов
+# (NaN) оцениваются только по свободному объёму
+def fit_counts(
+    item: Sequence[float],
+    dims: np.ndarray,
+    occupied: Optional[np.ndarray] = None,
+    space: Optional[np.ndarray] = None,
+    rotate: bool = True,
+) -> np.ndarray:
+    item = np.asarray(item[:3], dtype=float)
+    if item.shape != (3,) or np.any(item <= 0):
+        return np.zeros(len(dims), dtype=np.int64)
+
+    dims = np.array(dims, dtype=float)
+    known = ~np.isnan(dims).any(axis=1)
+
+    if occupied is not None and space is not None:
+        occupied = np.asarray(occupied, dtype=float)
+        space = np.asarray(space, dtype=float)
+        ratio = np.divide(
+            np.clip(space - occupied, 0, None),
+            space,
+            out=np.zeros_like(space),
+            where=space > 0,
+        )
+        dims[:, 2] *= ratio
+        free_volume = np.clip(space - occupied, 0, None)
+    else:
+        free_volume = np.prod(np.nan_to_num(dims), axis=1)
+
+    rotations = ROTATIONS if rotate else ROTATIONS[:1]
+    counts = np.zeros(len(dims))
+    if known.any():
+        counts[known] = _guillotine(
+            dims[known], item, rotations,
+        ).max(axis=0)
+
+    # геометрия не может дать больше, чем позволяет свободный объём
+    by_volume = np.floor(free_volume / np.prod(item))
+    counts = np.where(known, np.minimum(counts, by_volume), by_volume)
+    return counts.astype(np.int64)
+
+
+def best_rotations(item: Sequence[float], dims: np.ndarray) -> np.ndarray:
+    item = np.asarray(item[:3], dtype=float)
+    dims = np.nan_to_num(np.asarray(dims, dtype=float))
+    return ROTATIONS[_guillotine(dims, item, ROTATIONS).argmax(axis=0)]
@@ -0,0 +1,95 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.backend.core.exc.exceptions.exceptions import BadRequestError
+
+__all__ = (
+    "encode_cursor",
+    "decode_cursor",
+    "keyset_page",
+    "estimate_count",
+)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(
+        [str(value) if isinstance(value, UUID) else value
+         for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise BadRequestError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequestError("Invalid cursor")
+
+    return tuple(values)
+
+
+# Страница по ключу вместо OFFSET: WHERE key > cursor ORDER BY key
+# (descending - WHERE key < cursor ORDER BY key DESC). Берём
+# limit + 1 строку, чтобы понять, есть ли следующая страница
+async def keyset_page(
+    session: AsyncSession,
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    cursor: Optional[str] = None,
+    as_rows: bool = False,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    if cursor:
+        values = [
+            UUID(value) if getattr(key.type, "as_uuid", False) else value
+            for key, value in zip(keys, decode_cursor(cursor, len(keys)))
+        ]
+        if len(keys) == 1:
+            left, right = keys[0], values[0]
+        else:
+            left, right = tuple_(*keys), tuple_(*values)
+
+        query = query.filter(left < right if descending else left > right)
+
+    query = query.order_by(
+        *(key.desc() if descending else key for key in keys),
+    ).limit(limit + 1)
+    if as_rows:
+        rows = list((await session.execute(query)).all())
+    else:
+        rows = list((await session.scalars(query)).all())
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.key) for key in keys])
+
+
+# Оценка числа строк по плану запроса: планировщик берёт её из
+# статистики (pg_class.reltuples + гистограммы), таблицу не читает
+async def estimate_count(session: AsyncSession, query: Select) -> int:
+    compiled = query.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    plan = await session.scalar(
+        text(f"EXPLAIN (FORMAT JSON) {compiled}"),
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,36 @@
+import time
+from uuid import uuid4
+
+from aioredis import Redis
+
+from src.backend.core.utils.redis import LuaScript
+
+__all__ = ("hit_sliding_window",)
+
+# Скользящее окно на sorted set: чистим старые отметки, считаем,
+# и добавляем новую только если лимит не превышен - все атомарно
+SLIDING_WINDOW_LUA = LuaScript("""
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return 1
+""")
+
+
+async def hit_sliding_window(
+    redis: Redis,
+    key: str,
+    limit: int,
+    window: int,
+) -> bool:
+    allowed = await SLIDING_WINDOW_LUA(
+        redis,
+        keys=[key],
+        args=[int(time.time() * 1000), window * 1000, limit, uuid4().hex],
+    )
+    return bool(allowed)
@@ -1,23 +1,26 @@
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator
+import hashlib
+from typing import Any, AsyncGenerator, Sequence
 
 import aioredis as redis
 from aioredis import Redis
-from aioredis.exceptions import RedisError
+from aioredis.exceptions import NoScriptError, RedisError
 
 from src.backend.core.config import settings
 from src.backend.core.utils.date import date_time
 
 
 @asynccontextmanager
-async def get_redis_client() -> AsyncGenerator[Redis, Any]:
+async def _create_redis_client(
+    decode_responses: bool,
+) -> AsyncGenerator[Redis, Any]:
     client = None
     try:
         client = redis.Redis(
             host=settings.redis_host,
             port=settings.redis_port,
             encoding="UTF-8",
-            decode_responses=True,
+            decode_responses=decode_responses,
         )
         yield client
     except RedisError as e:
@@ -27,3 +30,38 @@ async def get_redis_client() -> AsyncGenerator[Redis, Any]:
     finally:
         if client:
             await client.close()
+
+
+@asynccontextmanager
+async def get_redis_client() -> AsyncGenerator[Redis, Any]:
+    async with _create_redis_client(decode_responses=True) as client:
+        yield client
+
+
+# Для бинарных значений (упакованные struct-объекты)
+@asynccontextmanager
+async def get_binary_redis_client() -> AsyncGenerator[Redis, Any]:
+    async with _create_redis_client(decode_responses=False) as client:
+        yield client
+
+
+# Lua-скрипт, описанный один раз на модуль: sha считается при импорте,
+# вызов идёт через EVALSHA на любом клиенте, а EVAL - только если
+# сервер скрипт ещё не видел (после рестарта или SCRIPT FLUSH)
+class LuaScript:
+    __slots__ = ("source", "sha")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def __call__(
+        self,
+        client: Redis,
+        keys: Sequence[Any] = (),
+        args: Sequence[Any] = (),
+    ) -> Any:
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            return await client.eval(self.source, len(keys), *keys, *args)
@@ -0,0 +1,110 @@
+import time
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = (
+    "rect_centers",
+    "distance_matrix",
+    "plan_route",
+)
+
+
+def rect_centers(rects: Sequence[Sequence[float]]) -> np.ndarray:
+    boxes = np.asarray(rects, dtype=float).reshape(-1, 4)
+    return np.column_stack((
+        (boxes[:, 0] + boxes[:, 2]) / 2,
+        (boxes[:, 1] + boxes[:, 3]) / 2,
+    ))
+
+
+# Манхэттенское расстояние ближе к ходьбе по проходам склада
+def distance_matrix(
+    points: np.ndarray, metric: str = "manhattan",
+) -> np.ndarray:
+    diff = points[:, np.newaxis, :] - points[np.newaxis, :, :]
+    if metric == "euclidean":
+        return np.sqrt((diff ** 2).sum(axis=-1))
+
+    return np.abs(diff).sum(axis=-1)
+
+
+def _nearest_neighbour(dist: np.ndarray) -> np.ndarray:
+    size = len(dist)
+    order = np.empty(size, dtype=np.int64)
+    visited = np.zeros(size, dtype=bool)
+    order[0], visited[0] = 0, True
+    for step in range(1, size):
+        row = np.where(visited, np.inf, dist[order[step - 1]])
+        order[step] = row.argmin()
+        visited[order[step]] = True
+
+    return order
+
+
+# 2-opt для открытого пути с фиксированным стартом: для каждого i
+# выигрыш от разворота order[i:j+1] считается сразу по всем j
+def _two_opt(
+    dist: np.ndarray,
+    order: np.ndarray,
+    max_rounds: int,
+    deadline: float,
+) -> np.ndarray:
+    size = len(order)
+    for _ in range(max_rounds):
+        improved = False
+        for i in range(1, size - 1):
+            # на тысяче точек один проход дольше всего бюджета
+            if time.perf_counter() > deadline:
+                return order
+
+            prev = order[i - 1]
+            first = order[i]
+            last = order[i + 1:]
+            after = np.append(order[i + 2:], -1)
+
+            tail = np.where(after >= 0, dist[last, np.maximum(after, 0)], 0)
+            new_tail = np.where(
+                after >= 0, dist[first, np.maximum(after, 0)], 0,
+            )
+            gain = (
+                dist[prev, first] + tail
+                - dist[prev, last] - new_tail
+            )
+            best = int(gain.argmax())
+            if gain[best] > 1e-9:
+                j = i + 1 + best
+                order[i:j + 1] = order[i:j + 1][::-1].copy()
+                improved = True
+
+        if not improved:
+            break
+
+    return order
+
+
+# Маршрут обхода точек из заданного старта, без возврата в старт.
+# 2-opt останавливается по time_budget (сек), результат nearest
+# neighbour при этом не хуже исходного. Возвращает порядок и длину
+def plan_route(
+    points: np.ndarray,
+    start: Optional[Sequence[float]] = None,
+    metric: str = "manhattan",
+    max_rounds: int = 50,
+    time_budget: float = 0.03,
+) -> Tuple[np.ndarray, float]:
+    deadline = time.perf_counter() + time_budget
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if not len(points):
+        return np.empty(0, dtype=np.int64), 0.0
+
+    origin = np.asarray(start if start is not None else (0.0, 0.0), float)
+    nodes = np.vstack((origin, points))
+    dist = distance_matrix(nodes, metric)
+
+    order = _nearest_neighbour(dist)
+    if len(order) > 3:
+        order = _two_opt(dist, order, max_rounds, deadline)
+
+    length = float(dist[order[:-1], order[1:]].sum())
+    return order[1:] - 1, length
@@ -0,0 +1,224 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+__all__ = (
+    "SlottingPlan",
+    "plan_slotting",
+)
+
+
+class SlottingPlan:
+    __slots__ = ("moves", "unplaced", "cost_before", "cost_after")
+
+    def __init__(
+        self,
+        moves: List[Tuple[int, int, int, int]],
+        unplaced: np.ndarray,
+        cost_before: float,
+        cost_after: float,
+    ):
+        # (товар, полка-источник, полка-приёмник, кол-во) - индексы
+        # во входных массивах
+        self.moves = moves
+        self.unplaced = unplaced
+        self.cost_before = cost_before
+        self.cost_after = cost_after
+
+
+# Ожидаемый путь на один подбор: доля запаса на полке * расстояние,
+# взвешенное числом подборов товара
+def _walk_cost(
+    velocity: np.ndarray,
+    stock: np.ndarray,
+    distance: np.ndarray,
+    placements: np.ndarray,
+) -> float:
+    if not len(placements):
+        return 0.0
+
+    product, shelf, quantity = placements.T
+    share = quantity / np.maximum(stock[product], 1)
+    return float((velocity[product] * share * distance[shelf]).sum())
+
+
+def _moves(
+    current: Dict[int, Dict[int, int]],
+    target: Dict[int, Dict[int, int]],
+    distance: np.ndarray,
+) -> List[Tuple[int, int, int, int]]:
+    moves = []
+    for product, placed in current.items():
+        wanted = target.get(product, {})
+        shelves = set(placed) | set(wanted)
+        # излишки снимаем с дальних полок, недостачу закрываем ближними
+        surplus = sorted(
+            (
+                (shelf, placed.get(shelf, 0) - wanted.get(shelf, 0))
+                for shelf in shelves
+                if placed.get(shelf, 0) > wanted.get(shelf, 0)
+            ),
+            key=lambda entry: -distance[entry[0]],
+        )
+        deficit = sorted(
+            (
+                (shelf, wanted.get(shelf, 0) - placed.get(shelf, 0))
+                for shelf in shelves
+                if wanted.get(shelf, 0) > placed.get(shelf, 0)
+            ),
+            key=lambda entry: distance[entry[0]],
+        )
+
+        source = sink = 0
+        while source < len(surplus) and sink < len(deficit):
+            from_shelf, left = surplus[source]
+            to_shelf, missing = deficit[sink]
+            quantity = min(left, missing)
+            moves.append((product, from_shelf, to_shelf, quantity))
+            surplus[source] = (from_shelf, left - quantity)
+            deficit[sink] = (to_shelf, missing - quantity)
+            if left == quantity:
+                source += 1
+            if missing == quantity:
+                sink += 1
+
+    return moves
+
+
+def _reserve(
+    kept: Dict[int, int],
+    placed: Dict[int, int],
+    left: int,
+    distance: np.ndarray,
+) -> None:
+    for place in sorted(placed, key=distance.__getitem__):
+        count = min(left, placed[place] - kept.get(place, 0))
+        if count > 0:
+            kept[place] = kept.get(place, 0) + count
+            left -= count
+        if not left:
+            break
+
+
+# Перераскладка по плотности подбора (cube-per-order index): товары
+# с наибольшим числом подборов на единицу занимаемого объёма ставятся
+# на ближайшие к отгрузке полки. Запас выбранных товаров считается
+# снятым с полок, свободное место - free + снятый объём; для каждого
+# товара ёмкость полок по порядку расстояния считается вектором,
+# а нужный префикс находится через cumsum/searchsorted.
+#
+# То, что не влезло (мешает округление до целых единиц), остаётся
+# на ближних из текущих полок товара. Это место резервируется до
+# раскладки, и проход повторяется, пока не влезает всё остальное:
+# иначе более быстрые товары заняли бы его раньше.
+#
+# velocity, unit_volume - (P,), distance, free - (S,),
+# placements - (N, 3): индекс товара, индекс полки, кол-во.
+# Товары без объёма остаются на своих полках
+def plan_slotting(
+    velocity: np.ndarray,
+    unit_volume: np.ndarray,
+    placements: np.ndarray,
+    distance: np.ndarray,
+    free: np.ndarray,
+) -> SlottingPlan:
+    velocity = np.asarray(velocity, dtype=float)
+    unit_volume = np.asarray(unit_volume, dtype=float)
+    placements = np.asarray(placements, dtype=np.int64).reshape(-1, 3)
+    distance = np.asarray(distance, dtype=float)
+    free = np.clip(np.asarray(free, dtype=float), 0, None)
+    size = len(velocity)
+    if not len(placements):
+        return SlottingPlan([], np.zeros(size, dtype=np.int64), 0.0, 0.0)
+
+    product, shelf, quantity = placements.T
+    stock = np.bincount(product, weights=quantity, minlength=size)
+    movable = unit_volume[product] > 0
+    lifted = np.bincount(
+        shelf[movable],
+        weights=(unit_volume[product] * quantity)[movable],
+        minlength=len(distance),
+    )
+
+    current = defaultdict(dict)
+    for item, place, count in placements.tolist():
+        current[item][place] = current[item].get(place, 0) + count
+
+    cube = unit_volume * stock
+    density = np.divide(
+        velocity, cube, out=np.zeros(size), where=cube > 0,
+    )
+    order = np.argsort(-density, kind="stable").tolist()
+    by_distance = np.argsort(distance, kind="stable")
+    rank = np.empty(len(distance), dtype=np.int64)
+    rank[by_distance] = np.arange(len(distance))
+
+    # товар -> полка -> кол-во, оставленное на месте
+    kept = defaultdict(dict)
+    while True:
+        capacity = (free + lifted)[by_distance]
+        for item, shelves in kept.items():
+            for place, count in shelves.items():
+                capacity[rank[place]] -= count * unit_volume[item]
+
+        target = defaultdict(dict)
+        left_over = {}
+        for item in order:
+            volume = unit_volume[item]
+            if not stock[item]:
+                continue
+
+            if volume <= 0:
+                target[item] = dict(current[item])
+                continue
+
+            target[item] = dict(kept[item])
+            need = int(stock[item]) - sum(kept[item].values())
+            if not need:
+                continue
+
+            # допуск на ошибку округления при делении
+            fits = np.floor(np.clip(capacity, 0, None) / volume + 1e-9)
+            total = np.cumsum(fits)
+            last = min(int(np.searchsorted(total, need)), len(fits) - 1)
+            take = fits[:last + 1].copy()
+            take[last] = min(
+                fits[last], need - (total[last - 1] if last else 0),
+            )
+            capacity[:last + 1] -= take * volume
+
+            for position in np.flatnonzero(take).tolist():
+                place = int(by_distance[position])
+                target[item][place] = (
+                    target[item].get(place, 0) + int(take[position])
+                )
+
+            left = need - int(take.sum())
+            if left:
+                left_over[item] = left
+
+        if not left_over:
+            break
+
+        for item, left in left_over.items():
+            _reserve(kept[item], current[item], left, distance)
+
+    unplaced = np.zeros(size, dtype=np.int64)
+    for item, shelves in kept.items():
+        unplaced[item] = sum(shelves.values())
+
+    planned = np.array(
+        [
+            (item, place, count)
+            for item, shelves in target.items()
+            for place, count in shelves.items()
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    return SlottingPlan(
+        moves=_moves(current, target, distance),
+        unplaced=unplaced,
+        cost_before=_walk_cost(velocity, stock, distance, placements),
+        cost_after=_walk_cost(velocity, stock, distance, planned),
+    )
@@ -0,0 +1,204 @@
+from collections import defaultdict, OrderedDict
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = (
+    "GridIndex",
+    "IndexCache",
+    "normalize_boxes",
+    "spatial_version_key",
+)
+
+# Прямоугольник, задевающий больше ячеек, не раскладывается по сетке,
+# а проверяется в каждом запросе
+MAX_CELLS_PER_BOX = 64
+
+
+def spatial_version_key(warehouse_id: str) -> str:
+    return f"spatial:version:{warehouse_id}"
+
+
+# [x1, y1, x2, y2] в любом порядке углов -> (min x, min y, max x, max y)
+def normalize_boxes(rects: Sequence[Sequence[float]]) -> np.ndarray:
+    boxes = np.asarray(rects, dtype=float).reshape(-1, 4)
+    return np.column_stack((
+        np.minimum(boxes[:, 0], boxes[:, 2]),
+        np.minimum(boxes[:, 1], boxes[:, 3]),
+        np.maximum(boxes[:, 0], boxes[:, 2]),
+        np.maximum(boxes[:, 1], boxes[:, 3]),
+    ))
+
+
+# Равномерная сетка поверх прямоугольников стеллажей: ячейка хранит
+# индексы всех прямоугольников, которые её задевают. Запрос берёт
+# кандидатов из нужных ячеек и добивает точную проверку через NumPy.
+# Размер ячейки по умолчанию - медианный размер стеллажа
+class GridIndex:
+    def __init__(
+        self,
+        ids: Sequence[str],
+        rects: Sequence[Sequence[float]],
+        cell: Optional[float] = None,
+    ):
+        self.ids = list(ids)
+        self.rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        self.boxes = normalize_boxes(self.rects)
+        if cell is None:
+            sizes = np.maximum(
+                self.boxes[:, 2] - self.boxes[:, 0],
+                self.boxes[:, 3] - self.boxes[:, 1],
+            )
+            sizes = sizes[sizes > 0]
+            cell = float(np.median(sizes)) if len(sizes) else 1.0
+
+        self.cell = cell
+        self.large = np.empty(0, dtype=np.int64)
+        self.cells = self._build()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell_range(
+        self, x1: float, y1: float, x2: float, y2: float,
+    ) -> Tuple[int, int, int, int]:
+        return (
+            int(np.floor(x1 / self.cell)),
+            int(np.floor(y1 / self.cell)),
+            int(np.floor(x2 / self.cell)),
+            int(np.floor(y2 / self.cell)),
+        )
+
+    def _build(self) -> Dict[Tuple[int, int], np.ndarray]:
+        cells = defaultdict(list)
+        large = []
+        for index, box in enumerate(self.boxes):
+            cx1, cy1, cx2, cy2 = self._cell_range(*box)
+            if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > MAX_CELLS_PER_BOX:
+                large.append(index)
+                continue
+
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    cells[(cx, cy)].append(index)
+
+        self.large = np.array(large, dtype=np.int64)
+        return {
+            key: np.array(indexes, dtype=np.int64)
+            for key, indexes in cells.items()
+        }
+
+    def _candidates(
+        self, x1: float, y1: float, x2: float, y2: float,
+    ) -> np.ndarray:
+        cx1, cy1, cx2, cy2 = self._cell_range(x1, y1, x2, y2)
+        # большой регион дешевле проверить целиком, чем обходить ячейки
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) >= len(self.cells):
+            return np.arange(len(self.ids))
+
+        found = [self.large] + [
+            self.cells[(cx, cy)]
+            for cx in range(cx1, cx2 + 1)
+            for cy in range(cy1, cy2 + 1)
+            if (cx, cy) in self.cells
+        ]
+        return np.unique(np.concatenate(found))
+
+    def at_point(self, x: float, y: float) -> np.ndarray:
+        candidates = self._candidates(x, y, x, y)
+        boxes = self.boxes[candidates]
+        inside = (
+            (boxes[:, 0] <= x) & (x <= boxes[:, 2])
+            & (boxes[:, 1] <= y) & (y <= boxes[:, 3])
+        )
+        return candidates[inside]
+
+    # contained=False - прямоугольники, пересекающие регион,
+    # contained=True - только целиком лежащие внутри
+    def in_region(
+        self,
+        x1: float,
+        y1: float,
+        x2: float,
+        y2: float,
+        contained: bool = False,
+    ) -> np.ndarray:
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        candidates = self._candidates(x1, y1, x2, y2)
+        boxes = self.boxes[candidates]
+        if contained:
+            match = (
+                (boxes[:, 0] >= x1) & (boxes[:, 2] <= x2)
+                & (boxes[:, 1] >= y1) & (boxes[:, 3] <= y2)
+            )
+        else:
+            match = (
+                (boxes[:, 0] <= x2) & (boxes[:, 2] >= x1)
+                & (boxes[:, 1] <= y2) & (boxes[:, 3] >= y1)
+            )
+
+        return candidates[match]
+
+    # Евклидово расстояние от точки до ближайшей стороны (0 - внутри);
+    # argpartition по всем стеллажам дешевле кольцевого обхода сетки
+    def nearest(
+        self, x: float, y: float, limit: int = 1,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if not len(self.ids):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        dx = np.maximum.reduce((
+            self.boxes[:, 0] - x,
+            np.zeros(len(self.boxes)),
+            x - self.boxes[:, 2],
+        ))
+        dy = np.maximum.reduce((
+            self.boxes[:, 1] - y,
+            np.zeros(len(self.boxes)),
+            y - self.boxes[:, 3],
+        ))
+        distances = np.hypot(dx, dy)
+
+        limit = min(limit, len(distances))
+        closest = np.argpartition(distances, limit - 1)[:limit]
+        closest = closest[np.argsort(distances[closest], kind="stable")]
+        return closest, distances[closest]
+
+
+# Индексы складов в памяти процесса. Версия склада лежит в Redis
+# (spatial_version_key) и увеличивается при изменении стеллажей:
+# индекс с устаревшей версией или старше ttl строится заново
+class IndexCache:
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[str, float, GridIndex]]" = (
+            OrderedDict()
+        )
+
+    def get(self, key: str, version: str) -> Optional[GridIndex]:
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+
+        cached_version, built_at, index = entry
+        if (
+            cached_version != version
+            or time.monotonic() - built_at > self.ttl
+        ):
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return index
+
+    def put(self, key: str, version: str, index: GridIndex) -> None:
+        self.entries[key] = (version, time.monotonic(), index)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self.entries.pop(key, None)
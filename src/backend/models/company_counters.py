@@ -0,0 +1,38 @@
+from sqlalchemy import BigInteger, ForeignKey, SmallInteger, String
+from sqlalchemy.dialects.postgresql import UUID as POSTGRES_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.backend.core.database.metadata import Base
+
+__all__ = ("CompanyCounters",)
+
+
+# Счётчик разбит на шарды: параллельные вставки одной компании
+# обновляют разные строки и не конфликтуют под SERIALIZABLE
+class CompanyCounters(Base):
+    __tablename__ = "company_counters"
+
+    company_id: Mapped[str] = mapped_column(
+        POSTGRES_UUID(as_uuid=True),
+        ForeignKey("companies.company_id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+
+    entity: Mapped[str] = mapped_column(
+        String(31),
+        primary_key=True,
+        nullable=False,
+    )
+
+    shard: Mapped[int] = mapped_column(
+        SmallInteger,
+        primary_key=True,
+        nullable=False,
+    )
+
+    value: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+    )
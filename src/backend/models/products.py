@@ -1,7 +1,8 @@
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import Enum, Float, ForeignKey, String
+from sqlalchemy import (DDL, Enum, event, Float, ForeignKey, func, Index,
+                        literal_column, String)
 from sqlalchemy.dialects.postgresql import ARRAY, UUID as POSTGRES_UUID
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.ext.mutable import MutableList
@@ -10,11 +11,13 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.backend.core.database.metadata import Base
 from src.backend.core.enums import ProductType
 
-__all__ = ("Products",)
+__all__ = ("Products", "product_document", "SEARCH_CONFIG")
 
 
 class Products(Base, AsyncAttrs):
     __tablename__ = "products"
+    # keyset-пагинация внутри компании
+    __table_args__ = (Index(None, "company_id", "item_id"),)
 
     item_id: Mapped[str] = mapped_column(
         POSTGRES_UUID(as_uuid=True),
@@ -27,7 +30,6 @@ class Products(Base, AsyncAttrs):
         POSTGRES_UUID(as_uuid=True),
         ForeignKey("companies.company_id", ondelete="CASCADE"),
         primary_key=True,
-        index=True,
     )
 
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -68,3 +70,33 @@ class Products(Base, AsyncAttrs):
 
     company = relationship("Companies", back_populates="products")
     storage = relationship("Storages", back_populates="items")
+
+
+# Документ для полнотекстового поиска. Конфигурация simple - без
+# стемминга, названия бывают и на русском, и на английском. Запросы
+# должны использовать это же выражение, иначе GIN-индекс не подхватится
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+product_document = func.to_tsvector(SEARCH_CONFIG, Products.name).op("||")(
+    func.to_tsvector(SEARCH_CONFIG, Products.article),
+)
+
+Index("ix_products_document", product_document, postgresql_using="gin")
+Index(
+    "ix_products_name_trgm",
+    Products.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+)
+Index(
+    "ix_products_article_trgm",
+    Products.article,
+    postgresql_using="gin",
+    postgresql_ops={"article": "gin_trgm_ops"},
+)
+
+event.listen(
+    Products.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
@@ -1,7 +1,8 @@
 from datetime import date
 from typing import List
+from uuid import uuid4
 
-from sqlalchemy import Date, ForeignKey
+from sqlalchemy import Date, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB, UUID as POSTGRES_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -12,11 +13,17 @@ __all__ = ("Report",)
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        UniqueConstraint("warehouse_id", "date"),
+        Index(None, "company_id", "date"),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
     report_id: Mapped[str] = mapped_column(
         POSTGRES_UUID(as_uuid=True),
         primary_key=True,
         nullable=False,
+        default=uuid4,
     )
 
     warehouse_id: Mapped[str] = mapped_column(
@@ -33,6 +40,7 @@ class Report(Base):
 
     date: Mapped[date] = mapped_column(
         Date,
+        primary_key=True,
         nullable=False,
     )
 
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import (BigInteger, CheckConstraint, DateTime, ForeignKey,
+                        func)
+from sqlalchemy.dialects.postgresql import UUID as POSTGRES_UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.backend.core.database.metadata import Base
+
+__all__ = ("ShelfItems",)
+
+
+# Размещение товара на полке: одна строка на (полку, товар),
+# количество меняется точечным UPDATE вместо перезаписи массива
+class ShelfItems(Base):
+    __tablename__ = "shelf_items"
+    __table_args__ = (CheckConstraint("quantity >= 0", name="quantity"),)
+
+    shelf_id: Mapped[str] = mapped_column(
+        POSTGRES_UUID(as_uuid=True),
+        ForeignKey("shelves.shelf_id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+
+    item_id: Mapped[str] = mapped_column(
+        POSTGRES_UUID(as_uuid=True),
+        primary_key=True,
+        nullable=False,
+        index=True,
+    )
+
+    quantity: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    shelf = relationship("Shelves", back_populates="placements")
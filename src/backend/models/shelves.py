@@ -41,12 +41,6 @@ class Shelves(Base, AsyncAttrs):
         nullable=False,
     )
 
-    products_list: Mapped[list[str]] = mapped_column(
-        MutableList.as_mutable(ARRAY(POSTGRES_UUID)),
-        default=[],
-        nullable=False,
-    )
-
     space: Mapped[float] = mapped_column(Float, nullable=False)
 
     occupied_space: Mapped[float] = mapped_column(
@@ -64,3 +58,9 @@ class Shelves(Base, AsyncAttrs):
 
     storage = relationship("Storages", back_populates="shelves")
     items = relationship("Products", back_populates="shelves")
+    placements = relationship(
+        "ShelfItems",
+        back_populates="shelf",
+        cascade="all,delete",
+        passive_deletes=True,
+    )
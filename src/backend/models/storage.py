@@ -1,7 +1,8 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Float, ForeignKey, func
+from sqlalchemy import (DateTime, Float, ForeignKey, func, Index,
+                        literal_column)
 from sqlalchemy.dialects.postgresql import ARRAY, UUID as POSTGRES_UUID
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.ext.mutable import MutableList
@@ -9,17 +10,17 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.backend.core.database.metadata import Base
 
-__all__ = ("Storages",)
+__all__ = ("Storages", "storage_box")
 
 
 class Storages(Base, AsyncAttrs):
     __tablename__ = "storages"
+    __table_args__ = (Index(None, "company_id", "storage_id"),)
 
     company_id: Mapped[str] = mapped_column(
         POSTGRES_UUID(as_uuid=True),
         ForeignKey("companies.company_id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     warehouse_id: Mapped[str] = mapped_column(
@@ -61,3 +62,19 @@ class Storages(Base, AsyncAttrs):
         back_populates="storages",
         cascade="all,delete",
     )
+
+
+# Прямоугольник стеллажа как box: box(point, point) сам упорядочивает
+# углы. Запросы должны использовать это же выражение, иначе
+# GiST-индекс ix_storages_box не подхватится. Индексы массива - литералы:
+# с параметрами ($1) общий план не совпал бы с выражением индекса
+def _corner(index: int):
+    return Storages.coordinates[literal_column(str(index))]
+
+
+storage_box = func.box(
+    func.point(_corner(1), _corner(2)),
+    func.point(_corner(3), _corner(4)),
+)
+
+Index("ix_storages_box", storage_box, postgresql_using="gist")
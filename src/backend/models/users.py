@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, func, String
+from sqlalchemy import DateTime, ForeignKey, func, Index, String
 from sqlalchemy.dialects.postgresql import UUID as POSTGRES_UUID
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -14,6 +14,7 @@ __all__ = ("Users",)
 
 class Users(Base, AsyncAttrs):
     __tablename__ = "users"
+    __table_args__ = (Index(None, "company_id", "uuid"),)
 
     uuid: Mapped[str] = mapped_column(
         POSTGRES_UUID(as_uuid=True),
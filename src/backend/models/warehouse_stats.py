@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import UUID as POSTGRES_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.backend.core.database.metadata import Base
+
+__all__ = ("WarehouseStats",)
+
+
+class WarehouseStats(Base):
+    __tablename__ = "warehouse_stats"
+    __table_args__ = (Index(None, "warehouse_id", "hour"),)
+
+    warehouse_id: Mapped[str] = mapped_column(
+        POSTGRES_UUID(as_uuid=True),
+        ForeignKey("warehouses.warehouse_id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+
+    company_id: Mapped[str] = mapped_column(
+        POSTGRES_UUID(as_uuid=True),
+        ForeignKey("companies.company_id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    product_id: Mapped[str] = mapped_column(
+        POSTGRES_UUID(as_uuid=True),
+        primary_key=True,
+        nullable=False,
+    )
+
+    action: Mapped[str] = mapped_column(
+        String(31),
+        primary_key=True,
+        nullable=False,
+    )
+
+    hour: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+    )
+
+    quantity: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+    )
+
+    events: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+    )
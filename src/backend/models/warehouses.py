@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, func, String
+from sqlalchemy import DateTime, ForeignKey, func, Index, String
 from sqlalchemy.dialects.postgresql import UUID as POSTGRES_UUID
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -13,6 +13,7 @@ __all__ = ("Warehouse",)
 
 class Warehouse(Base, AsyncAttrs):
     __tablename__ = "warehouses"
+    __table_args__ = (Index(None, "company_id", "warehouse_id"),)
 
     company_id: Mapped[str] = mapped_column(
         POSTGRES_UUID(as_uuid=True),
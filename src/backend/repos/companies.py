@@ -2,7 +2,8 @@ from typing import (Annotated,
                     Optional)
 
 from fastapi import Depends
-from sqlalchemy import (select,
+from sqlalchemy import (lambda_stmt,
+                        select,
                         update)
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,7 +20,10 @@ class RepoCompany:
 
     async def get_by_id(self, company_id: str) -> Optional[Companies]:
         return await self.session.scalar(
-            select(Companies).filter(Companies.company_id == company_id),
+            lambda_stmt(
+                lambda: select(Companies)
+                .filter(Companies.company_id == company_id),
+            ),
         )
 
     async def get_by_owner_id(self,
@@ -0,0 +1,110 @@
+import random
+from typing import Annotated, Dict, Optional
+
+from fastapi import Depends
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.core.config import settings
+from src.backend.core.database.async_engine import SessionDep
+from src.backend.core.enums import CounterEntity
+from src.backend.models.company_counters import CompanyCounters
+from src.backend.models.products import Products
+from src.backend.models.storage import Storages
+from src.backend.models.users import Users
+from src.backend.models.warehouses import Warehouse
+
+__all__ = ("RepoCounters", "CountersRepoDep", "COUNTED_MODELS")
+
+COUNTED_MODELS = {
+    CounterEntity.products: Products,
+    CounterEntity.users: Users,
+    CounterEntity.warehouses: Warehouse,
+    CounterEntity.storages: Storages,
+}
+
+
+class RepoCounters:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # Выполняется в транзакции вызывающего репозитория,
+    # поэтому счётчик откатывается вместе со вставкой/удалением
+    async def increment(
+        self,
+        company_id: str,
+        entity: CounterEntity,
+        delta: int = 1,
+        shard: Optional[int] = None,
+    ) -> None:
+        if not delta:
+            return
+
+        query = insert(CompanyCounters).values(
+            company_id=company_id,
+            entity=entity.value,
+            shard=(
+                random.randrange(settings.counter_shards)
+                if shard is None else shard
+            ),
+            value=delta,
+        )
+        await self.session.execute(
+            query.on_conflict_do_update(
+                index_elements=[
+                    CompanyCounters.company_id,
+                    CompanyCounters.entity,
+                    CompanyCounters.shard,
+                ],
+                set_={"value": CompanyCounters.value + query.excluded.value},
+            ),
+        )
+
+    async def get(
+        self, company_id: str, entity: CounterEntity,
+    ) -> Optional[int]:
+        return await self.session.scalar(
+            select(func.sum(CompanyCounters.value)).filter(
+                CompanyCounters.company_id == company_id,
+                CompanyCounters.entity == entity.value,
+            ),
+        )
+
+    # Сверка с реальными count(*): расхождение дописывается дельтой
+    # в нулевой шард, остальные шарды не трогаем
+    async def reconcile(self, entity: CounterEntity) -> Dict[str, int]:
+        model = COUNTED_MODELS[entity]
+        actual = dict(
+            (await self.session.execute(
+                select(model.company_id, func.count())
+                .group_by(model.company_id),
+            )).all(),
+        )
+        stored = dict(
+            (await self.session.execute(
+                select(CompanyCounters.company_id, func.sum(
+                    CompanyCounters.value,
+                ))
+                .filter(CompanyCounters.entity == entity.value)
+                .group_by(CompanyCounters.company_id),
+            )).all(),
+        )
+
+        drift = {}
+        for company_id in actual.keys() | stored.keys():
+            delta = actual.get(company_id, 0) - int(
+                stored.get(company_id) or 0,
+            )
+            if delta:
+                await self.increment(company_id, entity, delta, shard=0)
+                drift[str(company_id)] = delta
+
+        return drift
+
+
+async def create_counters_repo(session: SessionDep) -> RepoCounters:
+    return RepoCounters(session)
+
+
+CountersRepoDep = Annotated[RepoCounters, Depends(create_counters_repo)]
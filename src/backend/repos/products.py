@@ -1,46 +1,77 @@
-from typing import Annotated, List, Optional, Tuple
+import re
+from typing import Annotated, List, Optional, Tuple, Type, TypeVar
 
 from fastapi import Depends
-from sqlalchemy import func, select, update
+from pydantic import BaseModel
+from sqlalchemy import (case, cast, Float, func, lambda_stmt, literal, or_,
+                        select, Select, update)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.core.database.async_engine import SessionDep
-from src.backend.models.products import Products
+from src.backend.core.enums import CounterEntity
+from src.backend.core.utils.dto_refactor import dto_columns, rows_to_dto
+from src.backend.core.utils.pagination import estimate_count, keyset_page
+from src.backend.models.products import (product_document, Products,
+                                         SEARCH_CONFIG)
+from src.backend.repos.counters import RepoCounters
 
 __all__ = ("RepoProducts", "ProductsRepoDep")
 
+T = TypeVar("T", bound=BaseModel)
+
+SEARCH_WORD = re.compile(r"\w+")
+
+
+def _like_prefix(value: str) -> str:
+    escaped = (
+        value.replace("\\", "\\\\")
+        .replace("%", "\\%")
+        .replace("_", "\\_")
+    )
+    return f"{escaped}%"
+
 
 class RepoProducts:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.counters = RepoCounters(session)
 
     async def get_by_id(
             self, item_id: str, company_id: str,
     ) -> Optional[Products]:
         return await self.session.scalar(
-            select(Products).filter(
-                Products.item_id == item_id,
-                Products.company_id == company_id,
+            lambda_stmt(
+                lambda: select(Products).filter(
+                    Products.item_id == item_id,
+                    Products.company_id == company_id,
+                ),
             ),
         )
 
     async def get_by_article(self, article: str) -> Optional[Products]:
         return await self.session.scalar(
-            select(Products).filter(
-                Products.article == article,
+            lambda_stmt(
+                lambda: select(Products).filter(
+                    Products.article == article,
+                ),
             ),
         )
 
     async def get_by_barcode(self, barcode: str) -> Optional[Products]:
         return await self.session.scalar(
-            select(Products).filter(
-                Products.barcode == barcode,
+            lambda_stmt(
+                lambda: select(Products).filter(
+                    Products.barcode == barcode,
+                ),
             ),
         )
 
     async def insert(self, product: Products) -> Products:
         self.session.add(product)
         await self.session.flush()
+        await self.counters.increment(
+            product.company_id, CounterEntity.products,
+        )
         await self.session.refresh(product)
         return product
 
@@ -62,27 +93,120 @@ class RepoProducts:
         if product:
             await self.session.delete(product)
             await self.session.flush()
+            await self.counters.increment(
+                company_id, CounterEntity.products, -1,
+            )
 
     async def get_all(
-            self,
-            company_id: str,
-            limit: int = 50,
-            offset: int = 0,
-    ) -> Tuple[List[Products], int]:
+        self,
+        company_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Tuple[List[Products], Optional[str], Optional[int]]:
+        query = select(Products).filter(Products.company_id == company_id)
+        products, next_cursor = await keyset_page(
+            self.session, query, (Products.item_id,), limit, cursor,
+        )
+        total = None
+        if with_total:
+            total = await self._total(company_id, query)
+
+        return products, next_cursor, total
+
+    # Для чтения списков: колонки выбираются сразу под DTO,
+    # ORM-объекты Products не создаются
+    async def get_all_dto(
+        self,
+        company_id: str,
+        dto: Type[T],
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Tuple[List[T], Optional[str], Optional[int]]:
         query = (
-            select(Products)
+            select(*dto_columns(Products, dto))
             .filter(Products.company_id == company_id)
-            .limit(limit)
-            .offset(offset)
         )
-        result = await self.session.scalars(query)
-        count_query = (
-            select(func.count())
-            .select_from(Products)
-            .filter(Products.company_id == company_id)
+        rows, next_cursor = await keyset_page(
+            self.session,
+            query,
+            (Products.item_id,),
+            limit,
+            cursor,
+            as_rows=True,
         )
-        total = await self.session.scalar(count_query)
-        return list(result.all()), total
+        total = None
+        if with_total:
+            total = await self._total(company_id, query)
+
+        return rows_to_dto(rows, dto), next_cursor, total
+
+    # Весь каталог строками под DTO, без ORM-объектов
+    async def get_catalog_dto(self, dto: Type[T]) -> List[T]:
+        rows = await self.session.execute(select(*dto_columns(Products, dto)))
+        return rows_to_dto(rows.all(), dto)
+
+    # Поиск по названию и артикулу: слова и их префиксы - через
+    # tsvector, префикс строки и опечатки - через pg_trgm (ILIKE и <%).
+    # Сортировка по score, страницы - keyset по (score, item_id)
+    async def search_dto(
+        self,
+        company_id: str,
+        text: str,
+        dto: Type[T],
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[T], Optional[str]]:
+        prefix = _like_prefix(text)
+        name_prefix = Products.name.ilike(prefix, escape="\\")
+        article_prefix = Products.article.ilike(prefix, escape="\\")
+        conditions = [
+            name_prefix,
+            article_prefix,
+            literal(text).op("<%")(Products.name),
+            literal(text).op("<%")(Products.article),
+        ]
+        score = (
+            func.word_similarity(text, Products.name)
+            + func.similarity(Products.article, text)
+            + case((article_prefix, 1.0), else_=0.0)
+            + case((name_prefix, 0.5), else_=0.0)
+        )
+
+        words = SEARCH_WORD.findall(text.lower())
+        if words:
+            query = func.to_tsquery(
+                SEARCH_CONFIG, " & ".join(f"{word}:*" for word in words),
+            )
+            conditions.append(product_document.op("@@")(query))
+            score = score + func.ts_rank(product_document, query)
+
+        found = (
+            select(
+                *dto_columns(Products, dto),
+                cast(score, Float).label("score"),
+            )
+            .filter(Products.company_id == company_id, or_(*conditions))
+            .subquery("found")
+        )
+        rows, next_cursor = await keyset_page(
+            self.session,
+            select(found),
+            (found.c.score, found.c.item_id),
+            limit,
+            cursor,
+            as_rows=True,
+            descending=True,
+        )
+        return rows_to_dto(rows, dto), next_cursor
+
+    async def _total(self, company_id: str, query: Select) -> int:
+        total = await self.counters.get(company_id, CounterEntity.products)
+        if total is None:
+            total = await estimate_count(self.session, query)
+
+        return total
 
 
 async def create_products_repo(session: SessionDep) -> RepoProducts:
@@ -1,15 +1,21 @@
-from typing import Annotated, List, Optional
+from collections import defaultdict
+from typing import Annotated, Any, Dict, List, Optional, Tuple
 
 from fastapi import Depends
-from sqlalchemy import func, select
+from sqlalchemy import (BigInteger, column, delete, Float, func, lambda_stmt,
+                        Row, select, update, values)
+from sqlalchemy.dialects.postgresql import insert, UUID as POSTGRES_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.core.database.async_engine import SessionDep
-from src.backend.core.enums import StopListReason
+from src.backend.core.enums import CounterEntity, StopListReason
+from src.backend.core.utils.pagination import estimate_count, keyset_page
 from src.backend.models.products import Products
+from src.backend.models.shelf_items import ShelfItems
 from src.backend.models.shelves import Shelves
 from src.backend.models.stoplist import StopList
-from src.backend.models.storage import Storages
+from src.backend.models.storage import storage_box, Storages
+from src.backend.repos.counters import RepoCounters
 
 __all__ = ("RepoStorage", "StorageRepoDep")
 
@@ -17,34 +23,34 @@ __all__ = ("RepoStorage", "StorageRepoDep")
 class RepoStorage:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.counters = RepoCounters(session)
 
     async def get_by_id(self, storage_id: str) -> Optional[Storages]:
         return await self.session.scalar(
-            select(Storages).filter(Storages.storage_id == storage_id),
+            lambda_stmt(
+                lambda: select(Storages)
+                .filter(Storages.storage_id == storage_id),
+            ),
         )
 
     async def get_all(
         self,
         company_id: str,
         limit: int = 50,
-        offset: int = 0,
-    ) -> tuple[List[Storages], int]:
-        query = (
-            select(Storages)
-            .filter(Storages.company_id == company_id)
-            .limit(limit)
-            .offset(offset)
-        )
-        users_result = await self.session.scalars(query)
-
-        count_query = (
-            select(func.count())
-            .select_from(Storages)
-            .filter(Storages.company_id == company_id)
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Tuple[List[Storages], Optional[str], Optional[int]]:
+        query = select(Storages).filter(Storages.company_id == company_id)
+        storages, next_cursor = await keyset_page(
+            self.session, query, (Storages.storage_id,), limit, cursor,
         )
-        total = await self.session.scalar(count_query)
+        total = None
+        if with_total:
+            total = await self.counters.get(company_id, CounterEntity.storages)
+            if total is None:
+                total = await estimate_count(self.session, query)
 
-        return list(users_result.all()), total
+        return storages, next_cursor, total
 
     async def get_storage_by_warehouse(
         self,
@@ -70,6 +76,9 @@ class RepoStorage:
     async def insert_storage(self, storage: Storages) -> Storages:
         self.session.add(storage)
         await self.session.flush()
+        await self.counters.increment(
+            storage.company_id, CounterEntity.storages,
+        )
         await self.session.refresh(storage)
         return storage
 
@@ -77,6 +86,9 @@ class RepoStorage:
         storage = await self.get_by_id(storage_id)
         await self.session.delete(storage)
         await self.session.flush()
+        await self.counters.increment(
+            storage.company_id, CounterEntity.storages, -1,
+        )
 
     async def insert_shelf(self, shelf: Shelves) -> Shelves:
         self.session.add(shelf)
@@ -89,6 +101,244 @@ class RepoStorage:
         await self.session.delete(shelf)
         await self.session.flush()
 
+    # Одним запросом по индексу shelf_items.item_id:
+    # все полки компании, где лежит товар, с количеством
+    async def locate_product(
+        self,
+        item_id: str,
+        company_id: str,
+        warehouse_id: Optional[str] = None,
+    ) -> List[Row]:
+        query = (
+            select(
+                ShelfItems.shelf_id,
+                Shelves.storage_id,
+                Storages.warehouse_id,
+                ShelfItems.quantity,
+            )
+            .join(Shelves, Shelves.shelf_id == ShelfItems.shelf_id)
+            .join(Storages, Storages.storage_id == Shelves.storage_id)
+            .filter(
+                ShelfItems.item_id == item_id,
+                ShelfItems.quantity > 0,
+                Storages.company_id == company_id,
+            )
+            .order_by(Storages.warehouse_id, Shelves.storage_id)
+        )
+        if warehouse_id:
+            query = query.filter(Storages.warehouse_id == warehouse_id)
+
+        return list((await self.session.execute(query)).all())
+
+    async def get_warehouse_shelves(self, warehouse_id: str) -> List[Row]:
+        return list((await self.session.execute(
+            select(
+                Shelves.shelf_id,
+                Shelves.storage_id,
+                Shelves.space,
+                Shelves.occupied_space,
+                Storages.coordinates,
+            )
+            .join(Storages, Storages.storage_id == Shelves.storage_id)
+            .filter(Storages.warehouse_id == warehouse_id),
+        )).all())
+
+    async def get_storage_boxes(self, warehouse_id: str) -> List[Row]:
+        return list((await self.session.execute(
+            select(Storages.storage_id, Storages.coordinates)
+            .filter(
+                Storages.warehouse_id == warehouse_id,
+                func.cardinality(Storages.coordinates) == 4,
+            ),
+        )).all())
+
+    # Пространственные запросы через GiST ix_storages_box
+    async def find_storages_at_point(
+        self, warehouse_id: str, x: float, y: float,
+    ) -> List[Row]:
+        return list((await self.session.execute(
+            select(Storages.storage_id, Storages.coordinates)
+            .filter(
+                Storages.warehouse_id == warehouse_id,
+                storage_box.op("@>")(func.point(x, y)),
+            ),
+        )).all())
+
+    async def find_storages_in_region(
+        self,
+        warehouse_id: str,
+        region: Tuple[float, float, float, float],
+        contained: bool = False,
+    ) -> List[Row]:
+        x1, y1, x2, y2 = region
+        area = func.box(func.point(x1, y1), func.point(x2, y2))
+        return list((await self.session.execute(
+            select(Storages.storage_id, Storages.coordinates)
+            .filter(
+                Storages.warehouse_id == warehouse_id,
+                storage_box.op("<@" if contained else "&&")(area),
+            ),
+        )).all())
+
+    async def find_nearest_storages(
+        self, warehouse_id: str, x: float, y: float, limit: int = 1,
+    ) -> List[Row]:
+        distance = storage_box.op("<->")(func.point(x, y))
+        return list((await self.session.execute(
+            select(
+                Storages.storage_id,
+                Storages.coordinates,
+                distance.label("distance"),
+            )
+            .filter(Storages.warehouse_id == warehouse_id)
+            .order_by(distance)
+            .limit(limit),
+        )).all())
+
+    # Все размещения товаров заказа на складе одним запросом,
+    # от полок с наибольшим остатком
+    async def get_placements(
+        self, warehouse_id: str, item_ids: List[str],
+    ) -> List[Row]:
+        return list((await self.session.execute(
+            select(
+                ShelfItems.shelf_id,
+                ShelfItems.item_id,
+                ShelfItems.quantity,
+                Shelves.storage_id,
+                Storages.coordinates,
+            )
+            .join(Shelves, Shelves.shelf_id == ShelfItems.shelf_id)
+            .join(Storages, Storages.storage_id == Shelves.storage_id)
+            .filter(
+                Storages.warehouse_id == warehouse_id,
+                ShelfItems.item_id.in_(item_ids),
+                ShelfItems.quantity > 0,
+            )
+            .order_by(ShelfItems.item_id, ShelfItems.quantity.desc()),
+        )).all())
+
+    # Пакетное списание: один UPDATE ... FROM (VALUES ...), строка
+    # меняется только при достаточном остатке. Вызывающий сверяет
+    # число вернувшихся строк с запрошенным
+    async def take_shelf_items(
+        self, lines: List[Tuple[str, str, int]],
+    ) -> List[Row]:
+        requested = values(
+            column("shelf_id", POSTGRES_UUID(as_uuid=True)),
+            column("item_id", POSTGRES_UUID(as_uuid=True)),
+            column("quantity", BigInteger),
+            name="requested",
+        ).data(lines)
+        taken = list((await self.session.execute(
+            update(ShelfItems)
+            .filter(
+                ShelfItems.shelf_id == requested.c.shelf_id,
+                ShelfItems.item_id == requested.c.item_id,
+                ShelfItems.quantity >= requested.c.quantity,
+            )
+            .values(
+                quantity=ShelfItems.quantity - requested.c.quantity,
+                updated_at=func.now(),
+            )
+            .returning(
+                ShelfItems.shelf_id,
+                ShelfItems.item_id,
+                ShelfItems.quantity,
+            )
+            .execution_options(synchronize_session=False),
+        )).all())
+
+        empty = [row.shelf_id for row in taken if row.quantity == 0]
+        if empty:
+            await self.session.execute(
+                delete(ShelfItems)
+                .filter(
+                    ShelfItems.shelf_id.in_(empty),
+                    ShelfItems.quantity == 0,
+                )
+                .execution_options(synchronize_session=False),
+            )
+
+        return taken
+
+    async def release_shelves_space(
+        self, volumes: Dict[str, float],
+    ) -> None:
+        freed = values(
+            column("shelf_id", POSTGRES_UUID(as_uuid=True)),
+            column("volume", Float),
+            name="freed",
+        ).data(sorted(volumes.items()))
+        await self.session.execute(
+            update(Shelves)
+            .filter(Shelves.shelf_id == freed.c.shelf_id)
+            .values(
+                occupied_space=func.greatest(
+                    Shelves.occupied_space - freed.c.volume, 0.0,
+                ),
+            )
+            .execution_options(synchronize_session=False),
+        )
+
+    async def get_products_by_ids(
+        self, item_ids: List[str],
+    ) -> Dict[str, Products]:
+        products = await self.session.scalars(
+            select(Products).filter(Products.item_id.in_(item_ids)),
+        )
+        return {str(product.item_id): product for product in products}
+
+    # Условный атомарный UPDATE: место резервируется, только если
+    # его хватает на момент записи. None - полку уже заняли
+    async def reserve_shelf_space(
+        self, shelf_id: str, volume: float,
+    ) -> Optional[float]:
+        return await self.session.scalar(
+            update(Shelves)
+            .filter(
+                Shelves.shelf_id == shelf_id,
+                Shelves.occupied_space + volume <= Shelves.space,
+            )
+            .values(occupied_space=Shelves.occupied_space + volume)
+            .returning(Shelves.space - Shelves.occupied_space)
+            .execution_options(synchronize_session=False),
+        )
+
+    async def add_shelf_item(
+        self, shelf_id: str, item_id: str, quantity: int,
+    ) -> int:
+        query = insert(ShelfItems).values(
+            shelf_id=shelf_id, item_id=item_id, quantity=quantity,
+        )
+        return await self.session.scalar(
+            query.on_conflict_do_update(
+                index_elements=[ShelfItems.shelf_id, ShelfItems.item_id],
+                set_={
+                    "quantity": ShelfItems.quantity + query.excluded.quantity,
+                    "updated_at": func.now(),
+                },
+            ).returning(ShelfItems.quantity),
+        )
+
+    async def get_shelf_items(
+        self, shelf_ids: List[str],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        result = await self.session.execute(
+            select(
+                ShelfItems.shelf_id,
+                ShelfItems.item_id,
+                ShelfItems.quantity,
+            ).filter(ShelfItems.shelf_id.in_(shelf_ids)),
+        )
+        items = defaultdict(list)
+        for shelf_id, item_id, quantity in result.all():
+            items[str(shelf_id)].append(
+                {"item_id": str(item_id), "quantity": quantity},
+            )
+
+        return items
+
     async def get_shelves_by_storage(
         self,
         storage_id: str,
@@ -101,12 +351,16 @@ class RepoStorage:
 
     async def get_shelf_by_id(self, shelf_id: str) -> Optional[Shelves]:
         return await self.session.scalar(
-            select(Shelves).filter(Shelves.shelf_id == shelf_id),
+            lambda_stmt(
+                lambda: select(Shelves).filter(Shelves.shelf_id == shelf_id),
+            ),
         )
 
     async def get_product_by_barcode(self, barcode: str) -> Optional[Products]:
         return await self.session.scalar(
-            select(Products).filter(Products.barcode == barcode),
+            lambda_stmt(
+                lambda: select(Products).filter(Products.barcode == barcode),
+            ),
         )
 
     async def get_product_by_article(self, article: str) -> Optional[Products]:
@@ -116,7 +370,10 @@ class RepoStorage:
 
     async def get_product_by_id(self, product_id: str) -> Optional[Products]:
         return await self.session.scalar(
-            select(Products).filter(Products.item_id == product_id),
+            lambda_stmt(
+                lambda: select(Products)
+                .filter(Products.item_id == product_id),
+            ),
         )
 
     async def insert_stoplist_entry(
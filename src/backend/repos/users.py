@@ -1,14 +1,18 @@
-from typing import Annotated, List, Optional
+from typing import Annotated, List, Optional, Tuple
 
 from fastapi import Depends
-from sqlalchemy import func, select, update
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.backend.core.database.async_engine import SessionDep
+from src.backend.core.enums import AccessLevel, CounterEntity
+from src.backend.core.utils.pagination import estimate_count, keyset_page
 from src.backend.models.access_level import UserAccess
 from src.backend.models.companies import Companies
 from src.backend.models.users import Users
+from src.backend.models.warehouses import Warehouse
+from src.backend.repos.counters import RepoCounters
 
 __all__ = ("RepoUsers", "UsersReposDep")
 
@@ -16,11 +20,14 @@ __all__ = ("RepoUsers", "UsersReposDep")
 class RepoUsers:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.counters = RepoCounters(session)
 
     async def get_by_id(self, uuid: str) -> Optional[Users]:
         return await self.session.scalar(
-            select(Users).filter(
-                Users.uuid == uuid,
+            lambda_stmt(
+                lambda: select(Users).filter(
+                    Users.uuid == uuid,
+                ),
             ),
         )
 
@@ -29,8 +36,22 @@ class RepoUsers:
         phone_number: str,
     ) -> Optional[Users]:
         return await self.session.scalar(
-            select(Users).filter(
-                Users.number == phone_number,
+            lambda_stmt(
+                lambda: select(Users).filter(
+                    Users.number == phone_number,
+                ),
+            ),
+        )
+
+    async def get_by_number_with_access(
+        self,
+        phone_number: str,
+    ) -> Optional[Users]:
+        return await self.session.scalar(
+            lambda_stmt(
+                lambda: select(Users)
+                .options(selectinload(Users.access))
+                .filter(Users.number == phone_number),
             ),
         )
 
@@ -56,29 +77,39 @@ class RepoUsers:
 
         return await self.session.scalar(query)
 
-    async def check_user_access_combined(
-            self, user_id: str, company_id: str, warehouse_id: str,
-    ) -> dict:
-        query = select(Companies.owner_id, UserAccess.access_level)
-
-        query = query.outerjoin(
-            UserAccess,
-            (UserAccess.id == user_id) & (
-                UserAccess.warehouse_id == warehouse_id,
-            ),
+    async def get_owned_warehouses(
+            self, user_id: str,
+    ) -> list[tuple[str, Optional[str]]]:
+        result = await self.session.execute(
+            select(Companies.company_id, Warehouse.warehouse_id)
+            .outerjoin(
+                Warehouse, Warehouse.company_id == Companies.company_id,
+            )
+            .filter(Companies.owner_id == user_id),
         )
+        return list(result.tuples().all())
+
+    async def get_access_with_company(
+            self, user_id: str,
+    ) -> list[tuple[str, AccessLevel, str]]:
+        result = await self.session.execute(
+            select(
+                UserAccess.warehouse_id,
+                UserAccess.access_level,
+                Warehouse.company_id,
+            )
+            .join(Warehouse, Warehouse.warehouse_id == UserAccess.warehouse_id)
+            .filter(UserAccess.id == user_id),
+        )
+        return list(result.tuples().all())
 
-        query = query.join(Companies, Companies.company_id == company_id)
-
-        query = query.where(Companies.company_id == company_id)
-
-        result = await self.session.execute(query)
-        row = result.fetchone()
-
-        return {
-            "owner_id": row.owner_id if row else None,
-            "access_level": row.access_level if row else None,
-        }
+    async def get_warehouse_user_ids(self, warehouse_id: str) -> List[str]:
+        result = await self.session.scalars(
+            select(UserAccess.id)
+            .filter(UserAccess.warehouse_id == warehouse_id)
+            .distinct(),
+        )
+        return [str(user_id) for user_id in result]
 
     async def get_by_auth(
         self,
@@ -105,6 +136,7 @@ class RepoUsers:
     ) -> Users:
         self.session.add(user)
         await self.session.flush()
+        await self.counters.increment(user.company_id, CounterEntity.users)
         await self.session.refresh(user)
         return user
 
@@ -112,6 +144,21 @@ class RepoUsers:
         user = await self.get_by_id(uuid)
         await self.session.delete(user)
         await self.session.flush()
+        await self.counters.increment(
+            user.company_id, CounterEntity.users, -1,
+        )
+
+    # Перевод в другую компанию: счётчики обеих компаний меняются
+    # в той же транзакции
+    async def move(self, user: Users, company_id: str) -> None:
+        previous = user.company_id
+        if str(previous) == str(company_id):
+            return
+
+        user.company_id = company_id
+        await self.session.flush()
+        await self.counters.increment(previous, CounterEntity.users, -1)
+        await self.counters.increment(company_id, CounterEntity.users)
 
     async def update_token_by_id(
         self,
@@ -129,24 +176,20 @@ class RepoUsers:
         self,
         company_id: str,
         limit: int = 50,
-        offset: int = 0,
-    ) -> tuple[List[Users], int]:
-        query = (
-            select(Users)
-            .filter(Users.company_id == company_id)
-            .limit(limit)
-            .offset(offset)
-        )
-        users_result = await self.session.scalars(query)
-
-        count_query = (
-            select(func.count())
-            .select_from(Users)
-            .filter(Users.company_id == company_id)
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Tuple[List[Users], Optional[str], Optional[int]]:
+        query = select(Users).filter(Users.company_id == company_id)
+        users, next_cursor = await keyset_page(
+            self.session, query, (Users.uuid,), limit, cursor,
         )
-        total = await self.session.scalar(count_query)
+        total = None
+        if with_total:
+            total = await self.counters.get(company_id, CounterEntity.users)
+            if total is None:
+                total = await estimate_count(self.session, query)
 
-        return list(users_result.all()), total
+        return users, next_cursor, total
 
 
 async def create_user_repo(session: SessionDep) -> RepoUsers:
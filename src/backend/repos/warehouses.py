@@ -1,12 +1,16 @@
-from typing import Annotated, List, Optional
+from typing import Annotated, List, Optional, Tuple
 
 from fastapi import Depends
-from sqlalchemy import func, select, update
+from sqlalchemy import func, lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped
 
 from src.backend.core.database.async_engine import SessionDep
+from src.backend.core.enums import CounterEntity
+from src.backend.core.utils.pagination import estimate_count, keyset_page
+from src.backend.models.storage import Storages
 from src.backend.models.warehouses import Warehouse
+from src.backend.repos.counters import RepoCounters
 
 __all__ = ("RepoWarehouse", "WarehouseRepoDep")
 
@@ -14,10 +18,14 @@ __all__ = ("RepoWarehouse", "WarehouseRepoDep")
 class RepoWarehouse:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.counters = RepoCounters(session)
 
     async def get_by_id(self, warehouse_id: str) -> Optional[Warehouse]:
         return await self.session.scalar(
-            select(Warehouse).filter(Warehouse.warehouse_id == warehouse_id),
+            lambda_stmt(
+                lambda: select(Warehouse)
+                .filter(Warehouse.warehouse_id == warehouse_id),
+            ),
         )
 
     async def get_company_by_warehouse(
@@ -26,16 +34,43 @@ class RepoWarehouse:
         data = await self.get_by_id(warehouse_id)
         return data.company_id
 
+    async def get_company_ids(
+            self, warehouse_ids: List[str],
+    ) -> dict[str, str]:
+        result = await self.session.execute(
+            select(Warehouse.warehouse_id, Warehouse.company_id)
+            .filter(Warehouse.warehouse_id.in_(warehouse_ids)),
+        )
+        return {
+            str(warehouse_id): str(company_id)
+            for warehouse_id, company_id in result.all()
+        }
+
     async def insert(self, warehouse: Warehouse) -> Warehouse:
         self.session.add(warehouse)
         await self.session.flush()
+        await self.counters.increment(
+            warehouse.company_id, CounterEntity.warehouses,
+        )
         await self.session.refresh(warehouse)
         return warehouse
 
     async def delete(self, warehouse_id: str) -> None:
         warehouse = await self.get_by_id(warehouse_id)
+        # хранилища склада удаляются каскадно, их счётчик тоже уменьшаем
+        storages = await self.session.scalar(
+            select(func.count())
+            .select_from(Storages)
+            .filter(Storages.warehouse_id == warehouse_id),
+        )
         await self.session.delete(warehouse)
         await self.session.flush()
+        await self.counters.increment(
+            warehouse.company_id, CounterEntity.warehouses, -1,
+        )
+        await self.counters.increment(
+            warehouse.company_id, CounterEntity.storages, -storages,
+        )
 
     async def update(
         self,
@@ -72,24 +107,22 @@ class RepoWarehouse:
         self,
         company_id: str,
         limit: int = 50,
-        offset: int = 0,
-    ) -> tuple[List[Warehouse], int]:
-        query = (
-            select(Warehouse)
-            .filter(Warehouse.company_id == company_id)
-            .limit(limit)
-            .offset(offset)
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Tuple[List[Warehouse], Optional[str], Optional[int]]:
+        query = select(Warehouse).filter(Warehouse.company_id == company_id)
+        warehouses, next_cursor = await keyset_page(
+            self.session, query, (Warehouse.warehouse_id,), limit, cursor,
         )
-        users_result = await self.session.scalars(query)
-
-        count_query = (
-            select(func.count())
-            .select_from(Warehouse)
-            .filter(Warehouse.company_id == company_id)
-        )
-        total = await self.session.scalar(count_query)
+        total = None
+        if with_total:
+            total = await self.counters.get(
+                company_id, CounterEntity.warehouses,
+            )
+            if total is None:
+                total = await estimate_count(self.session, query)
 
-        return list(users_result.all()), total
+        return warehouses, next_cursor, total
 
 
 async def create_warehouse_repo(session: SessionDep) -> RepoWarehouse:
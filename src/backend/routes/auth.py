@@ -0,0 +1,20 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Security
+
+from src.backend.services.auth.deps import api_key, AuthUserDep
+from src.backend.services.auth.service import AuthenticationServiceDep
+
+__all__ = ("router",)
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+# Отзывает предъявленный токен; AuthUserDep проверяет, что он ещё жив
+@router.post("/logout", status_code=204)
+async def logout(
+    token: Annotated[str, Security(api_key)],
+    user: AuthUserDep,
+    auth_service: AuthenticationServiceDep,
+) -> None:
+    await auth_service.logout(token)
@@ -0,0 +1,18 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from src.backend.core.database.async_engine import get_pool_stats
+from src.backend.services.users.deps import CEODep
+
+__all__ = ("router",)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/db")
+async def get_db_pool_metrics(
+    company_id: str,
+    user: CEODep,
+) -> Dict[str, Dict[str, Any]]:
+    return get_pool_stats()
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+
+from src.backend.core.database.transactions import atomic_writes, read_only
+from src.backend.schemes.picking import (PickRequestDTO, PickResponseDTO,
+                                         PickRouteRequestDTO,
+                                         PickRouteResponseDTO)
+from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.picking.service import PickingServiceDep
+
+__all__ = ("router",)
+
+router = APIRouter(
+    prefix="/companies/{company_id}/warehouses/{warehouse_id}/picks",
+    tags=["picking"],
+)
+
+
+@router.post(
+    "",
+    response_model=PickResponseDTO,
+    dependencies=[Depends(atomic_writes)],
+)
+async def pick_items(
+    company_id: str,
+    warehouse_id: str,
+    data: PickRequestDTO,
+    user: AuthUserDep,
+    picking_service: PickingServiceDep,
+) -> PickResponseDTO:
+    return await picking_service.pick(user, company_id, warehouse_id, data)
+
+
+@router.post(
+    "/route",
+    response_model=PickRouteResponseDTO,
+    dependencies=[Depends(read_only)],
+)
+async def plan_pick_route(
+    company_id: str,
+    warehouse_id: str,
+    data: PickRouteRequestDTO,
+    user: AuthUserDep,
+    picking_service: PickingServiceDep,
+) -> PickRouteResponseDTO:
+    return await picking_service.route(user, company_id, warehouse_id, data)
@@ -0,0 +1,70 @@
+from typing import Annotated, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+
+from src.backend.core.database.transactions import read_only
+from src.backend.schemes.item_list import ProductSearchResponseDTO
+from src.backend.schemes.product_locate import (ProductLocateResponseDTO,
+                                                ProductScanResponseDTO)
+from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.products.scan import ScanServiceDep
+from src.backend.services.products.service import ProductServiceDep
+from src.backend.services.storages.service import StorageServiceDep
+
+__all__ = ("router",)
+
+router = APIRouter(
+    prefix="/companies/{company_id}/products",
+    tags=["products"],
+)
+
+
+@router.get(
+    "/search",
+    response_model=ProductSearchResponseDTO,
+    dependencies=[Depends(read_only)],
+)
+async def search_products(
+    company_id: str,
+    q: Annotated[str, Query(min_length=2, max_length=100)],
+    user: AuthUserDep,
+    product_service: ProductServiceDep,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Optional[str] = None,
+) -> ProductSearchResponseDTO:
+    return await product_service.search_products(
+        user, company_id, q, limit, cursor,
+    )
+
+
+@router.get(
+    "/scan/{barcode}",
+    response_model=ProductScanResponseDTO,
+    dependencies=[Depends(read_only)],
+)
+async def scan_product(
+    company_id: str,
+    barcode: str,
+    user: AuthUserDep,
+    scan_service: ScanServiceDep,
+    warehouse_id: Optional[str] = None,
+) -> ProductScanResponseDTO:
+    return await scan_service.scan(user, company_id, barcode, warehouse_id)
+
+
+@router.get(
+    "/{item_id}/locations",
+    response_model=ProductLocateResponseDTO,
+    dependencies=[Depends(read_only)],
+)
+async def locate_product(
+    company_id: str,
+    item_id: UUID,
+    user: AuthUserDep,
+    storage_service: StorageServiceDep,
+    warehouse_id: Optional[UUID] = None,
+) -> ProductLocateResponseDTO:
+    return await storage_service.locate_product(
+        user, company_id, item_id, warehouse_id,
+    )
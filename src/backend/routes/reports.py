@@ -0,0 +1,148 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from src.backend.core.database.transactions import read_only, snapshot
+from src.backend.core.enums import ReportFormat, StatsGranularity
+from src.backend.core.exc.exceptions.exceptions import NotFoundError
+from src.backend.schemes.report import (ReportExportCreateDTO,
+                                        ReportExportResponseDTO,
+                                        WarehouseStatsResponseDTO)
+from src.backend.services.report_service import ReportServiceDep
+from src.backend.services.storages.deps import StorageAccessDep
+from src.backend.services.tasks import celery, export_actions_task
+from src.backend.services.users.deps import CEODep
+
+__all__ = ("router", "company_router")
+
+MEDIA_TYPES = {
+    ReportFormat.ndjson: "application/x-ndjson",
+    ReportFormat.csv: "text/csv",
+}
+
+router = APIRouter(
+    prefix="/companies/{company_id}/warehouses/{warehouse_id}/reports",
+    tags=["reports"],
+)
+company_router = APIRouter(
+    prefix="/companies/{company_id}/reports",
+    tags=["reports"],
+)
+
+
+# Компания зашита в id задачи: принадлежность проверяется до обращения
+# к Celery при любом статусе, в том числе пока задача в очереди
+def _export_task_id(company_id: str) -> str:
+    return f"{company_id}:{uuid4()}"
+
+
+@router.get("/daily", dependencies=[Depends(read_only)])
+async def get_daily_report(
+    warehouse_id: str,
+    report_date: date,
+    user: StorageAccessDep,
+    report_service: ReportServiceDep,
+) -> Dict[str, Any]:
+    return await report_service.get_daily_report(warehouse_id, report_date)
+
+
+@router.get(
+    "/stats",
+    response_model=WarehouseStatsResponseDTO,
+    dependencies=[Depends(snapshot)],
+)
+async def get_warehouse_stats(
+    warehouse_id: str,
+    date_from: date,
+    date_to: date,
+    user: StorageAccessDep,
+    report_service: ReportServiceDep,
+    granularity: StatsGranularity = StatsGranularity.day,
+    top: int = Query(10, ge=1, le=100),
+    action: Optional[str] = None,
+) -> WarehouseStatsResponseDTO:
+    return await report_service.get_warehouse_stats(
+        warehouse_id,
+        date_from,
+        date_to,
+        granularity=granularity,
+        top=top,
+        action=action,
+    )
+
+
+@company_router.get("/actions")
+async def stream_company_actions(
+    company_id: str,
+    date_from: date,
+    date_to: date,
+    user: CEODep,
+    report_service: ReportServiceDep,
+    warehouse_id: Optional[List[str]] = Query(None),
+    report_format: ReportFormat = Query(ReportFormat.ndjson, alias="format"),
+) -> StreamingResponse:
+    return StreamingResponse(
+        report_service.stream_report(
+            company_id,
+            date_from,
+            date_to,
+            warehouse_ids=warehouse_id,
+            report_format=report_format,
+        ),
+        media_type=MEDIA_TYPES[report_format],
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=actions_{date_from}_{date_to}"
+                f".{report_format.value}"
+            ),
+        },
+    )
+
+
+@company_router.post("/exports", response_model=ReportExportResponseDTO)
+async def create_actions_export(
+    company_id: str,
+    data: ReportExportCreateDTO,
+    user: CEODep,
+) -> ReportExportResponseDTO:
+    task = export_actions_task.apply_async(
+        (
+            company_id,
+            data.date_from.isoformat(),
+            data.date_to.isoformat(),
+            data.warehouse_ids,
+            [export_format.value for export_format in data.formats],
+        ),
+        task_id=_export_task_id(company_id),
+    )
+    return ReportExportResponseDTO(task_id=task.id, status=task.status)
+
+
+@company_router.get(
+    "/exports/{task_id}",
+    response_model=ReportExportResponseDTO,
+)
+async def get_actions_export(
+    company_id: str,
+    task_id: str,
+    user: CEODep,
+) -> ReportExportResponseDTO:
+    if not task_id.startswith(f"{company_id}:"):
+        raise NotFoundError(f"Export {task_id} not found")
+
+    task = celery.AsyncResult(task_id)
+    if not task.ready():
+        return ReportExportResponseDTO(task_id=task_id, status=task.status)
+
+    result = task.result if task.successful() else None
+    if result and result.get("company_id") != company_id:
+        raise NotFoundError(f"Export {task_id} not found")
+
+    return ReportExportResponseDTO(
+        task_id=task_id,
+        status=task.status,
+        files=result["files"] if result else None,
+    )
@@ -0,0 +1,64 @@
+from uuid import uuid4
+
+from fastapi import APIRouter
+
+from src.backend.core.exc.exceptions.exceptions import NotFoundError
+from src.backend.schemes.slotting import (SlottingPlanDTO,
+                                          SlottingRequestDTO,
+                                          SlottingTaskDTO)
+from src.backend.services.storages.deps import StorageAccessDep
+from src.backend.services.tasks import celery, plan_slotting_task
+
+__all__ = ("router",)
+
+router = APIRouter(
+    prefix="/companies/{company_id}/warehouses/{warehouse_id}/slotting",
+    tags=["slotting"],
+)
+
+
+# Компания и склад зашиты в id задачи, как у выгрузок отчётов
+def _task_prefix(company_id: str, warehouse_id: str) -> str:
+    return f"{company_id}:{warehouse_id}:"
+
+
+@router.post("", response_model=SlottingTaskDTO)
+async def create_slotting_plan(
+    company_id: str,
+    warehouse_id: str,
+    data: SlottingRequestDTO,
+    user: StorageAccessDep,
+) -> SlottingTaskDTO:
+    task = plan_slotting_task.apply_async(
+        (company_id, warehouse_id, data.days, data.dock),
+        task_id=f"{_task_prefix(company_id, warehouse_id)}{uuid4()}",
+    )
+    return SlottingTaskDTO(task_id=task.id, status=task.status)
+
+
+@router.get("/{task_id}", response_model=SlottingTaskDTO)
+async def get_slotting_plan(
+    company_id: str,
+    warehouse_id: str,
+    task_id: str,
+    user: StorageAccessDep,
+) -> SlottingTaskDTO:
+    if not task_id.startswith(_task_prefix(company_id, warehouse_id)):
+        raise NotFoundError(f"Slotting plan {task_id} not found")
+
+    task = celery.AsyncResult(task_id)
+    if not task.ready():
+        return SlottingTaskDTO(task_id=task_id, status=task.status)
+
+    result = task.result if task.successful() else None
+    if result and (
+        result.get("company_id") != company_id
+        or result["plan"]["warehouse_id"] != warehouse_id
+    ):
+        raise NotFoundError(f"Slotting plan {task_id} not found")
+
+    return SlottingTaskDTO(
+        task_id=task_id,
+        status=task.status,
+        plan=SlottingPlanDTO(**result["plan"]) if result else None,
+    )
@@ -0,0 +1,94 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from src.backend.core.database.transactions import atomic_writes, read_only
+from src.backend.schemes.product_locate import (ProductLocationDTO,
+                                                ProductLocationResponseDTO)
+from src.backend.schemes.storage_spatial import StorageSpotResponseDTO
+from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.storages.deps import StorageAccessDep
+from src.backend.services.storages.service import StorageServiceDep
+
+__all__ = ("router",)
+
+router = APIRouter(
+    prefix="/companies/{company_id}/warehouses/{warehouse_id}/storages",
+    tags=["storages"],
+)
+
+
+@router.get(
+    "/at",
+    response_model=StorageSpotResponseDTO,
+    dependencies=[Depends(read_only)],
+)
+async def storages_at_point(
+    company_id: str,
+    warehouse_id: str,
+    x: float,
+    y: float,
+    user: AuthUserDep,
+    storage_service: StorageServiceDep,
+) -> StorageSpotResponseDTO:
+    return await storage_service.find_storages_at_point(
+        user, company_id, warehouse_id, x, y,
+    )
+
+
+@router.get(
+    "/region",
+    response_model=StorageSpotResponseDTO,
+    dependencies=[Depends(read_only)],
+)
+async def storages_in_region(
+    company_id: str,
+    warehouse_id: str,
+    x1: float,
+    y1: float,
+    x2: float,
+    y2: float,
+    user: AuthUserDep,
+    storage_service: StorageServiceDep,
+    contained: bool = False,
+) -> StorageSpotResponseDTO:
+    return await storage_service.find_storages_in_region(
+        user, company_id, warehouse_id, (x1, y1, x2, y2), contained,
+    )
+
+
+@router.get(
+    "/nearest",
+    response_model=StorageSpotResponseDTO,
+    dependencies=[Depends(read_only)],
+)
+async def nearest_storages(
+    company_id: str,
+    warehouse_id: str,
+    x: float,
+    y: float,
+    user: AuthUserDep,
+    storage_service: StorageServiceDep,
+    limit: Annotated[int, Query(ge=1, le=100)] = 1,
+) -> StorageSpotResponseDTO:
+    return await storage_service.find_nearest_storages(
+        user, company_id, warehouse_id, x, y, limit,
+    )
+
+
+@router.post(
+    "/{storage_id}/products",
+    response_model=ProductLocationResponseDTO,
+    dependencies=[Depends(atomic_writes)],
+)
+async def add_product_to_shelf(
+    company_id: str,
+    warehouse_id: str,
+    storage_id: str,
+    data: ProductLocationDTO,
+    user: StorageAccessDep,
+    storage_service: StorageServiceDep,
+) -> ProductLocationResponseDTO:
+    return await storage_service.add_product_to_shelf(
+        user, storage_id, company_id, warehouse_id, data,
+    )
@@ -16,6 +16,7 @@ __all__ = (
     "ProductCreateDTO",
     "ProductUpdateDTO",
     "ProductResponseDTO",
+    "ProductSearchResponseDTO",
 )
 
 
@@ -92,3 +93,11 @@ class ProductResponseDTO(ProductModelDTO):
     # (1*width)*(1*height)*(1*length),или (((1*width)*height)*length)
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ProductSearchResponseDTO(BaseModel):
+    items: List[ProductResponseDTO] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы",
+    )
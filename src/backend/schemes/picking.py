@@ -0,0 +1,67 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+__all__ = (
+    "PickItemDTO",
+    "PickRequestDTO",
+    "PickedLineDTO",
+    "PickResponseDTO",
+    "PickRouteRequestDTO",
+    "PickRouteStopDTO",
+    "PickRouteResponseDTO",
+)
+
+
+class PickItemDTO(BaseModel):
+    item_id: str = Field(description="ID товара")
+    quantity: int = Field(gt=0, description="Кол-во")
+    shelf_id: Optional[str] = Field(
+        None,
+        description="Полка, с которой списать (по умолчанию - любая)",
+    )
+
+
+class PickRequestDTO(BaseModel):
+    items: List[PickItemDTO] = Field(
+        min_length=1,
+        max_length=1000,
+        description="Строки заказа",
+    )
+
+
+class PickedLineDTO(BaseModel):
+    item_id: str = Field(description="ID товара")
+    shelf_id: str = Field(description="ID полки")
+    storage_id: str = Field(description="ID стеллажа")
+    quantity: int = Field(description="Списанное кол-во")
+
+
+class PickResponseDTO(BaseModel):
+    warehouse_id: str = Field(description="ID склада")
+    lines: List[PickedLineDTO] = Field(default_factory=list)
+    freed_space: float = Field(description="Освобождённый объём", ge=0)
+
+
+class PickRouteRequestDTO(PickRequestDTO):
+    start: Optional[List[float]] = Field(
+        None,
+        min_length=2,
+        max_length=2,
+        description="Точка старта [x, y] (по умолчанию - [0, 0])",
+    )
+
+
+class PickRouteStopDTO(BaseModel):
+    storage_id: str = Field(description="ID стеллажа")
+    coordinates: Optional[List[float]] = Field(
+        None,
+        description="Координаты стеллажа [x1, y1, x2, y2]",
+    )
+    lines: List[PickedLineDTO] = Field(default_factory=list)
+
+
+class PickRouteResponseDTO(BaseModel):
+    warehouse_id: str = Field(description="ID склада")
+    stops: List[PickRouteStopDTO] = Field(default_factory=list)
+    distance: float = Field(description="Длина маршрута", ge=0)
@@ -1,6 +1,16 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
-__all__ = ("ProductLocationDTO", "ProductLocationResponseDTO")
+from src.backend.schemes.item_list import ProductResponseDTO
+
+__all__ = (
+    "ProductLocationDTO",
+    "ProductLocationResponseDTO",
+    "ProductShelfDTO",
+    "ProductLocateResponseDTO",
+    "ProductScanResponseDTO",
+)
 
 
 class ProductLocationDTO(BaseModel):
@@ -15,3 +25,20 @@ class ProductLocationResponseDTO(BaseModel):
         description="Сообщение об успешной корректировке",
     )
     free_space_left: float = Field(description="Свободное место", ge=0)
+
+
+class ProductShelfDTO(BaseModel):
+    shelf_id: str = Field(description="ID полки")
+    storage_id: str = Field(description="ID стеллажа")
+    warehouse_id: str = Field(description="ID склада")
+    quantity: int = Field(description="Кол-во размещений на полке", ge=0)
+
+
+class ProductLocateResponseDTO(BaseModel):
+    item_id: str = Field(description="ID товара")
+    shelves: List[ProductShelfDTO] = Field(default_factory=list)
+
+
+class ProductScanResponseDTO(BaseModel):
+    product: ProductResponseDTO
+    shelves: List[ProductShelfDTO] = Field(default_factory=list)
@@ -0,0 +1,73 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from src.backend.core.enums import ExportFormat, StatsGranularity
+
+__all__ = (
+    "ActionTotalDTO",
+    "StatsBucketDTO",
+    "TopProductDTO",
+    "WarehouseStatsResponseDTO",
+    "ReportExportCreateDTO",
+    "ReportExportResponseDTO",
+)
+
+
+class ActionTotalDTO(BaseModel):
+    action: str = Field(description="Тип действия")
+    quantity: int = Field(description="Суммарное кол-во товара")
+    events: int = Field(description="Кол-во операций")
+
+
+class StatsBucketDTO(BaseModel):
+    bucket: datetime = Field(description="Начало интервала (UTC)")
+    action: str = Field(description="Тип действия")
+    quantity: int = Field(description="Кол-во товара за интервал")
+
+
+class TopProductDTO(BaseModel):
+    product_id: str = Field(description="ID товара")
+    quantity: int = Field(description="Суммарное кол-во товара")
+    events: int = Field(description="Кол-во операций")
+
+
+class WarehouseStatsResponseDTO(BaseModel):
+    warehouse_id: str = Field(description="ID склада")
+    date_from: date = Field(description="Начало периода")
+    date_to: date = Field(description="Конец периода (включительно)")
+    granularity: StatsGranularity = Field(description="Шаг ряда")
+    totals: List[ActionTotalDTO] = Field(default_factory=list)
+    series: List[StatsBucketDTO] = Field(default_factory=list)
+    top_products: List[TopProductDTO] = Field(default_factory=list)
+
+
+class ReportExportCreateDTO(BaseModel):
+    date_from: date = Field(description="Начало периода")
+    date_to: date = Field(description="Конец периода (включительно)")
+    warehouse_ids: Optional[List[str]] = Field(
+        None,
+        description="ID складов, по умолчанию все склады компании",
+    )
+    formats: List[ExportFormat] = Field(
+        default_factory=lambda: [ExportFormat.parquet, ExportFormat.csv],
+        description="Форматы выгрузки",
+        min_length=1,
+    )
+
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.date_from > self.date_to:
+            raise ValueError("date_from must not be after date_to")
+
+        return self
+
+
+class ReportExportResponseDTO(BaseModel):
+    task_id: str = Field(description="ID задачи выгрузки")
+    status: str = Field(description="Статус задачи Celery")
+    files: Optional[Dict[str, str]] = Field(
+        None,
+        description="Ссылки на файлы по форматам",
+    )
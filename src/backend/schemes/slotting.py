@@ -0,0 +1,54 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+__all__ = (
+    "SlottingRequestDTO",
+    "SlottingMoveDTO",
+    "SlottingPlanDTO",
+    "SlottingTaskDTO",
+)
+
+
+class SlottingRequestDTO(BaseModel):
+    days: Optional[int] = Field(
+        None,
+        ge=1,
+        le=365,
+        description="Глубина истории подборов в днях",
+    )
+    dock: Optional[List[float]] = Field(
+        None,
+        min_length=2,
+        max_length=2,
+        description="Точка отгрузки [x, y] (по умолчанию - [0, 0])",
+    )
+
+
+class SlottingMoveDTO(BaseModel):
+    item_id: str = Field(description="ID товара")
+    from_shelf_id: str = Field(description="Полка-источник")
+    from_storage_id: str = Field(description="Стеллаж-источник")
+    to_shelf_id: str = Field(description="Полка-приёмник")
+    to_storage_id: str = Field(description="Стеллаж-приёмник")
+    quantity: int = Field(description="Кол-во", gt=0)
+
+
+class SlottingPlanDTO(BaseModel):
+    warehouse_id: str = Field(description="ID склада")
+    since: date = Field(description="Начало учтённой истории")
+    items: int = Field(description="Товаров в расчёте", ge=0)
+    moves: List[SlottingMoveDTO] = Field(default_factory=list)
+    unplaced: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Сколько единиц товара не удалось разместить ближе",
+    )
+    walk_before: float = Field(description="Ожидаемый путь до", ge=0)
+    walk_after: float = Field(description="Ожидаемый путь после", ge=0)
+
+
+class SlottingTaskDTO(BaseModel):
+    task_id: str = Field(description="ID задачи расчёта")
+    status: str = Field(description="Статус задачи Celery")
+    plan: Optional[SlottingPlanDTO] = None
@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+__all__ = (
+    "StorageSpotDTO",
+    "StorageSpotResponseDTO",
+)
+
+
+class StorageSpotDTO(BaseModel):
+    storage_id: str = Field(description="ID стеллажа")
+    coordinates: List[float] = Field(
+        description="Координаты стеллажа [x1, y1, x2, y2]",
+    )
+    distance: Optional[float] = Field(
+        None,
+        description="Расстояние до точки запроса",
+        ge=0,
+    )
+
+
+class StorageSpotResponseDTO(BaseModel):
+    warehouse_id: str = Field(description="ID склада")
+    storages: List[StorageSpotDTO] = Field(default_factory=list)
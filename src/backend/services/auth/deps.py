@@ -1,19 +1,18 @@
-import json
 from typing import Annotated
 
-from aioredis import Redis
 from fastapi import Depends, Security
 from fastapi.security import APIKeyHeader
 from jwt import PyJWTError
 
 from src.backend.core.exc.exceptions.exceptions import (NotFoundError,
                                                         UnauthorizedError)
-from src.backend.core.utils.jwt import validate_jwt
-from src.backend.core.utils.redis import get_redis_client
-from src.backend.models.users import Users
+from src.backend.core.utils.jwt import is_jwt_revoked, validate_jwt
+from src.backend.core.utils.redis import (get_binary_redis_client,
+                                          get_redis_client)
 from src.backend.repos.users import UsersReposDep
+from src.backend.services.auth.principal import Principal
 
-__all__ = ("AuthUserDep",)
+__all__ = ("AuthUserDep", "api_key")
 
 api_key = APIKeyHeader(name="Authorization")
 
@@ -21,26 +20,34 @@ api_key = APIKeyHeader(name="Authorization")
 async def get_current_user(
     token: str = Security(api_key),
     user_repo: UsersReposDep = Depends(),
-    redis: Redis = Depends(get_redis_client),
-) -> Users:
+) -> Principal:
     try:
         payload = validate_jwt(token)
         user_number = payload.get("sub")
         if not user_number:
             raise UnauthorizedError("Invalid token: sub ex")
-    except PyJWTError:
+    except (PyJWTError, ValueError):
         raise UnauthorizedError("Invalid token")
 
+    async with get_redis_client() as redis:
+        revoked = await is_jwt_revoked(token, payload, redis)
+
+    if revoked:
+        raise UnauthorizedError("Token revoked")
+
     cache_key = f"user:{user_number}"
-    cached_user = await redis.get(cache_key)
-    if cached_user:
-        return Users(**json.loads(cached_user))
+    async with get_binary_redis_client() as binary_redis:
+        cached_user = await binary_redis.get(cache_key)
+        if cached_user:
+            return Principal.unpack(cached_user)
+
+        user = await user_repo.get_by_number_with_access(user_number)
+        if not user:
+            raise NotFoundError(f"User with {user_number} number not exist")
 
-    user = await user_repo.get_by_number(user_number)
-    if not user:
-        raise NotFoundError(f"User with {user_number} number not exist")
+        principal = Principal.from_user(user)
+        await binary_redis.setex(cache_key, 3600, principal.pack())
 
-    await redis.setex(cache_key, 3600, json.dumps(user.dict()))
-    return user
+    return principal
 
-AuthUserDep = Annotated[Users, Depends(get_current_user)]
+AuthUserDep = Annotated[Principal, Depends(get_current_user)]
@@ -0,0 +1,96 @@
+import struct
+from typing import Dict, Optional
+from uuid import UUID
+
+from src.backend.core.enums import AccessLevel
+from src.backend.models.users import Users
+
+__all__ = ("Principal",)
+
+LEVELS = tuple(AccessLevel)
+LEVEL_INDEX = {level: index for index, level in enumerate(LEVELS)}
+
+# version, uuid, company_id, длина номера, кол-во записей доступа
+HEADER = struct.Struct("!B16s16sBH")
+ACCESS = struct.Struct("!16sB")
+VERSION = 1
+
+
+# Легковесный субъект авторизации вместо ORM-объекта Users:
+# без instrumentation-состояния и с бинарной упаковкой для Redis
+class Principal:
+    __slots__ = ("uuid", "number", "company_id", "access")
+
+    def __init__(
+        self,
+        uuid: UUID,
+        number: str,
+        company_id: UUID,
+        access: Optional[Dict[UUID, AccessLevel]] = None,
+    ):
+        self.uuid = uuid
+        self.number = number
+        self.company_id = company_id
+        self.access = access or {}
+
+    @classmethod
+    def from_user(cls, user: Users) -> "Principal":
+        return cls(
+            uuid=_as_uuid(user.uuid),
+            number=user.number,
+            company_id=_as_uuid(user.company_id),
+            access={
+                _as_uuid(entry.warehouse_id): entry.access_level
+                for entry in user.access
+            },
+        )
+
+    def level(self, warehouse_id: UUID | str) -> Optional[AccessLevel]:
+        return self.access.get(_as_uuid(warehouse_id))
+
+    def pack(self) -> bytes:
+        number = self.number.encode()
+        parts = [
+            HEADER.pack(
+                VERSION,
+                self.uuid.bytes,
+                self.company_id.bytes,
+                len(number),
+                len(self.access),
+            ),
+            number,
+        ]
+        parts.extend(
+            ACCESS.pack(warehouse_id.bytes, LEVEL_INDEX[level])
+            for warehouse_id, level in self.access.items()
+        )
+        return b"".join(parts)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Principal":
+        version, uuid, company_id, number_len, count = HEADER.unpack_from(
+            data,
+        )
+        if version != VERSION:
+            raise ValueError(f"Unsupported principal version {version}")
+
+        offset = HEADER.size
+        number = data[offset:offset + number_len].decode()
+        offset += number_len
+
+        access = {}
+        for warehouse_id, level in ACCESS.iter_unpack(
+            data[offset:offset + count * ACCESS.size],
+        ):
+            access[UUID(bytes=warehouse_id)] = LEVELS[level]
+
+        return cls(
+            uuid=UUID(bytes=uuid),
+            number=number,
+            company_id=UUID(bytes=company_id),
+            access=access,
+        )
+
+
+def _as_uuid(value: UUID | str) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
+import secrets
 from typing import Annotated, Optional
-import uuid
 
 from aioredis import Redis as AioRedis
 from fastapi import Depends
@@ -9,11 +9,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.core.config import settings
 from src.backend.core.database.async_engine import SessionDep
-from src.backend.core.exc.exceptions.exceptions import (ForbiddenError,
-                                                        NotFoundError,
-                                                        UnauthorizedError)
-from src.backend.core.utils.jwt import create_jwt
-from src.backend.core.utils.redis import get_redis_client, Redis
+from src.backend.core.database.transactions import after_commit
+from src.backend.core.exc.exceptions.exceptions import (
+    ForbiddenError,
+    NotFoundError,
+    TooManyRequestsError,
+    UnauthorizedError,
+)
+from src.backend.core.utils.jwt import create_jwt, revoke_jwt
+from src.backend.core.utils.rate_limit import hit_sliding_window
+from src.backend.core.utils.redis import (get_redis_client, LuaScript,
+                                          Redis)
 from src.backend.models.users import Users
 from src.backend.repos.users import RepoUsers, UsersReposDep
 from src.backend.schemes.authy import (AuthPushCodeDTO,
@@ -22,7 +28,46 @@ from src.backend.schemes.authy import (AuthPushCodeDTO,
 from src.backend.services.notifications.service import (NotificationService,
                                                         NotificationServiceDep)
 
-__all__ = ("AuthenticationService", "AuthenticationServiceDep")
+__all__ = (
+    "AuthenticationService",
+    "AuthenticationServiceDep",
+    "forget_unknown_number",
+)
+
+# 1 - код верный и погашен, 0 - неверный, -1 - кода нет.
+# После otp_max_attempts неверных попыток код сгорает
+CONSUME_OTP_LUA = LuaScript("""
+local code = redis.call('GET', KEYS[1])
+if not code then
+    return -1
+end
+if code == ARGV[1] then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 1
+end
+local attempts = redis.call('INCR', KEYS[2])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[2], math.max(redis.call('TTL', KEYS[1]), 1))
+end
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1], KEYS[2])
+end
+return 0
+""")
+
+
+def _unknown_number_key(number: str) -> str:
+    return f"otp:unknown:{number}"
+
+
+# Снимает отрицательный кэш номера, когда пользователь с ним появился;
+# после commit, иначе параллельный запрос кода вернул бы его обратно
+def forget_unknown_number(session: AsyncSession, number: str) -> None:
+    async def forget() -> None:
+        async with get_redis_client() as redis:
+            await redis.delete(_unknown_number_key(number))
+
+    after_commit(session, forget)
 
 
 class AuthenticationService:
@@ -43,21 +88,73 @@ class AuthenticationService:
     ) -> Optional[Users]:
         return await self.user_repo.get_by_number(str(phonenumber))
 
-    async def request_code(self, data: AuthPushDTO, company_id: str) -> str:
-        user = await self.user_repo.get_by_number(data.number)
-        if not user:
-            raise NotFoundError(message="User not found")
-
-        if user.date_jwt_unactivate and (
-            user.date_jwt_unactivate > datetime.now(timezone.utc)
+    async def _check_rate_limits(
+            self,
+            redis: AioRedis,
+            scope: str,
+            number: str,
+            client_ip: Optional[str],
+            limit: int,
+            window: int,
+    ) -> None:
+        if not await hit_sliding_window(
+            redis, f"rl:{scope}:number:{number}", limit, window,
         ):
-            raise ForbiddenError(message="User's jwt deactivated")
-
-        authy_code = str(uuid.uuid4())[:6]
-
-        await self.redis_client.setex(
-            f"otp:{str(data.number)}", 600, authy_code,
-        )
+            raise TooManyRequestsError(
+                "Too many attempts for this number", retry_after=window,
+            )
+
+        if client_ip and not await hit_sliding_window(
+            redis,
+            f"rl:otp:ip:{client_ip}",
+            settings.otp_ip_limit,
+            settings.otp_ip_window,
+        ):
+            raise TooManyRequestsError(
+                "Too many attempts from this address",
+                retry_after=settings.otp_ip_window,
+            )
+
+    async def request_code(
+            self,
+            data: AuthPushDTO,
+            company_id: str,
+            client_ip: Optional[str] = None,
+    ) -> str:
+        number = str(data.number)
+        async with get_redis_client() as redis:
+            await self._check_rate_limits(
+                redis,
+                "otp-request",
+                number,
+                client_ip,
+                settings.otp_request_limit,
+                settings.otp_request_window,
+            )
+
+            if await redis.exists(_unknown_number_key(number)):
+                raise NotFoundError(message="User not found")
+
+            user = await self.user_repo.get_by_number(number)
+            if not user:
+                await redis.setex(
+                    _unknown_number_key(number),
+                    settings.otp_unknown_number_ttl,
+                    "1",
+                )
+                raise NotFoundError(message="User not found")
+
+            if user.date_jwt_unactivate and (
+                user.date_jwt_unactivate > datetime.now(timezone.utc)
+            ):
+                raise ForbiddenError(message="User's jwt deactivated")
+
+            authy_code = f"{secrets.randbelow(10 ** 6):06d}"
+
+            pipe = redis.pipeline(transaction=True)
+            pipe.setex(f"otp:{number}", settings.otp_ttl, authy_code)
+            pipe.delete(f"otp:attempts:{number}")
+            await pipe.execute()
 
         title = "Confirmation code"
         body = (
@@ -78,30 +175,49 @@ class AuthenticationService:
     async def verify_code(
         self,
         data: AuthPushCodeDTO,
+        client_ip: Optional[str] = None,
     ) -> AuthPushCodeTokenResponseDTO:
-        user = await self.user_repo.get_by_number(data.number)
+        number = str(data.number)
+        async with get_redis_client() as redis:
+            await self._check_rate_limits(
+                redis,
+                "otp-verify",
+                number,
+                client_ip,
+                settings.otp_verify_limit,
+                settings.otp_verify_window,
+            )
+
+            verified = await CONSUME_OTP_LUA(
+                redis,
+                keys=[f"otp:{number}", f"otp:attempts:{number}"],
+                args=[data.code, settings.otp_max_attempts],
+            )
+
+        if verified != 1:
+            raise UnauthorizedError("Incorrect code")
 
+        user = await self.user_repo.get_by_number(number)
         if not user:
             raise NotFoundError(message="User not found")
 
-        code = await self.redis_client.get(f"otp:{str(data.number)}")
-
-        if (not code) or (code.decode("utf-8") != data.code):
-            raise UnauthorizedError("Incorrect code")
-
-        if user.date_jwt_unactivate > datetime.now(timezone.utc):
+        if user.date_jwt_unactivate and (
+            user.date_jwt_unactivate > datetime.now(timezone.utc)
+        ):
             raise ForbiddenError("JWT deactivated")
 
         jwt_token = await create_jwt(user)
 
-        await self.redis_client.delete(f"otp:{str(data.number)}")
-
         return AuthPushCodeTokenResponseDTO(
             access_token=jwt_token,
             token_type="bearer",
             expires_in=settings.jwt_expires,
         )
 
+    async def logout(self, token: str) -> None:
+        async with get_redis_client() as redis:
+            await revoke_jwt(token, redis)
+
 
 async def create_authentication_service(
     session: SessionDep,
@@ -19,6 +19,7 @@ from src.backend.schemes.organization import (
     OrganizationResponseDTO,
     OrganizationUpdateModelDTO,
 )
+from src.backend.services.permissions.service import invalidate_permissions
 from src.backend.services.users.deps import CEODep
 
 __all__ = ("CompanyService", "CompanyServiceDep")
@@ -63,6 +64,7 @@ class CompanyService:
             activity=True,
         )
         company = await self.company_repo.insert(company)
+        invalidate_permissions(self.session, owner_id)
         return to_dto(company, OrganizationResponseDTO)
 
     async def delete_company(
@@ -78,6 +80,7 @@ class CompanyService:
             raise ForbiddenError("User is not the owner of the company")
 
         await self.company_repo.delete(company_id)
+        invalidate_permissions(self.session, user.uuid)
 
     async def set_company_activity(
         self,
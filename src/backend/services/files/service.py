@@ -9,14 +9,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.core.config import settings
 from src.backend.core.database.async_engine import SessionDep
-from src.backend.core.exc.exceptions.exceptions import (BadRequestError,
-                                                        ForbiddenError)
+from src.backend.core.exc.exceptions.exceptions import BadRequestError
 from src.backend.core.utils.minio import upload_file
-from src.backend.models.users import Users
+from src.backend.services.auth.principal import Principal
 from src.backend.repos.companies import CompanyRepoDep, RepoCompany
 from src.backend.repos.users import RepoUsers, UsersReposDep
 from src.backend.schemes.files import FileResponseDTO, XLSProductDTO
 from src.backend.services.files.deps import MinIOClientDep, ValidatedXLSFileDep
+from src.backend.services.permissions.service import (PermissionService,
+                                                      PermissionServiceDep)
 from src.backend.services.users.deps import CEODep, RegManagerDep
 from src.backend.services.warehouses.deps import WarehouseDep
 
@@ -30,23 +31,21 @@ class FilesService:
         user_repo: RepoUsers,
         company_repo: RepoCompany,
         minio_client: MinIOClientDep,
+        permission_service: PermissionService,
     ):
         self.session = session
         self.user_repo = user_repo
         self.minio_client = minio_client
         self.company_repo = company_repo
         self.bucket_name = settings.minio_bucket
+        self.permission_service = permission_service
 
     async def _check_access(
-        self, user: Users, warehouse_id: str, company_id: str,
+        self, user: Principal, warehouse_id: str, company_id: str,
     ) -> None:
-        company = await self.company_repo.get_by_id(company_id)
-        if company and company.owner_id == user.uuid:
-            return
-
-        access = await self.user_repo.get_user_access(user.uuid, warehouse_id)
-        if not access or access.access_level not in ("regional_manager",):
-            raise ForbiddenError("User have no access to this warehouse")
+        await self.permission_service.require_manager(
+            user.uuid, company_id, warehouse_id,
+        )
 
     async def _save_temp_file(self, file: UploadFile) -> str:
         try:
@@ -144,12 +143,14 @@ async def get_files_service(
     user_repo: UsersReposDep,
     company_repo: CompanyRepoDep,
     minio_client: MinIOClientDep,
+    permission_service: PermissionServiceDep,
 ) -> FilesService:
     return FilesService(
         session=session,
         user_repo=user_repo,
         minio_client=minio_client,
         company_repo=company_repo,
+        permission_service=permission_service,
     )
 
 FilesServiceDep = Annotated[FilesService, Depends(get_files_service)]
@@ -0,0 +1,243 @@
+from typing import Annotated, Dict, Iterable, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.core.database.async_engine import (get_engine,
+                                                    session_scope,
+                                                    uses_replica)
+from src.backend.core.database.transactions import after_commit
+from src.backend.core.enums import AccessLevel
+from src.backend.core.exc.exceptions.exceptions import ForbiddenError
+from src.backend.core.utils.redis import get_redis_client
+from src.backend.repos.users import RepoUsers, UsersReposDep
+
+__all__ = (
+    "PermissionMap",
+    "PermissionService",
+    "PermissionServiceDep",
+    "invalidate_permissions",
+)
+
+MANAGER_LEVELS = (AccessLevel.owner, AccessLevel.regional_manager)
+PERMISSIONS_TTL = 86400
+
+
+def _permissions_key(user_id: UUID | str) -> str:
+    return f"perm:{user_id}"
+
+
+def _version_key(user_id: UUID | str) -> str:
+    return f"perm:version:{user_id}"
+
+
+# Полная карта прав пользователя: какими компаниями владеет
+# и какой уровень доступа у него на каждом складе (с компанией склада)
+class PermissionMap:
+    __slots__ = ("owned_companies", "warehouses")
+
+    def __init__(
+        self,
+        owned_companies: Set[str],
+        warehouses: Dict[str, Tuple[AccessLevel, str]],
+    ):
+        self.owned_companies = owned_companies
+        self.warehouses = warehouses
+
+    def owns(self, company_id: UUID | str) -> bool:
+        return str(company_id) in self.owned_companies
+
+    def level(
+        self,
+        warehouse_id: UUID | str,
+        company_id: Optional[UUID | str] = None,
+    ) -> Optional[AccessLevel]:
+        entry = self.warehouses.get(str(warehouse_id))
+        if not entry:
+            return None
+
+        level, warehouse_company = entry
+        if company_id and warehouse_company != str(company_id):
+            return None
+
+        return level
+
+    # Склады компании, на которых у пользователя есть любой доступ
+    def warehouse_ids(self, company_id: UUID | str) -> Set[str]:
+        return {
+            warehouse
+            for warehouse, (_, company) in self.warehouses.items()
+            if company == str(company_id)
+        }
+
+    def has_level(
+        self,
+        company_id: UUID | str,
+        warehouse_id: UUID | str,
+        levels: Iterable[AccessLevel],
+    ) -> bool:
+        return self.level(warehouse_id, company_id) in tuple(levels)
+
+    def can_manage(
+        self,
+        company_id: UUID | str,
+        warehouse_id: UUID | str,
+    ) -> bool:
+        return self.has_level(company_id, warehouse_id, MANAGER_LEVELS)
+
+    def to_hash(self, version: int) -> Dict[str, str]:
+        data = {"v": str(version)}
+        data.update({f"o:{company}": "1" for company in self.owned_companies})
+        data.update({
+            f"w:{warehouse}": f"{level.value}:{company}"
+            for warehouse, (level, company) in self.warehouses.items()
+        })
+        return data
+
+    @classmethod
+    def from_hash(cls, data: Dict[str, str]) -> "PermissionMap":
+        owned = set()
+        warehouses = {}
+        for field, value in data.items():
+            if field.startswith("o:"):
+                owned.add(field[2:])
+            elif field.startswith("w:"):
+                level, company = value.split(":", 1)
+                warehouses[field[2:]] = (AccessLevel(level), company)
+
+        return cls(owned, warehouses)
+
+
+# Версия растёт только после commit: иначе параллельный запрос успел
+# бы пересобрать карту из ещё не закоммиченных строк под новой версией
+def invalidate_permissions(
+    session: AsyncSession, *user_ids: UUID | str,
+) -> None:
+    keys = {_version_key(user_id) for user_id in user_ids if user_id}
+    if not keys:
+        return
+
+    async def bump() -> None:
+        async with get_redis_client() as redis:
+            pipe = redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.incr(key)
+            await pipe.execute()
+
+    after_commit(session, bump)
+
+
+# Карта грузится одним походом в Redis (hash + версия); при промахе
+# или устаревшей версии пересобирается из БД. Версию читаем до БД,
+# поэтому параллельная инвалидация не даст закешировать старые права
+class PermissionService:
+    def __init__(self, user_repo: RepoUsers):
+        self.user_repo = user_repo
+        self._maps: Dict[str, PermissionMap] = {}
+
+    async def get_map(self, user_id: UUID | str) -> PermissionMap:
+        key = str(user_id)
+        if key in self._maps:
+            return self._maps[key]
+
+        async with get_redis_client() as redis:
+            pipe = redis.pipeline(transaction=False)
+            pipe.hgetall(_permissions_key(key))
+            pipe.get(_version_key(key))
+            cached, version = await pipe.execute()
+            version = int(version or 0)
+
+            if cached and cached.get("v") == str(version):
+                permissions = PermissionMap.from_hash(cached)
+            else:
+                permissions = await self._load(key)
+                pipe = redis.pipeline(transaction=True)
+                pipe.delete(_permissions_key(key))
+                pipe.hset(
+                    _permissions_key(key),
+                    mapping=permissions.to_hash(version),
+                )
+                pipe.expire(_permissions_key(key), PERMISSIONS_TTL)
+                await pipe.execute()
+
+        self._maps[key] = permissions
+        return permissions
+
+    # Карта кешируется на сутки под новой версией, поэтому читается
+    # только с primary: отстающая реплика вернула бы отозванные права
+    async def _load(self, user_id: str) -> PermissionMap:
+        if not uses_replica(self.user_repo.session):
+            return await self._collect(self.user_repo, user_id)
+
+        async with session_scope(get_engine()) as session:
+            return await self._collect(RepoUsers(session), user_id)
+
+    @staticmethod
+    async def _collect(user_repo: RepoUsers, user_id: str) -> PermissionMap:
+        owned = set()
+        warehouses = {}
+        for company_id, warehouse_id in (
+            await user_repo.get_owned_warehouses(user_id)
+        ):
+            owned.add(str(company_id))
+            if warehouse_id:
+                warehouses[str(warehouse_id)] = (
+                    AccessLevel.owner, str(company_id),
+                )
+
+        for warehouse_id, level, company_id in (
+            await user_repo.get_access_with_company(user_id)
+        ):
+            warehouses.setdefault(str(warehouse_id), (level, str(company_id)))
+
+        return PermissionMap(owned, warehouses)
+
+    async def require_owner(
+        self, user_id: UUID | str, company_id: UUID | str,
+    ) -> None:
+        if not (await self.get_map(user_id)).owns(company_id):
+            raise ForbiddenError("User is not the owner of the company")
+
+    async def require_access(
+        self,
+        user_id: UUID | str,
+        company_id: UUID | str,
+        warehouse_id: UUID | str,
+    ) -> None:
+        permissions = await self.get_map(user_id)
+        if permissions.level(warehouse_id, company_id) is None:
+            raise ForbiddenError("No access to warehouse")
+
+    # Без конкретного склада: хотя бы один доступный склад компании,
+    # результат - их список для фильтрации выдачи
+    async def require_company_access(
+        self, user_id: UUID | str, company_id: UUID | str,
+    ) -> Set[str]:
+        warehouses = (await self.get_map(user_id)).warehouse_ids(company_id)
+        if not warehouses:
+            raise ForbiddenError("No access to company")
+
+        return warehouses
+
+    async def require_manager(
+        self,
+        user_id: UUID | str,
+        company_id: UUID | str,
+        warehouse_id: UUID | str,
+    ) -> None:
+        permissions = await self.get_map(user_id)
+        if not permissions.can_manage(company_id, warehouse_id):
+            raise ForbiddenError("No access to warehouse")
+
+
+async def get_permission_service(
+    user_repo: UsersReposDep,
+) -> PermissionService:
+    return PermissionService(user_repo=user_repo)
+
+
+PermissionServiceDep = Annotated[
+    PermissionService,
+    Depends(get_permission_service),
+]
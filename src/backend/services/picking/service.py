@@ -0,0 +1,249 @@
+from collections import defaultdict
+from typing import Annotated, Dict, Sequence, Tuple
+
+from fastapi import Depends
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.core.database.async_engine import SessionDep
+from src.backend.core.database.transactions import after_commit
+from src.backend.core.enums import ReportAction
+from src.backend.core.exc.exceptions.exceptions import (BadRequestError,
+                                                        ConflictError)
+from src.backend.core.utils.packing import unit_volume
+from src.backend.core.utils.routing import plan_route, rect_centers
+from src.backend.repos.storages import RepoStorage, StorageRepoDep
+from src.backend.schemes.picking import (PickedLineDTO, PickItemDTO,
+                                         PickRequestDTO, PickResponseDTO,
+                                         PickRouteRequestDTO,
+                                         PickRouteResponseDTO,
+                                         PickRouteStopDTO)
+from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.permissions.service import (PermissionService,
+                                                      PermissionServiceDep)
+from src.backend.services.products.scan import publish_stock_change
+from src.backend.services.report_service import (ReportService,
+                                                 ReportServiceDep)
+from src.backend.services.storages.service import drop_layout_cache
+
+__all__ = (
+    "PickingService",
+    "PickingServiceDep",
+    "allocate_picks",
+)
+
+
+# Раскладка строк заказа по полкам: явно указанная полка должна
+# покрыть строку целиком, иначе берём с полок с наибольшим остатком
+def allocate_picks(
+    items: Sequence[PickItemDTO],
+    placements: Sequence[Row],
+) -> Dict[Tuple[str, str], int]:
+    available = {}
+    shelves_by_item = defaultdict(list)
+    for placement in placements:
+        key = (str(placement.shelf_id), str(placement.item_id))
+        available[key] = placement.quantity
+        shelves_by_item[key[1]].append(key[0])
+
+    allocation = defaultdict(int)
+    for line in items:
+        item_id = str(line.item_id)
+        if line.shelf_id:
+            key = (str(line.shelf_id), item_id)
+            if available.get(key, 0) < line.quantity:
+                raise BadRequestError(
+                    f"Not enough {item_id} on shelf {line.shelf_id}",
+                )
+
+            available[key] -= line.quantity
+            allocation[key] += line.quantity
+            continue
+
+        left = line.quantity
+        for shelf_id in shelves_by_item[item_id]:
+            key = (shelf_id, item_id)
+            taken = min(left, available[key])
+            if taken:
+                available[key] -= taken
+                allocation[key] += taken
+                left -= taken
+
+            if not left:
+                break
+
+        if left:
+            raise BadRequestError(f"Not enough {item_id} in warehouse")
+
+    return dict(allocation)
+
+
+class PickingService:
+    def __init__(
+            self,
+            session: AsyncSession,
+            storage_repo: RepoStorage,
+            permission_service: PermissionService,
+            report_service: ReportService,
+    ):
+        self.session = session
+        self.storage_repo = storage_repo
+        self.permission_service = permission_service
+        self.report_service = report_service
+
+    # Вся партия списывается одной транзакцией: место на полках - одним
+    # UPDATE ... FROM VALUES, остатки - вторым. Если остаток успели
+    # забрать параллельно, откатываем всё и просим повторить.
+    # Строки блокируются в порядке (shelf_id, item_id) и полки раньше
+    # остатков, как при приёмке, чтобы параллельные партии не ловили
+    # взаимную блокировку (40P01)
+    async def pick(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            warehouse_id: str,
+            data: PickRequestDTO,
+    ) -> PickResponseDTO:
+        await self.permission_service.require_access(
+            user.uuid, company_id, warehouse_id,
+        )
+
+        item_ids = list({str(line.item_id) for line in data.items})
+        placements = await self.storage_repo.get_placements(
+            warehouse_id, item_ids,
+        )
+        storage_by_shelf = {
+            str(placement.shelf_id): str(placement.storage_id)
+            for placement in placements
+        }
+        allocation = allocate_picks(data.items, placements)
+        lines = sorted(
+            (shelf_id, item_id, quantity)
+            for (shelf_id, item_id), quantity in allocation.items()
+        )
+
+        products = await self.storage_repo.get_products_by_ids(item_ids)
+        volumes = defaultdict(float)
+        picked = defaultdict(int)
+        for shelf_id, item_id, quantity in lines:
+            product = products.get(item_id)
+            volumes[shelf_id] += quantity * unit_volume(
+                product.dekart_parameters if product else None,
+            )
+            picked[item_id] += quantity
+
+        await self.storage_repo.release_shelves_space(dict(volumes))
+        taken = await self.storage_repo.take_shelf_items(lines)
+        if len(taken) != len(lines):
+            raise ConflictError(
+                "Stock changed during picking, retry the request",
+                retry_after=1,
+            )
+
+        publish_stock_change(self.session, picked)
+        drop_layout_cache(self.session, warehouse_id)
+
+        # в отчёт попадает только закоммиченное списание
+        async def log_picked() -> None:
+            for item_id, quantity in picked.items():
+                await self.report_service.log_action(
+                    item_id, warehouse_id, ReportAction.picked.value,
+                    quantity,
+                )
+
+        after_commit(self.session, log_picked)
+
+        return PickResponseDTO(
+            warehouse_id=str(warehouse_id),
+            lines=[
+                PickedLineDTO(
+                    item_id=item_id,
+                    shelf_id=shelf_id,
+                    storage_id=storage_by_shelf[shelf_id],
+                    quantity=quantity,
+                )
+                for shelf_id, item_id, quantity in lines
+            ],
+            freed_space=sum(volumes.values()),
+        )
+
+    # Маршрут сборки без списания: строки раскладываются по полкам
+    # так же, как в pick, стеллажи обходятся по кратчайшему найденному
+    # пути (nearest neighbour + 2-opt). Стеллажи без координат - в конце
+    async def route(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            warehouse_id: str,
+            data: PickRouteRequestDTO,
+    ) -> PickRouteResponseDTO:
+        await self.permission_service.require_access(
+            user.uuid, company_id, warehouse_id,
+        )
+
+        placements = await self.storage_repo.get_placements(
+            warehouse_id, list({str(line.item_id) for line in data.items}),
+        )
+        allocation = allocate_picks(data.items, placements)
+
+        storage_by_shelf = {}
+        coordinates = {}
+        for placement in placements:
+            storage_id = str(placement.storage_id)
+            storage_by_shelf[str(placement.shelf_id)] = storage_id
+            coordinates[storage_id] = placement.coordinates
+
+        lines = defaultdict(list)
+        for (shelf_id, item_id), quantity in allocation.items():
+            storage_id = storage_by_shelf[shelf_id]
+            lines[storage_id].append(
+                PickedLineDTO(
+                    item_id=item_id,
+                    shelf_id=shelf_id,
+                    storage_id=storage_id,
+                    quantity=quantity,
+                ),
+            )
+
+        routable = [
+            storage_id for storage_id in lines
+            if coordinates[storage_id] and len(coordinates[storage_id]) == 4
+        ]
+        order, distance = plan_route(
+            rect_centers([coordinates[storage_id] for storage_id in routable]),
+            start=data.start,
+        )
+        ordered = [routable[index] for index in order]
+        ordered += [
+            storage_id for storage_id in lines if storage_id not in routable
+        ]
+
+        return PickRouteResponseDTO(
+            warehouse_id=str(warehouse_id),
+            stops=[
+                PickRouteStopDTO(
+                    storage_id=storage_id,
+                    coordinates=coordinates[storage_id],
+                    lines=lines[storage_id],
+                )
+                for storage_id in ordered
+            ],
+            distance=distance,
+        )
+
+
+async def get_picking_service(
+        session: SessionDep,
+        storage_repo: StorageRepoDep,
+        permission_service: PermissionServiceDep,
+        report_service: ReportServiceDep,
+) -> PickingService:
+    return PickingService(
+        session=session,
+        storage_repo=storage_repo,
+        permission_service=permission_service,
+        report_service=report_service,
+    )
+
+
+PickingServiceDep = Annotated[PickingService, Depends(get_picking_service)]
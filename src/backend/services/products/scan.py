@@ -0,0 +1,151 @@
+from typing import Annotated, Iterable, List, Optional
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.core.config import settings
+from src.backend.core.database.async_engine import session_scope
+from src.backend.core.database.transactions import (after_commit,
+                                                    READ_COMMITTED)
+from src.backend.core.exc.exceptions.exceptions import NotFoundError
+from src.backend.core.utils.barcode_cache import BarcodeCache
+from src.backend.core.utils.dto_refactor import to_dto
+from src.backend.repos.products import ProductsRepoDep, RepoProducts
+from src.backend.repos.storages import RepoStorage, StorageRepoDep
+from src.backend.schemes.item_list import ProductResponseDTO
+from src.backend.schemes.product_locate import (ProductScanResponseDTO,
+                                                ProductShelfDTO)
+from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.permissions.service import (PermissionService,
+                                                      PermissionServiceDep)
+
+__all__ = (
+    "ScanService",
+    "ScanServiceDep",
+    "barcode_cache",
+    "publish_product_upsert",
+    "publish_product_delete",
+    "publish_stock_change",
+)
+
+PRODUCT_CHANGES_CHANNEL = "products:changes"
+
+
+async def _load_catalog() -> List[ProductResponseDTO]:
+    async with session_scope(profile=READ_COMMITTED) as session:
+        return await RepoProducts(session).get_catalog_dto(
+            ProductResponseDTO,
+        )
+
+
+barcode_cache = BarcodeCache(
+    PRODUCT_CHANGES_CHANNEL,
+    _load_catalog,
+    ProductResponseDTO.model_validate,
+    locations_size=settings.scan_locations_cache_size,
+)
+
+
+# Изменения рассылаются только после commit: откаченная запись
+# не попадёт в кэш ни одного воркера
+def publish_product_upsert(
+    session: AsyncSession, product: ProductResponseDTO,
+) -> None:
+    message = {"op": "upsert", "product": product.model_dump(mode="json")}
+    after_commit(session, lambda: barcode_cache.publish(message))
+
+
+def publish_product_delete(session: AsyncSession, item_id: str) -> None:
+    message = {"op": "delete", "item_id": str(item_id)}
+    after_commit(session, lambda: barcode_cache.publish(message))
+
+
+# item_ids=None - сбросить размещения всех товаров
+def publish_stock_change(
+    session: AsyncSession, item_ids: Optional[Iterable[str]],
+) -> None:
+    message = {
+        "op": "stock",
+        "item_ids": (
+            None if item_ids is None else [str(item) for item in item_ids]
+        ),
+    }
+    after_commit(session, lambda: barcode_cache.publish(message))
+
+
+class ScanService:
+    def __init__(
+            self,
+            product_repo: RepoProducts,
+            storage_repo: RepoStorage,
+            permission_service: PermissionService,
+    ):
+        self.product_repo = product_repo
+        self.storage_repo = storage_repo
+        self.permission_service = permission_service
+
+    # На попадании в кэш ни одного запроса к БД: товар по штрихкоду
+    # и его размещения берутся из памяти процесса
+    async def scan(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            barcode: str,
+            warehouse_id: Optional[str] = None,
+    ) -> ProductScanResponseDTO:
+        if warehouse_id:
+            await self.permission_service.require_access(
+                user.uuid, company_id, warehouse_id,
+            )
+            allowed = {str(warehouse_id)}
+        else:
+            allowed = await self.permission_service.require_company_access(
+                user.uuid, company_id,
+            )
+
+        product = barcode_cache.get(company_id, barcode)
+        if product is None:
+            found = await self.product_repo.get_by_barcode(barcode)
+            if not found or str(found.company_id) != str(company_id):
+                raise NotFoundError(f"Product {barcode} not found")
+
+            product = to_dto(found, ProductResponseDTO)
+            if barcode_cache.ready:
+                barcode_cache.put(product)
+
+        shelves = barcode_cache.get_locations(product.item_id)
+        if shelves is None:
+            epoch = barcode_cache.stock_epoch
+            shelves = [
+                ProductShelfDTO(
+                    shelf_id=str(row.shelf_id),
+                    storage_id=str(row.storage_id),
+                    warehouse_id=str(row.warehouse_id),
+                    quantity=row.quantity or 0,
+                )
+                for row in await self.storage_repo.locate_product(
+                    product.item_id, company_id,
+                )
+            ]
+            barcode_cache.put_locations(product.item_id, shelves, epoch)
+
+        shelves = [
+            shelf for shelf in shelves if shelf.warehouse_id in allowed
+        ]
+
+        return ProductScanResponseDTO(product=product, shelves=shelves)
+
+
+async def get_scan_service(
+        product_repo: ProductsRepoDep,
+        storage_repo: StorageRepoDep,
+        permission_service: PermissionServiceDep,
+) -> ScanService:
+    return ScanService(
+        product_repo=product_repo,
+        storage_repo=storage_repo,
+        permission_service=permission_service,
+    )
+
+
+ScanServiceDep = Annotated[ScanService, Depends(get_scan_service)]
@@ -1,4 +1,4 @@
-from typing import Annotated, List, Tuple
+from typing import Annotated, List, Optional, Tuple
 from uuid import uuid4
 
 from fastapi import Depends, UploadFile
@@ -6,19 +6,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.core.database.async_engine import SessionDep
 from src.backend.core.exc.exceptions.exceptions import (
-    BadRequestError, NotFoundError, UniqueViolationError,
+    BadRequestError, ForbiddenError, NotFoundError, UniqueViolationError,
 )
-from src.backend.core.utils.dto_refactor import to_dto
+from src.backend.core.utils.dto_refactor import to_dto, to_dto_list
 from src.backend.models.products import Products
 from src.backend.repos.companies import CompanyRepoDep, RepoCompany
 from src.backend.repos.products import ProductsRepoDep, RepoProducts
 from src.backend.schemes.files import FileResponseDTO, XLSProductDTO
 from src.backend.schemes.item_list import (
-    ProductCreateDTO, ProductResponseDTO, ProductUpdateDTO,
+    ProductCreateDTO, ProductResponseDTO, ProductSearchResponseDTO,
+    ProductUpdateDTO,
 )
+from src.backend.services.auth.deps import AuthUserDep
 from src.backend.services.files.service import (
     FilesService, FilesServiceDep,
 )
+from src.backend.services.products.scan import (publish_product_delete,
+                                                publish_product_upsert)
 from src.backend.services.users.deps import CEODep
 from src.backend.services.warehouses.deps import WarehouseDep
 
@@ -59,17 +63,38 @@ class ProductService:
             user: CEODep,
             company_id: str,
             limit: int,
-            offset: int,
-    ) -> Tuple[List[ProductResponseDTO], int]:
+            cursor: Optional[str] = None,
+            with_total: bool = False,
+    ) -> Tuple[List[ProductResponseDTO], Optional[str], Optional[int]]:
         company = await self.company_repo.get_by_id(company_id)
         if not company or company.owner_id != user.uuid:
             raise NotFoundError(
                 f"Company {company_id} not found or access denied")
 
-        products, total = await self.product_repo.get_all(company_id, limit,
-                                                          offset)
-        return [to_dto(product, ProductResponseDTO) for product in
-                products], total
+        return await self.product_repo.get_all_dto(
+            company_id, ProductResponseDTO, limit, cursor, with_total,
+        )
+
+    # Поиск доступен всем сотрудникам компании, не только CEO
+    async def search_products(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            text: str,
+            limit: int,
+            cursor: Optional[str] = None,
+    ) -> ProductSearchResponseDTO:
+        if str(user.company_id) != str(company_id):
+            raise ForbiddenError("No access to company")
+
+        text = text.strip()
+        if len(text) < 2:
+            raise BadRequestError("Search query is too short")
+
+        items, next_cursor = await self.product_repo.search_dto(
+            company_id, text, ProductResponseDTO, limit, cursor,
+        )
+        return ProductSearchResponseDTO(items=items, next_cursor=next_cursor)
 
     async def create_product(
             self,
@@ -101,8 +126,11 @@ class ProductService:
             item_type=data.item_type,
             dekart_parameters=data.dekart_parameters,
         )
-        product = await self.product_repo.insert(product)
-        return to_dto(product, ProductResponseDTO)
+        product = to_dto(
+            await self.product_repo.insert(product), ProductResponseDTO,
+        )
+        publish_product_upsert(self.session, product)
+        return product
 
     async def update_product(
             self,
@@ -140,7 +168,9 @@ class ProductService:
         if not updated_product:
             raise NotFoundError(f"Product {item_id} not found")
 
-        return to_dto(updated_product, ProductResponseDTO)
+        updated_product = to_dto(updated_product, ProductResponseDTO)
+        publish_product_upsert(self.session, updated_product)
+        return updated_product
 
     async def delete_product(
             self,
@@ -158,6 +188,7 @@ class ProductService:
             raise NotFoundError(f"Product {item_id} not found")
 
         await self.product_repo.delete(item_id, company_id)
+        publish_product_delete(self.session, item_id)
 
     async def upload_products_xls(
             self,
@@ -204,12 +235,14 @@ class ProductService:
                 dekart_parameters=product_data.dekart_parameters,
             )
 
-            product = await self.product_repo.insert(product)
-
             created_products.append(
-                to_dto(product, ProductResponseDTO),
+                await self.product_repo.insert(product),
             )
 
+        created_products = to_dto_list(created_products, ProductResponseDTO)
+        for product in created_products:
+            publish_product_upsert(self.session, product)
+
         return file_response, created_products
 
 
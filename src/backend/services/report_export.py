@@ -0,0 +1,160 @@
+from datetime import date, datetime, timezone
+import gzip
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.backend.core.config import settings
+from src.backend.core.database.async_engine import session_scope
+from src.backend.core.database.transactions import READ_SNAPSHOT
+from src.backend.core.enums import ExportFormat
+from src.backend.core.utils.minio import get_minio_client, upload_file
+from src.backend.services.report_service import ACTION_COLUMNS, ReportService
+
+__all__ = ("export_actions", "archive_report_partition")
+
+EXPORT_SCHEMA = pa.schema([
+    ("warehouse_id", pa.string()),
+    ("date", pa.string()),
+    ("product_id", pa.string()),
+    ("action", pa.string()),
+    ("quantity", pa.int64()),
+    ("timestamp", pa.string()),
+])
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("report_id", pa.string()),
+    ("warehouse_id", pa.string()),
+    ("company_id", pa.string()),
+    ("date", pa.date32()),
+    ("actions", pa.string()),
+])
+
+
+# Пишем выгрузку пачками: в памяти держим только один chunk,
+# parquet дописывается row group'ами, csv - в gzip-поток
+async def export_actions(
+    company_id: str,
+    date_from: date,
+    date_to: date,
+    warehouse_ids: Optional[List[str]] = None,
+    formats: Optional[List[ExportFormat]] = None,
+    engine: Optional[AsyncEngine] = None,
+    chunk_size: int = settings.report_export_chunk,
+) -> Dict[str, str]:
+    formats = formats or [ExportFormat.parquet, ExportFormat.csv]
+    export_id = str(uuid4())
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    temp_dir = tempfile.mkdtemp()
+    paths = {
+        ExportFormat.parquet: os.path.join(temp_dir, "actions.parquet"),
+        ExportFormat.csv: os.path.join(temp_dir, "actions.csv.gz"),
+    }
+
+    parquet_writer = None
+    csv_file = None
+    try:
+        if ExportFormat.parquet in formats:
+            parquet_writer = pq.ParquetWriter(
+                paths[ExportFormat.parquet],
+                EXPORT_SCHEMA,
+                compression="zstd",
+            )
+
+        if ExportFormat.csv in formats:
+            csv_file = gzip.open(paths[ExportFormat.csv], "wt", newline="")
+            csv_file.write(",".join(ACTION_COLUMNS) + "\n")
+
+        async for chunk in ReportService.stream_actions(
+            company_id,
+            date_from,
+            date_to,
+            warehouse_ids,
+            chunk_size=chunk_size,
+            engine=engine,
+        ):
+            frame = pd.DataFrame(chunk, columns=list(ACTION_COLUMNS))
+            if parquet_writer:
+                parquet_writer.write_table(
+                    pa.Table.from_pandas(
+                        frame,
+                        schema=EXPORT_SCHEMA,
+                        preserve_index=False,
+                    ),
+                )
+
+            if csv_file:
+                frame.to_csv(csv_file, header=False, index=False)
+
+        if parquet_writer:
+            parquet_writer.close()
+            parquet_writer = None
+
+        if csv_file:
+            csv_file.close()
+            csv_file = None
+
+        client = get_minio_client()
+        prefix = f"{company_id}/exports/{timestamp}_{export_id}"
+        return {
+            export_format.value: upload_file(
+                client,
+                settings.minio_bucket,
+                f"{prefix}/{os.path.basename(paths[export_format])}",
+                paths[export_format],
+            )
+            for export_format in formats
+        }
+    finally:
+        if parquet_writer:
+            parquet_writer.close()
+
+        if csv_file:
+            csv_file.close()
+
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# Перед отсоединением партиция целиком уходит в parquet-архив в MinIO
+async def archive_report_partition(
+    engine: AsyncEngine,
+    name: str,
+    chunk_size: int = settings.report_export_chunk,
+) -> str:
+    temp_dir = tempfile.mkdtemp()
+    path = os.path.join(temp_dir, f"{name}.parquet")
+    query = text(
+        f"SELECT report_id::text, warehouse_id::text, company_id::text, "
+        f"date, actions::text FROM {name}",
+    ).execution_options(yield_per=chunk_size)
+
+    try:
+        with pq.ParquetWriter(
+            path, ARCHIVE_SCHEMA, compression="zstd",
+        ) as writer:
+            async with session_scope(engine, READ_SNAPSHOT) as session:
+                result = await session.stream(query)
+                async for rows in result.partitions(chunk_size):
+                    writer.write_table(
+                        pa.Table.from_pylist(
+                            [dict(row._mapping) for row in rows],
+                            schema=ARCHIVE_SCHEMA,
+                        ),
+                    )
+
+        return upload_file(
+            get_minio_client(),
+            settings.minio_bucket,
+            f"archive/reports/{name}.parquet",
+            path,
+        )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
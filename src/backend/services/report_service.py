@@ -1,16 +1,87 @@
-from datetime import date
-from typing import Annotated, Any, Dict
+from collections import defaultdict
+import csv
+from datetime import date, datetime, time, timedelta, timezone
+from io import StringIO
+import json
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional
 
+from aioredis import Redis
 from fastapi import Depends
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (BigInteger, column, delete, func, select, text,
+                        true)
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from src.backend.core.database.async_engine import SessionDep
-from src.backend.core.exc.exceptions.exceptions import NotFoundError
+from src.backend.core.config import settings
+from src.backend.core.database.async_engine import SessionDep, session_scope
+from src.backend.core.database.transactions import (
+    is_serialization_failure,
+    READ_SNAPSHOT,
+)
+from src.backend.core.enums import (ReportAction, ReportFormat,
+                                    StatsGranularity)
+from src.backend.core.exc.exceptions.exceptions import (BadRequestError,
+                                                        NotFoundError)
+from src.backend.core.utils.batch_buffer import BatchBuffer
+from src.backend.core.utils.date import date_time
+from src.backend.core.utils.redis import get_redis_client
 from src.backend.models.report import Report
+from src.backend.models.warehouse_stats import WarehouseStats
 from src.backend.repos.warehouses import RepoWarehouse, WarehouseRepoDep
+from src.backend.schemes.report import (ActionTotalDTO, StatsBucketDTO,
+                                        TopProductDTO,
+                                        WarehouseStatsResponseDTO)
 
-__all__ = ("ReportService", "ReportServiceDep")
+__all__ = (
+    "ReportService",
+    "ReportServiceDep",
+    "action_buffer",
+    "drain_pending_actions",
+)
+
+PENDING_ACTIONS_KEY = "reports:pending"
+# записи, которые не пишутся ни пачкой, ни поодиночке
+DEAD_ACTIONS_KEY = "reports:dead"
+
+# warehouse_id -> company_id, склад не переезжает между компаниями
+_company_by_warehouse: dict[str, str] = {}
+
+ACTION_COLUMNS = (
+    "warehouse_id",
+    "date",
+    "product_id",
+    "action",
+    "quantity",
+    "timestamp",
+)
+
+REBUILD_STATS_QUERY = text("""
+    INSERT INTO warehouse_stats
+        (warehouse_id, company_id, product_id, action, hour, quantity, events)
+    SELECT r.warehouse_id,
+           r.company_id,
+           (a ->> 'product_id')::uuid,
+           a ->> 'action',
+           date_trunc(
+               'hour',
+               coalesce((a ->> 'timestamp')::timestamptz, r.date::timestamptz)
+           ),
+           sum(coalesce((a ->> 'quantity')::bigint, 1)),
+           count(*)
+    FROM reports r, jsonb_array_elements(r.actions) a
+    WHERE r.warehouse_id = :warehouse_id AND r.date = :day
+    GROUP BY 1, 2, 3, 4, 5
+""")
+
+
+def _day_bounds(date_from: date, date_to: date) -> tuple[datetime, datetime]:
+    return (
+        datetime.combine(date_from, time.min, tzinfo=timezone.utc),
+        datetime.combine(
+            date_to + timedelta(days=1), time.min, tzinfo=timezone.utc,
+        ),
+    )
 
 
 class ReportService:
@@ -24,32 +95,327 @@ class ReportService:
             warehouse_id: str,
             action: str,
             quantity: int = 1) -> None:
-        today = date.today()
-        report = await self.session.scalar(
-            select(Report).filter(
-                Report.warehouse_id == str(warehouse_id),
-                Report.date == today,
-            ),
-        )
-        company_id = await self.warehouse_repo.get_by_id(warehouse_id)
-        company_id = str(company_id.company_id)
-        if not report:
-            report = Report(
-                warehouse_id=str(warehouse_id),
-                company_id=company_id,
-                date=today,
-                actions=[],
-            )
-            self.session.add(report)
-
-        action_entry = {
+        now = datetime.now(timezone.utc)
+        await action_buffer.put({
+            "warehouse_id": str(warehouse_id),
+            "date": now.date().isoformat(),
             "product_id": str(product_id),
             "action": action,
             "quantity": quantity,
-        }
-        report.actions.append(action_entry)
+            "timestamp": now.isoformat(),
+        })
+
+    async def write_actions(self, entries: List[Dict[str, Any]]) -> None:
+        missing = list({
+            entry["warehouse_id"] for entry in entries
+            if entry["warehouse_id"] not in _company_by_warehouse
+        })
+        if missing:
+            _company_by_warehouse.update(
+                await self.warehouse_repo.get_company_ids(missing),
+            )
+
+        grouped = defaultdict(list)
+        counters = defaultdict(lambda: [0, 0])
+        dropped = defaultdict(int)
+        for entry in entries:
+            company_id = _company_by_warehouse.get(entry["warehouse_id"])
+            if not company_id:
+                dropped[entry["warehouse_id"]] += 1
+                continue
+
+            key = (entry["warehouse_id"], company_id, entry["date"])
+            grouped[key].append({
+                "product_id": entry["product_id"],
+                "action": entry["action"],
+                "quantity": entry["quantity"],
+                "timestamp": entry["timestamp"],
+            })
+
+            hour = datetime.fromisoformat(entry["timestamp"]).replace(
+                minute=0, second=0, microsecond=0,
+            )
+            counter = counters[(
+                entry["warehouse_id"],
+                company_id,
+                entry["product_id"],
+                entry["action"],
+                hour,
+            )]
+            counter[0] += entry["quantity"]
+            counter[1] += 1
+
+        if dropped:
+            print(
+                f"{date_time(datetime.now())}.Actions of unknown warehouses "
+                f"dropped: {dict(dropped)}",
+            )
+
+        if not grouped:
+            return
+
+        query = insert(Report).values([
+            {
+                "warehouse_id": warehouse_id,
+                "company_id": company_id,
+                "date": date.fromisoformat(day),
+                "actions": actions,
+            }
+            for (warehouse_id, company_id, day), actions in grouped.items()
+        ])
+        query = query.on_conflict_do_update(
+            index_elements=[Report.warehouse_id, Report.date],
+            set_={"actions": Report.actions.op("||")(query.excluded.actions)},
+        )
+        await self.session.execute(query)
+        await self._increment_stats(counters)
+        await self.session.flush()
+
+    async def _increment_stats(self, counters: dict) -> None:
+        query = insert(WarehouseStats).values([
+            {
+                "warehouse_id": warehouse_id,
+                "company_id": company_id,
+                "product_id": product_id,
+                "action": action,
+                "hour": hour,
+                "quantity": quantity,
+                "events": events,
+            }
+            for (
+                warehouse_id, company_id, product_id, action, hour,
+            ), (quantity, events) in counters.items()
+        ])
+        query = query.on_conflict_do_update(
+            index_elements=[
+                WarehouseStats.warehouse_id,
+                WarehouseStats.product_id,
+                WarehouseStats.action,
+                WarehouseStats.hour,
+            ],
+            set_={
+                "quantity": WarehouseStats.quantity + query.excluded.quantity,
+                "events": WarehouseStats.events + query.excluded.events,
+            },
+        )
+        await self.session.execute(query)
+
+    # Пересчет счетчиков за день из сырых действий (ремонт/бэкфилл)
+    async def rebuild_stats(self, warehouse_id: str, day: date) -> None:
+        start, end = _day_bounds(day, day)
+        await self.session.execute(
+            delete(WarehouseStats).filter(
+                WarehouseStats.warehouse_id == warehouse_id,
+                WarehouseStats.hour >= start,
+                WarehouseStats.hour < end,
+            ),
+        )
+        await self.session.execute(
+            REBUILD_STATS_QUERY,
+            {"warehouse_id": warehouse_id, "day": day},
+        )
         await self.session.flush()
 
+    # Скорость подбора по часовым агрегатам warehouse_stats (та же
+    # история, что в Report.actions, но уже свёрнутая): число подборов
+    # и единиц по товару с начала дня since, от самых частых
+    async def pick_velocity(
+            self,
+            warehouse_id: str,
+            since: date,
+            limit: int,
+    ) -> List[Any]:
+        start, _ = _day_bounds(since, since)
+        picks = func.sum(WarehouseStats.events).label("picks")
+        result = await self.session.execute(
+            select(
+                WarehouseStats.product_id,
+                picks,
+                func.sum(WarehouseStats.quantity).label("units"),
+            )
+            .filter(
+                WarehouseStats.warehouse_id == warehouse_id,
+                WarehouseStats.action == ReportAction.picked.value,
+                WarehouseStats.hour >= start,
+            )
+            .group_by(WarehouseStats.product_id)
+            .order_by(picks.desc())
+            .limit(limit),
+        )
+        return list(result.all())
+
+    async def get_warehouse_stats(
+            self,
+            warehouse_id: str,
+            date_from: date,
+            date_to: date,
+            granularity: StatsGranularity = StatsGranularity.day,
+            top: int = 10,
+            action: Optional[str] = None,
+    ) -> WarehouseStatsResponseDTO:
+        if date_from > date_to:
+            raise BadRequestError("date_from must not be after date_to")
+
+        start, end = _day_bounds(date_from, date_to)
+        filters = [
+            WarehouseStats.warehouse_id == warehouse_id,
+            WarehouseStats.hour >= start,
+            WarehouseStats.hour < end,
+        ]
+
+        totals = await self.session.execute(
+            select(
+                WarehouseStats.action,
+                func.sum(WarehouseStats.quantity),
+                func.sum(WarehouseStats.events),
+            )
+            .filter(*filters)
+            .group_by(WarehouseStats.action)
+            .order_by(WarehouseStats.action),
+        )
+
+        bucket = func.date_trunc(granularity.value, WarehouseStats.hour)
+        series = await self.session.execute(
+            select(
+                bucket,
+                WarehouseStats.action,
+                func.sum(WarehouseStats.quantity),
+            )
+            .filter(*filters)
+            .group_by(bucket, WarehouseStats.action)
+            .order_by(bucket, WarehouseStats.action),
+        )
+
+        product_filters = list(filters)
+        if action:
+            product_filters.append(WarehouseStats.action == action)
+
+        product_quantity = func.sum(WarehouseStats.quantity)
+        top_products = await self.session.execute(
+            select(
+                WarehouseStats.product_id,
+                product_quantity,
+                func.sum(WarehouseStats.events),
+            )
+            .filter(*product_filters)
+            .group_by(WarehouseStats.product_id)
+            .order_by(product_quantity.desc())
+            .limit(top),
+        )
+
+        return WarehouseStatsResponseDTO(
+            warehouse_id=str(warehouse_id),
+            date_from=date_from,
+            date_to=date_to,
+            granularity=granularity,
+            totals=[
+                ActionTotalDTO(action=name, quantity=quantity, events=events)
+                for name, quantity, events in totals.all()
+            ],
+            series=[
+                StatsBucketDTO(bucket=moment, action=name, quantity=quantity)
+                for moment, name, quantity in series.all()
+            ],
+            top_products=[
+                TopProductDTO(
+                    product_id=str(product_id),
+                    quantity=quantity,
+                    events=events,
+                )
+                for product_id, quantity, events in top_products.all()
+            ],
+        )
+
+    # Стрим живет дольше зависимости SessionDep, поэтому открывает
+    # собственную сессию и читает серверным курсором пачками chunk_size
+    @staticmethod
+    async def stream_actions(
+            company_id: str,
+            date_from: date,
+            date_to: date,
+            warehouse_ids: Optional[List[str]] = None,
+            chunk_size: int = 1000,
+            engine: Optional[AsyncEngine] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        if date_from > date_to:
+            raise BadRequestError("date_from must not be after date_to")
+
+        elements = (
+            func.jsonb_array_elements(Report.actions)
+            .table_valued(column("value", JSONB))
+            .lateral("a")
+        )
+        entry = elements.c.value
+        query = (
+            select(
+                Report.warehouse_id,
+                Report.date,
+                entry["product_id"].astext.label("product_id"),
+                entry["action"].astext.label("action"),
+                entry["quantity"].astext.cast(BigInteger).label("quantity"),
+                entry["timestamp"].astext.label("timestamp"),
+            )
+            .select_from(Report)
+            .join(elements, true())
+            .filter(
+                Report.company_id == company_id,
+                Report.date >= date_from,
+                Report.date <= date_to,
+            )
+            .order_by(Report.date, Report.warehouse_id)
+            .execution_options(yield_per=chunk_size)
+        )
+        if warehouse_ids:
+            query = query.filter(Report.warehouse_id.in_(warehouse_ids))
+
+        async with session_scope(engine, READ_SNAPSHOT) as session:
+            result = await session.stream(query)
+            async for rows in result.partitions(chunk_size):
+                yield [
+                    {
+                        "warehouse_id": str(row.warehouse_id),
+                        "date": row.date.isoformat(),
+                        "product_id": row.product_id,
+                        "action": row.action,
+                        "quantity": row.quantity,
+                        "timestamp": row.timestamp,
+                    }
+                    for row in rows
+                ]
+
+    # Проверяем параметры до старта стрима, пока еще можно вернуть 400
+    def stream_report(
+            self,
+            company_id: str,
+            date_from: date,
+            date_to: date,
+            warehouse_ids: Optional[List[str]] = None,
+            report_format: ReportFormat = ReportFormat.ndjson,
+    ) -> AsyncIterator[str]:
+        if date_from > date_to:
+            raise BadRequestError("date_from must not be after date_to")
+
+        return self._format_actions(
+            self.stream_actions(company_id, date_from, date_to, warehouse_ids),
+            report_format,
+        )
+
+    @staticmethod
+    async def _format_actions(
+            chunks: AsyncIterator[List[Dict[str, Any]]],
+            report_format: ReportFormat,
+    ) -> AsyncIterator[str]:
+        if report_format == ReportFormat.csv:
+            yield ",".join(ACTION_COLUMNS) + "\r\n"
+
+        async for chunk in chunks:
+            if report_format == ReportFormat.csv:
+                buffer = StringIO()
+                csv.DictWriter(buffer, ACTION_COLUMNS).writerows(chunk)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(row) + "\n" for row in chunk)
+
     async def get_daily_report(
             self, warehouse_id: str, report_date: date,
     ) -> Dict[str, Any]:
@@ -69,6 +435,103 @@ class ReportService:
         }
 
 
+async def flush_actions(entries: List[Dict[str, Any]]) -> None:
+    async with session_scope() as session:
+        await ReportService(session, RepoWarehouse(session)).write_actions(
+            entries,
+        )
+
+
+async def spill_actions(entries: List[Dict[str, Any]]) -> None:
+    async with get_redis_client() as redis:
+        await redis.rpush(
+            PENDING_ACTIONS_KEY,
+            *[json.dumps(entry) for entry in entries],
+        )
+
+
+# Сбой соединения или сериализации - повод повторить позже,
+# остальные ошибки вызваны самими записями
+def _is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (OSError, OperationalError, InterfaceError)):
+        return True
+
+    return isinstance(exc, DBAPIError) and (
+        exc.connection_invalidated or is_serialization_failure(exc)
+    )
+
+
+# Разбирает записи, которые не удалось записать из процесса API.
+# Читаем без удаления и обрезаем список только после коммита.
+# Если пачка не пишется, записи пробуются по одной, а сломанные
+# уходят в DEAD_ACTIONS_KEY, чтобы не блокировать очередь
+async def drain_pending_actions(
+        session: AsyncSession,
+        batch_size: int = settings.report_flush_batch,
+) -> int:
+    drained = 0
+    service = ReportService(session, RepoWarehouse(session))
+    async with get_redis_client() as redis:
+        while True:
+            raw = await redis.lrange(PENDING_ACTIONS_KEY, 0, batch_size - 1)
+            if not raw:
+                break
+
+            try:
+                await service.write_actions(
+                    [json.loads(item) for item in raw],
+                )
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                if _is_transient(e):
+                    raise
+
+                await _drain_one_by_one(service, session, redis, raw)
+
+            await redis.ltrim(PENDING_ACTIONS_KEY, len(raw), -1)
+            drained += len(raw)
+
+    return drained
+
+
+async def _drain_one_by_one(
+        service: ReportService,
+        session: AsyncSession,
+        redis: Redis,
+        raw: List[Any],
+) -> None:
+    dead = []
+    for done, item in enumerate(raw):
+        try:
+            await service.write_actions([json.loads(item)])
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            if _is_transient(e):
+                # записанное не должно попасть в БД повторно
+                if dead:
+                    await redis.rpush(DEAD_ACTIONS_KEY, *dead)
+                await redis.ltrim(PENDING_ACTIONS_KEY, done, -1)
+                raise
+
+            print(f"{date_time(datetime.now())}.Dead action {item}: {e}")
+            dead.append(item)
+
+    if dead:
+        await redis.rpush(DEAD_ACTIONS_KEY, *dead)
+
+
+action_buffer = BatchBuffer(
+    flush=flush_actions,
+    spill=spill_actions,
+    maxsize=settings.report_buffer_size,
+    batch_size=settings.report_flush_batch,
+    flush_interval=settings.report_flush_interval_ms / 1000,
+    put_timeout=settings.report_put_timeout_ms / 1000,
+)
+
+
 async def get_report_service(
         session: SessionDep,
         warehouse_repo: WarehouseRepoDep,
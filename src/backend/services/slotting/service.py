@@ -0,0 +1,142 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.core.config import settings
+from src.backend.core.utils.packing import unit_volume
+from src.backend.core.utils.routing import rect_centers
+from src.backend.core.utils.slotting import plan_slotting
+from src.backend.repos.storages import RepoStorage
+from src.backend.schemes.slotting import SlottingMoveDTO, SlottingPlanDTO
+from src.backend.services.report_service import ReportService
+
+__all__ = ("SlottingService",)
+
+
+class SlottingService:
+    def __init__(
+            self,
+            session: AsyncSession,
+            storage_repo: RepoStorage,
+            report_service: ReportService,
+    ):
+        self.session = session
+        self.storage_repo = storage_repo
+        self.report_service = report_service
+
+    # Офлайн-план перестановок: самые частые по подбору товары -
+    # на полки, ближайшие к отгрузке. Только расчёт, остатки не
+    # трогаются; перенос выполняется обычными списанием и приёмкой
+    async def plan(
+            self,
+            warehouse_id: str,
+            days: Optional[int] = None,
+            dock: Optional[List[float]] = None,
+    ) -> SlottingPlanDTO:
+        since = datetime.now(timezone.utc).date() - timedelta(
+            days=days or settings.slotting_history_days,
+        )
+        velocity_rows = await self.report_service.pick_velocity(
+            warehouse_id, since, settings.slotting_max_items,
+        )
+        item_ids = [str(row.product_id) for row in velocity_rows]
+        if not item_ids:
+            return _empty_plan(warehouse_id, since)
+
+        shelves = await self.storage_repo.get_warehouse_shelves(warehouse_id)
+        placements = await self.storage_repo.get_placements(
+            warehouse_id, item_ids,
+        )
+        products = await self.storage_repo.get_products_by_ids(item_ids)
+
+        item_index = {item_id: index for index, item_id in enumerate(item_ids)}
+        shelf_ids = [str(shelf.shelf_id) for shelf in shelves]
+        shelf_index = {shelf_id: index for index, shelf_id in enumerate(
+            shelf_ids,
+        )}
+        plan = plan_slotting(
+            velocity=np.array([row.picks for row in velocity_rows], float),
+            unit_volume=np.array([
+                unit_volume(
+                    products[item_id].dekart_parameters
+                    if item_id in products else None,
+                )
+                for item_id in item_ids
+            ]),
+            placements=np.array(
+                [
+                    (
+                        item_index[str(placement.item_id)],
+                        shelf_index[str(placement.shelf_id)],
+                        placement.quantity,
+                    )
+                    for placement in placements
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 3),
+            distance=_dock_distances(shelves, dock),
+            free=np.array([
+                shelf.space - shelf.occupied_space for shelf in shelves
+            ], float),
+        )
+
+        storage_by_shelf = [str(shelf.storage_id) for shelf in shelves]
+        return SlottingPlanDTO(
+            warehouse_id=str(warehouse_id),
+            since=since,
+            items=len(item_ids),
+            # сначала переносы самых частых товаров
+            moves=[
+                SlottingMoveDTO(
+                    item_id=item_ids[item],
+                    from_shelf_id=shelf_ids[source],
+                    from_storage_id=storage_by_shelf[source],
+                    to_shelf_id=shelf_ids[target],
+                    to_storage_id=storage_by_shelf[target],
+                    quantity=quantity,
+                )
+                for item, source, target, quantity in sorted(
+                    plan.moves, key=lambda move: move[0],
+                )
+            ],
+            unplaced={
+                item_ids[item]: int(count)
+                for item, count in enumerate(plan.unplaced.tolist())
+                if count
+            },
+            walk_before=plan.cost_before,
+            walk_after=plan.cost_after,
+        )
+
+
+# Манхэттенское расстояние от отгрузки до центра стеллажа полки;
+# стеллажи без координат считаются самыми дальними
+def _dock_distances(shelves: list, dock: Optional[List[float]]) -> np.ndarray:
+    known = np.array([
+        bool(shelf.coordinates) and len(shelf.coordinates) == 4
+        for shelf in shelves
+    ], dtype=bool)
+    distances = np.zeros(len(shelves))
+    if known.any():
+        centers = rect_centers([
+            shelf.coordinates
+            for shelf, valid in zip(shelves, known) if valid
+        ])
+        distances[known] = np.abs(
+            centers - np.asarray(dock or (0.0, 0.0), float),
+        ).sum(axis=1)
+        distances[~known] = distances[known].max() + 1
+
+    return distances
+
+
+def _empty_plan(warehouse_id: str, since: date) -> SlottingPlanDTO:
+    return SlottingPlanDTO(
+        warehouse_id=str(warehouse_id),
+        since=since,
+        items=0,
+        walk_before=0.0,
+        walk_after=0.0,
+    )
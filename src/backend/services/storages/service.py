@@ -1,34 +1,61 @@
 from datetime import datetime, timezone
 import json
-from typing import Annotated, Any, Dict, List, Optional, Union
-from uuid import uuid4
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Union
+from uuid import UUID, uuid4
 
 from aioredis import Redis
 from fastapi import Depends
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.backend.core.config import settings
 from src.backend.core.database.async_engine import SessionDep
+from src.backend.core.database.transactions import after_commit
 from src.backend.core.exc.exceptions.exceptions import (BadRequestError,
-                                                        ForbiddenError,
                                                         NotFoundError)
 from src.backend.core.utils.dto_refactor import to_dto
+from src.backend.core.utils.packing import fit_counts, shelf_dimensions
 from src.backend.core.utils.redis import get_redis_client
+from src.backend.core.utils.spatial import (GridIndex, IndexCache,
+                                            spatial_version_key)
 from src.backend.models.shelves import Shelves
 from src.backend.models.storage import Storages
 from src.backend.repos.companies import CompanyRepoDep, RepoCompany
 from src.backend.repos.storages import RepoStorage, StorageRepoDep
 from src.backend.repos.users import RepoUsers, UsersReposDep
 from src.backend.repos.warehouses import RepoWarehouse, WarehouseRepoDep
-from src.backend.schemes.product_locate import (ProductLocationDTO,
-                                                ProductLocationResponseDTO)
+from src.backend.schemes.product_locate import (ProductLocateResponseDTO,
+                                                ProductLocationDTO,
+                                                ProductLocationResponseDTO,
+                                                ProductShelfDTO)
 from src.backend.schemes.storage_settings import (
     StorageSettingsCreateDTO, StorageSettingsResponseDTO,
     StorageSettingsUpdateModelDTO)
+from src.backend.schemes.storage_spatial import (StorageSpotDTO,
+                                                 StorageSpotResponseDTO)
 from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.permissions.service import (PermissionService,
+                                                      PermissionServiceDep)
+from src.backend.services.products.scan import publish_stock_change
 from src.backend.services.users.deps import CEODep, RegManagerDep
 
 __all__ = ("StorageService",
-           "StorageServiceDep")
+           "StorageServiceDep",
+           "drop_layout_cache")
+
+_spatial_indexes = IndexCache(
+    settings.spatial_cache_size, settings.spatial_cache_ttl,
+)
+
+
+# Кэш схемы склада сбрасывается только после commit: иначе
+# параллельный запрос успеет закэшировать незакоммиченное состояние
+def drop_layout_cache(session: AsyncSession, warehouse_id: str) -> None:
+    async def drop() -> None:
+        async with get_redis_client() as redis:
+            await redis.delete(f"layout:{warehouse_id}")
+
+    after_commit(session, drop)
 
 
 class StorageService:
@@ -40,6 +67,7 @@ class StorageService:
             user_repo: RepoUsers,
             warehouse_repo: RepoWarehouse,
             redis_client: Redis,
+            permission_service: PermissionService,
     ):
         self.session = session
         self.storage_repo = storage_repo
@@ -47,29 +75,14 @@ class StorageService:
         self.user_repo = user_repo
         self.warehouse_repo = warehouse_repo
         self.redis_client = redis_client
+        self.permission_service = permission_service
 
     async def check_access(
             self, user: AuthUserDep, warehouse_id: str, company_id: str,
     ) -> None:
-        cache_key = f"access:{user.uuid}:{company_id}:{warehouse_id}"
-        async with self.redis_client as redis:
-            cached_access = await redis.get(cache_key)
-            if cached_access == b"allowed":
-                return
-
-            if cached_access == b"denied":
-                raise ForbiddenError("No access to warehouse")
-
-        access_data = await self.user_repo.check_user_access_combined(
-            user.uuid, company_id, warehouse_id)
-        is_allowed = access_data["owner_id"] == user.uuid or access_data[
-            "access_level"] == "regional_manager"
-        async with self.redis_client as redis:
-            await redis.setex(cache_key, 86400,
-                              "allowed" if is_allowed else "denied")
-
-        if not is_allowed:
-            raise ForbiddenError("No access to warehouse")
+        await self.permission_service.require_manager(
+            user.uuid, company_id, warehouse_id,
+        )
 
     async def create_storage(
             self,
@@ -101,11 +114,11 @@ class StorageService:
             shelves_parameters=data.parameters,
             space=data.space,
             occupied_space=0.0,
-            products_list=[],
             updated_at=datetime.now(timezone.utc),
         )
         shelf = await self.storage_repo.insert_shelf(shelf)
         storage.storage_id_list.append(shelf.shelf_id)
+        self._invalidate_spatial(data.warehouse_id)
 
         await self.session.flush()
         await self.session.refresh(storage)
@@ -128,6 +141,7 @@ class StorageService:
                     "Coordinates must have 4 values: [x1, y1, x2, y2]")
 
             storage.coordinates = data.coordinates
+            self._invalidate_spatial(storage.warehouse_id)
 
         await self.session.flush()
         await self.session.refresh(storage)
@@ -144,6 +158,9 @@ class StorageService:
             raise NotFoundError(f"Storage {storage_id} not found")
 
         await self.storage_repo.delete_storage(storage_id)
+        self._invalidate_spatial(storage.warehouse_id)
+        # размещения удалены каскадом, какие товары задеты - неизвестно
+        publish_stock_change(self.session, None)
         return True
 
     async def duplicate_storage(
@@ -177,12 +194,12 @@ class StorageService:
                 shelves_parameters=shelf.shelves_parameters,
                 space=shelf.space,
                 occupied_space=0.0,
-                products_list=[],
                 updated_at=datetime.now(timezone.utc),
             )
             new_shelf = await self.storage_repo.insert_shelf(new_shelf)
             new_storage.storage_id_list.append(new_shelf.shelf_id)
 
+        self._invalidate_spatial(new_storage.warehouse_id)
         await self.session.flush()
         await self.session.refresh(new_storage)
         return to_dto(new_storage, StorageSettingsResponseDTO)
@@ -234,13 +251,16 @@ class StorageService:
                 await self.storage_repo.get_shelves_by_storage(
                     storage.storage_id,
                 )
+            shelf_items = await self.storage_repo.get_shelf_items(
+                [shelf.shelf_id for shelf in shelves_in_storage],
+            )
             shelf_list = [
                 {
                     "shelf_id": shelf.shelf_id,
                     "parameters": shelf.parameters,
                     "occupied_space": shelf.occupied_space,
                     "space": shelf.space,
-                    "products": shelf.products_list,
+                    "products": shelf_items.get(str(shelf.shelf_id), []),
                 }
                 for shelf in shelves_in_storage
             ]
@@ -258,19 +278,61 @@ class StorageService:
 
         return layout
 
+    async def locate_product(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            item_id: UUID,
+            warehouse_id: Optional[UUID] = None,
+    ) -> ProductLocateResponseDTO:
+        if warehouse_id:
+            await self.permission_service.require_access(
+                user.uuid, company_id, warehouse_id,
+            )
+            allowed = {str(warehouse_id)}
+        else:
+            allowed = await self.permission_service.require_company_access(
+                user.uuid, company_id,
+            )
+
+        shelves = [
+            shelf
+            for shelf in await self.storage_repo.locate_product(
+                item_id, company_id, warehouse_id,
+            )
+            if str(shelf.warehouse_id) in allowed
+        ]
+        return ProductLocateResponseDTO(
+            item_id=str(item_id),
+            shelves=[
+                ProductShelfDTO(
+                    shelf_id=str(shelf.shelf_id),
+                    storage_id=str(shelf.storage_id),
+                    warehouse_id=str(shelf.warehouse_id),
+                    quantity=shelf.quantity or 0,
+                )
+                for shelf in shelves
+            ],
+        )
+
     async def add_product_to_shelf(
             self,
             user: Union[CEODep, RegManagerDep],
             storage_id: str,
             company_id: str,
+            warehouse_id: str,
             data: ProductLocationDTO,
     ) -> ProductLocationResponseDTO:
         storage = await self.storage_repo.get_by_id(storage_id)
-        if not storage or storage.company_id != company_id:
+        if (
+            not storage
+            or str(storage.company_id) != str(company_id)
+            or str(storage.warehouse_id) != str(warehouse_id)
+        ):
             raise NotFoundError(f"Storage {storage_id} not found")
 
         product = await self.storage_repo.get_product_by_id(data.item_id)
-        if not product:
+        if not product or str(product.company_id) != str(company_id):
             raise NotFoundError(f"Product {data.item_id} not found")
 
         shelves = await self.storage_repo.get_shelves_by_storage(
@@ -279,21 +341,176 @@ class StorageService:
             raise NotFoundError(
                 f"Shelves for storage {storage_id} not found")
 
-        for shelf in shelves:
-            volume = product.dekart_parameters[0] * data.quantity
-
-            if shelf.occupied_space + volume <= shelf.space:
-                shelf.occupied_space += volume
-                shelf.products_list.append(data.item_id)
-                await self.session.flush()
-                return ProductLocationResponseDTO(
-                    storage_id=storage_id,
-                    message="Product placed successfully",
-                    free_space_left=shelf.space - shelf.occupied_space,
-                )
+        item = product.dekart_parameters or []
+        if len(item) < 3:
+            raise BadRequestError(
+                f"Product {data.item_id} has no dimensions")
+
+        volume = float(np.prod(item[:3])) * data.quantity
+        fits = fit_counts(
+            item,
+            shelf_dimensions([shelf.parameters for shelf in shelves]),
+            occupied=np.array([shelf.occupied_space for shelf in shelves]),
+            space=np.array([shelf.space for shelf in shelves]),
+        )
+
+        # fits посчитан по снимку; место реально резервирует условный
+        # UPDATE, а если полку успела занять параллельная приёмка -
+        # переходим к следующей подходящей
+        for shelf, fit in zip(shelves, fits):
+            if fit < data.quantity:
+                continue
+
+            free_space_left = await self.storage_repo.reserve_shelf_space(
+                shelf.shelf_id, volume,
+            )
+            if free_space_left is None:
+                continue
+
+            await self.storage_repo.add_shelf_item(
+                shelf.shelf_id, data.item_id, data.quantity,
+            )
+            publish_stock_change(self.session, [data.item_id])
+            drop_layout_cache(self.session, storage.warehouse_id)
+
+            return ProductLocationResponseDTO(
+                storage_id=storage_id,
+                message="Product placed successfully",
+                free_space_left=max(free_space_left, 0.0),
+            )
 
         raise BadRequestError("No free space on shelves")
 
+    # Новая версия в Redis заставит все воркеры перестроить индекс
+    # склада при следующем запросе. Только после commit: иначе индекс
+    # из незакоммиченного состояния закэшировался бы под новой версией
+    def _invalidate_spatial(self, warehouse_id: str) -> None:
+        async def bump() -> None:
+            _spatial_indexes.pop(str(warehouse_id))
+            async with get_redis_client() as redis:
+                await redis.incr(spatial_version_key(warehouse_id))
+
+        after_commit(self.session, bump)
+
+    async def _spatial_index(self, warehouse_id: str) -> GridIndex:
+        async with get_redis_client() as redis:
+            version = await redis.get(spatial_version_key(warehouse_id))
+
+        version = str(version or 0)
+        index = _spatial_indexes.get(str(warehouse_id), version)
+        if index is None:
+            boxes = await self.storage_repo.get_storage_boxes(warehouse_id)
+            index = GridIndex(
+                [str(box.storage_id) for box in boxes],
+                [box.coordinates for box in boxes],
+            )
+            _spatial_indexes.put(str(warehouse_id), version, index)
+
+        return index
+
+    async def find_storages_at_point(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            warehouse_id: str,
+            x: float,
+            y: float,
+    ) -> StorageSpotResponseDTO:
+        await self.permission_service.require_access(
+            user.uuid, company_id, warehouse_id,
+        )
+
+        if settings.spatial_backend == "postgres":
+            rows = await self.storage_repo.find_storages_at_point(
+                warehouse_id, x, y,
+            )
+            return _spots(warehouse_id, rows)
+
+        index = await self._spatial_index(warehouse_id)
+        return _grid_spots(warehouse_id, index, index.at_point(x, y))
+
+    async def find_storages_in_region(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            warehouse_id: str,
+            region: Tuple[float, float, float, float],
+            contained: bool = False,
+    ) -> StorageSpotResponseDTO:
+        await self.permission_service.require_access(
+            user.uuid, company_id, warehouse_id,
+        )
+
+        if settings.spatial_backend == "postgres":
+            rows = await self.storage_repo.find_storages_in_region(
+                warehouse_id, region, contained,
+            )
+            return _spots(warehouse_id, rows)
+
+        index = await self._spatial_index(warehouse_id)
+        return _grid_spots(
+            warehouse_id, index, index.in_region(*region, contained),
+        )
+
+    async def find_nearest_storages(
+            self,
+            user: AuthUserDep,
+            company_id: str,
+            warehouse_id: str,
+            x: float,
+            y: float,
+            limit: int = 1,
+    ) -> StorageSpotResponseDTO:
+        await self.permission_service.require_access(
+            user.uuid, company_id, warehouse_id,
+        )
+
+        if settings.spatial_backend == "postgres":
+            rows = await self.storage_repo.find_nearest_storages(
+                warehouse_id, x, y, limit,
+            )
+            return _spots(warehouse_id, rows)
+
+        index = await self._spatial_index(warehouse_id)
+        found, distances = index.nearest(x, y, limit)
+        return _grid_spots(warehouse_id, index, found, distances)
+
+
+def _spots(warehouse_id: str, rows: List[Any]) -> StorageSpotResponseDTO:
+    return StorageSpotResponseDTO(
+        warehouse_id=str(warehouse_id),
+        storages=[
+            StorageSpotDTO(
+                storage_id=str(row.storage_id),
+                coordinates=list(row.coordinates),
+                distance=getattr(row, "distance", None),
+            )
+            for row in rows
+        ],
+    )
+
+
+def _grid_spots(
+        warehouse_id: str,
+        index: GridIndex,
+        found: np.ndarray,
+        distances: Optional[np.ndarray] = None,
+) -> StorageSpotResponseDTO:
+    return StorageSpotResponseDTO(
+        warehouse_id=str(warehouse_id),
+        storages=[
+            StorageSpotDTO(
+                storage_id=index.ids[position],
+                coordinates=index.rects[position].tolist(),
+                distance=(
+                    float(distances[number])
+                    if distances is not None else None
+                ),
+            )
+            for number, position in enumerate(found.tolist())
+        ],
+    )
+
 
 async def get_storage_service(
         session: SessionDep,
@@ -302,6 +519,7 @@ async def get_storage_service(
         user_repo: UsersReposDep,
         warehouse_repo: WarehouseRepoDep,
         redis_client: Annotated[Redis, Depends(get_redis_client)],
+        permission_service: PermissionServiceDep,
 ) -> StorageService:
     return StorageService(
         session=session,
@@ -310,6 +528,7 @@ async def get_storage_service(
         user_repo=user_repo,
         warehouse_repo=warehouse_repo,
         redis_client=redis_client,
+        permission_service=permission_service,
     )
 
 StorageServiceDep = Annotated[StorageService, Depends(get_storage_service)]
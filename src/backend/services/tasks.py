@@ -0,0 +1,235 @@
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.backend.core.config import settings
+from src.backend.core.database.async_engine import (create_task_engine,
+                                                    session_scope)
+from src.backend.core.database.partitions import (add_months,
+                                                  create_default_partition,
+                                                  create_monthly_partitions,
+                                                  detach_partition,
+                                                  drop_partition,
+                                                  list_partitions,
+                                                  month_start,
+                                                  partition_month)
+from src.backend.core.database.transactions import (
+    READ_SNAPSHOT,
+    retry_on_serialization_failure,
+)
+from src.backend.core.enums import CounterEntity, ExportFormat
+from src.backend.core.utils.celery import get_celery_client
+from src.backend.models.report import Report
+from src.backend.repos.counters import RepoCounters
+from src.backend.repos.storages import RepoStorage
+from src.backend.repos.warehouses import RepoWarehouse
+from src.backend.services.report_export import (archive_report_partition,
+                                                export_actions)
+from src.backend.services.report_service import (drain_pending_actions,
+                                                 ReportService)
+from src.backend.services.slotting.service import SlottingService
+
+__all__ = (
+    "celery",
+    "drain_pending_actions_task",
+    "rebuild_warehouse_stats_task",
+    "export_actions_task",
+    "maintain_report_partitions_task",
+    "reconcile_counters_task",
+    "plan_slotting_task",
+)
+
+celery = get_celery_client()
+
+celery.conf.beat_schedule = {
+    "drain-pending-actions": {
+        "task": "reports.drain_pending_actions",
+        "schedule": float(settings.report_drain_interval),
+    },
+    "maintain-report-partitions": {
+        "task": "reports.maintain_report_partitions",
+        "schedule": 6 * 60 * 60.0,
+    },
+    "reconcile-counters": {
+        "task": "counters.reconcile",
+        "schedule": float(settings.counter_reconcile_interval),
+    },
+}
+
+
+@retry_on_serialization_failure()
+async def _drain_in_transaction(engine: AsyncEngine) -> int:
+    async with session_scope(engine) as session:
+        return await drain_pending_actions(session)
+
+
+async def _drain_pending_actions() -> int:
+    engine = create_task_engine()
+    try:
+        return await _drain_in_transaction(engine)
+    finally:
+        await engine.dispose()
+
+
+@celery.task(name="reports.drain_pending_actions")
+def drain_pending_actions_task() -> int:
+    return asyncio.run(_drain_pending_actions())
+
+
+@retry_on_serialization_failure()
+async def _rebuild_in_transaction(
+    engine: AsyncEngine, warehouse_id: str, day: date,
+) -> None:
+    async with session_scope(engine) as session:
+        await ReportService(
+            session, RepoWarehouse(session),
+        ).rebuild_stats(warehouse_id, day)
+
+
+async def _rebuild_warehouse_stats(warehouse_id: str, day: date) -> None:
+    engine = create_task_engine()
+    try:
+        await _rebuild_in_transaction(engine, warehouse_id, day)
+    finally:
+        await engine.dispose()
+
+
+@celery.task(name="reports.rebuild_warehouse_stats")
+def rebuild_warehouse_stats_task(warehouse_id: str, day: str) -> None:
+    asyncio.run(
+        _rebuild_warehouse_stats(warehouse_id, date.fromisoformat(day)),
+    )
+
+
+async def _export_actions(
+    company_id: str,
+    date_from: date,
+    date_to: date,
+    warehouse_ids: Optional[List[str]],
+    formats: List[ExportFormat],
+) -> Dict[str, str]:
+    engine = create_task_engine()
+    try:
+        return await export_actions(
+            company_id,
+            date_from,
+            date_to,
+            warehouse_ids=warehouse_ids,
+            formats=formats,
+            engine=engine,
+        )
+    finally:
+        await engine.dispose()
+
+
+@celery.task(name="reports.export_actions")
+def export_actions_task(
+    company_id: str,
+    date_from: str,
+    date_to: str,
+    warehouse_ids: Optional[List[str]] = None,
+    formats: Optional[List[str]] = None,
+) -> Dict[str, object]:
+    files = asyncio.run(
+        _export_actions(
+            company_id,
+            date.fromisoformat(date_from),
+            date.fromisoformat(date_to),
+            warehouse_ids,
+            [ExportFormat(value) for value in formats or []],
+        ),
+    )
+    return {"company_id": company_id, "files": files}
+
+
+async def _maintain_report_partitions() -> Dict[str, List[str]]:
+    table = Report.__tablename__
+    current = month_start(datetime.now(timezone.utc).date())
+    engine = create_task_engine()
+    try:
+        async with session_scope(engine) as session:
+            await create_default_partition(session, table)
+            created = await create_monthly_partitions(
+                session, table, current, settings.report_partitions_ahead + 1,
+            )
+            partitions = await list_partitions(session, table)
+
+        archived = []
+        if settings.report_retention_months > 0:
+            cutoff = add_months(current, -settings.report_retention_months)
+            for name in partitions:
+                month = partition_month(name)
+                if not month or month >= cutoff:
+                    continue
+
+                await archive_report_partition(engine, name)
+                async with session_scope(engine) as session:
+                    await detach_partition(session, table, name)
+                    await drop_partition(session, name)
+
+                archived.append(name)
+
+        return {"created": created, "archived": archived}
+    finally:
+        await engine.dispose()
+
+
+@celery.task(name="reports.maintain_report_partitions")
+def maintain_report_partitions_task() -> Dict[str, List[str]]:
+    return asyncio.run(_maintain_report_partitions())
+
+
+@retry_on_serialization_failure()
+async def _reconcile_entity(
+    engine: AsyncEngine, entity: CounterEntity,
+) -> Dict[str, int]:
+    async with session_scope(engine) as session:
+        return await RepoCounters(session).reconcile(entity)
+
+
+async def _reconcile_counters() -> Dict[str, Dict[str, int]]:
+    engine = create_task_engine()
+    try:
+        return {
+            entity.value: await _reconcile_entity(engine, entity)
+            for entity in CounterEntity
+        }
+    finally:
+        await engine.dispose()
+
+
+@celery.task(name="counters.reconcile")
+def reconcile_counters_task() -> Dict[str, Dict[str, int]]:
+    return asyncio.run(_reconcile_counters())
+
+
+async def _plan_slotting(
+    warehouse_id: str,
+    days: Optional[int],
+    dock: Optional[List[float]],
+) -> Dict[str, object]:
+    engine = create_task_engine()
+    try:
+        async with session_scope(engine, READ_SNAPSHOT) as session:
+            plan = await SlottingService(
+                session,
+                RepoStorage(session),
+                ReportService(session, RepoWarehouse(session)),
+            ).plan(warehouse_id, days, dock)
+
+        return plan.model_dump(mode="json")
+    finally:
+        await engine.dispose()
+
+
+@celery.task(name="slotting.plan")
+def plan_slotting_task(
+    company_id: str,
+    warehouse_id: str,
+    days: Optional[int] = None,
+    dock: Optional[List[float]] = None,
+) -> Dict[str, object]:
+    plan = asyncio.run(_plan_slotting(warehouse_id, days, dock))
+    return {"company_id": company_id, "plan": plan}
@@ -2,12 +2,14 @@ from typing import Annotated
 
 from fastapi import Depends
 
+from src.backend.core.enums import AccessLevel
 from src.backend.core.exc.exceptions.exceptions import NotFoundError
 from src.backend.core.utils.dto_refactor import to_dto
-from src.backend.models.users import Users
 from src.backend.repos.users import UsersReposDep
 from src.backend.schemes.employee import EmployeeResponseDTO
 from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.auth.principal import Principal
+from src.backend.services.permissions.service import PermissionServiceDep
 
 __all__ = ("UserDTO",
            "CEODep",
@@ -29,10 +31,10 @@ async def get_user_dto(
 async def get_ceo_user(
         user: AuthUserDep,
         company_id: str,
-        user_repo: UsersReposDep,
-) -> Users:
-    company = await user_repo.get_by_id(company_id)
-    if (not company) or (company.owner_id != user.uuid):
+        permission_service: PermissionServiceDep,
+) -> Principal:
+    permissions = await permission_service.get_map(user.uuid)
+    if not permissions.owns(company_id):
         raise NotFoundError(f"User {user.uuid} not found")
 
     return user
@@ -42,13 +44,14 @@ async def get_regional_manager(
         user: AuthUserDep,
         company_id: str,
         warehouse_id: str,
-        user_repo: UsersReposDep,
-) -> Users:
-    access = await user_repo.get_user_access(user.uuid, warehouse_id)
-    if (access.access_level != "regional_manager") or (not access):
+        permission_service: PermissionServiceDep,
+) -> Principal:
+    permissions = await permission_service.get_map(user.uuid)
+    level = permissions.level(warehouse_id)
+    if level != AccessLevel.regional_manager:
         raise NotFoundError(f"User {user.uuid} not found")
 
-    if user.company_id != company_id:
+    if not permissions.has_level(company_id, warehouse_id, (level,)):
         raise NotFoundError(
             f"User {user.uuid} not lead in company {company_id}",
         )
@@ -56,5 +59,5 @@ async def get_regional_manager(
     return user
 
 UserDTO = Annotated[EmployeeResponseDTO, Depends(get_user_dto)]
-CEODep = Annotated[Users, Depends(get_ceo_user)]
-RegManagerDep = Annotated[Users, Depends(get_regional_manager)]
+CEODep = Annotated[Principal, Depends(get_ceo_user)]
+RegManagerDep = Annotated[Principal, Depends(get_regional_manager)]
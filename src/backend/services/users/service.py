@@ -11,12 +11,14 @@ from phonenumbers import (format_number,
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.core.database.async_engine import SessionDep
+from src.backend.core.database.transactions import after_commit
 from src.backend.core.enums import AccessLevel
 from src.backend.core.exc.exceptions.exceptions import (BadRequestError,
                                                         ForbiddenError,
                                                         NotFoundError,
                                                         UniqueViolationError)
 from src.backend.core.utils.dto_refactor import to_dto
+from src.backend.core.utils.jwt import revoke_subject
 from src.backend.core.utils.redis import get_redis_client
 from src.backend.models.access_level import UserAccess
 from src.backend.models.users import Users
@@ -28,8 +30,10 @@ from src.backend.schemes.accessuserlevel import AccessUserLevelDTO
 from src.backend.schemes.employee import (EmployeeCreateDTO,
                                           EmployeeResponseDTO,
                                           EmployeeUpdateDTO)
+from src.backend.services.auth.service import forget_unknown_number
 from src.backend.services.notifications.service import (NotificationService,
                                                         NotificationServiceDep)
+from src.backend.services.permissions.service import invalidate_permissions
 from src.backend.services.users.deps import CEODep, RegManagerDep
 
 __all__ = ("UserService",
@@ -108,6 +112,7 @@ class UserService:
         )
 
         user = await self.user_repo.insert(user)
+        forget_unknown_number(self.session, user.number)
 
         if access_level != AccessLevel.CEO:
             access = UserAccess(
@@ -117,12 +122,15 @@ class UserService:
             )
             self.session.add(access)
 
+        previous_owner_id = None
         if access_level == AccessLevel.CEO:
+            previous_owner_id = company.owner_id
             company.owner_id = user.uuid
 
         await self.session.flush()
         await self.session.refresh(user)
         await self.session.refresh(company)
+        invalidate_permissions(self.session, previous_owner_id, user.uuid)
 
         if user.firebase_token:
             await self.notification_service.send_notification(
@@ -146,6 +154,7 @@ class UserService:
         if (user.company_id != company_id) or (not user):
             raise NotFoundError(f"User {user_id} not found")
 
+        cached_number = user.number
         if data.name:
             user.name = data.name
 
@@ -154,19 +163,20 @@ class UserService:
                 raise UniqueViolationError(F"{data.number} exists")
 
             user.number = str(data.number)
+            forget_unknown_number(self.session, user.number)
 
         if data.company_id:
             company = await self.company_repo.get_by_id(company_id)
             if not company:
                 raise NotFoundError(f"Company {company_id} not found")
 
-            user.company_id = company.company_id
+            await self.user_repo.move(user, company.company_id)
 
         await self.session.flush()
         await self.session.refresh(user)
 
         async with self.redis_client as redis:
-            await redis.delete(f"user:{user_id}")
+            await redis.delete(f"user:{cached_number}")
 
     async def delete_user(
             self,
@@ -180,6 +190,18 @@ class UserService:
             raise NotFoundError(f"User {user_id} not found")
 
         await self.user_repo.delete(user_id)
+        invalidate_permissions(self.session, user_id)
+
+        number, revoked_at = user.number, datetime.now(timezone.utc)
+
+        # Токены отзываются только после commit: при откате удаления
+        # пользователь не должен потерять доступ
+        async def revoke() -> None:
+            async with get_redis_client() as redis:
+                await revoke_subject(number, redis, revoked_at)
+                await redis.delete(f"user:{number}")
+
+        after_commit(self.session, revoke)
         return True
 
     async def set_user_access(
@@ -207,10 +229,9 @@ class UserService:
 
         self.session.add(access)
         await self.session.flush()
+        invalidate_permissions(self.session, user_id)
         async with self.redis_client as redis:
-            await redis.delete(
-                f"access:{user_id}:{company_id}:{access.warehouse_id}")
-            await redis.delete(f"user:{user_id}")
+            await redis.delete(f"user:{user.number}")
 
     async def get_user_access(self, user_id: str) -> List[UserAccess] | None:
         user = await self.user_repo.get_by_id(user_id)
@@ -227,15 +248,19 @@ class UserService:
         return user
 
     async def get_all_users(
-            self, company_id: str, limit: int, offset: int,
-    ) -> Tuple[List[Users], int]:
-        users, count = await self.user_repo.get_all(
-            company_id, limit=limit, offset=offset,
+            self,
+            company_id: str,
+            limit: int,
+            cursor: Optional[str] = None,
+            with_total: bool = False,
+    ) -> Tuple[List[Users], Optional[str], Optional[int]]:
+        users, next_cursor, total = await self.user_repo.get_all(
+            company_id, limit=limit, cursor=cursor, with_total=with_total,
         )
-        if count == 0:
+        if not users and cursor is None:
             raise NotFoundError("No users in company found")
 
-        return users, count
+        return users, next_cursor, total
 
 
 async def get_users_service(
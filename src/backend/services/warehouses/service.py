@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Annotated, List, Tuple, Union
+from typing import Annotated, List, Optional, Tuple, Union
 from uuid import uuid4
 
 from fastapi import Depends
@@ -16,6 +16,7 @@ from src.backend.repos.warehouses import RepoWarehouse, WarehouseRepoDep
 from src.backend.schemes.storage_objects import (StorageModelDTO,
                                                  StorageResponseDTO)
 from src.backend.services.auth.deps import AuthUserDep
+from src.backend.services.permissions.service import invalidate_permissions
 from src.backend.services.users.deps import CEODep, RegManagerDep
 
 __all__ = ("WarehouseService",
@@ -57,20 +58,21 @@ class WarehouseService:
         user: CEODep,
         company_id: str,
         limit: int,
-        offset: int,
-    ) -> Tuple[List[Warehouse], int]:
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Tuple[List[Warehouse], Optional[str], Optional[int]]:
         company = await self.company_repo.get_by_id(company_id)
         if (company.owner_id != user.uuid) or (not company):
             raise NotFoundError(f"Company {company_id} not found")
 
-        warehouses, count = await self.warehouse_repo.get_all(
-            company_id, limit, offset,
+        warehouses, next_cursor, total = await self.warehouse_repo.get_all(
+            company_id, limit, cursor, with_total,
         )
 
-        if count == 0:
+        if not warehouses and cursor is None:
             raise NotFoundError("No warehouses found")
 
-        return warehouses, count
+        return warehouses, next_cursor, total
 
     async def create_warehouse(
         self,
@@ -92,6 +94,7 @@ class WarehouseService:
             created_at=datetime.now(timezone.utc),
         )
         warehouse = await self.warehouse_repo.insert(warehouse)
+        invalidate_permissions(self.session, company.owner_id)
 
         return to_dto(warehouse, StorageResponseDTO)
 
@@ -101,10 +104,17 @@ class WarehouseService:
         company_id: str,
         warehouse_id: str,
     ) -> bool:
+        # доступы удаляются вместе со складом, собираем их заранее
+        user_ids = await self.user_repo.get_warehouse_user_ids(warehouse_id)
         warehouse = await self.warehouse_repo.delete(warehouse_id)
         if not warehouse:
             raise NotFoundError(f"Warehouse {warehouse_id} not found")
 
+        company = await self.company_repo.get_by_id(company_id)
+        invalidate_permissions(
+            self.session, company.owner_id if company else None, *user_ids,
+        )
+
         return True
 
     async def update_warehouse(
@@ -0,0 +1,131 @@
+import random
+import time
+from typing import Callable, List
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel
+from sqlalchemy.engine import result_tuple
+
+from src.backend.core.enums import ProductType
+from src.backend.core.utils.dto_refactor import (rows_to_dto, to_dto,
+                                                 to_dto_list)
+from src.backend.models.products import Products
+from src.backend.schemes.item_list import ProductResponseDTO
+
+# Конвертация 10k товаров в ProductResponseDTO: старый to_dto
+# (dict из __dict__ + валидация по одному), to_dto с картой полей,
+# to_dto_list одним TypeAdapter и строки select(*dto_columns(...))
+# без ORM-объектов. Запуск: python -m src.benchmarks.dto
+
+SIZE = 10000
+ROUNDS = 5
+
+
+# Старый to_dto не принимал UUID в str-поля DTO, приведение к str
+# делал вызывающий код
+def legacy_to_dto(model: Products, dto: type[BaseModel]) -> BaseModel:
+    return dto(**{k: str(v) if isinstance(v, UUID) else v
+                  for k, v, in model.__dict__.items()
+                  if not k.startswith("_")})
+
+
+# Маперы моделей настраиваются только вместе со всем приложением,
+# поэтому объекты собираются так же, как их собирает загрузчик ORM:
+# состояние без __init__ и значения колонок прямо в __dict__
+def new_product(**values) -> Products:
+    product = Products._sa_class_manager.new_instance()
+    product.__dict__.update(values)
+    return product
+
+
+def build_products() -> List[Products]:
+    company_id = uuid4()
+    return [
+        new_product(
+            item_id=uuid4(),
+            company_id=company_id,
+            name=f"Product {index}",
+            cost=round(random.uniform(1, 1000), 2),
+            product_link=None,
+            article=f"ART-{index:06d}",
+            barcode=f"{4600000000000 + index}",
+            item_type=ProductType.box,
+            dekart_parameters=[
+                random.uniform(0.1, 2) for _ in range(3)
+            ],
+        )
+        for index in range(SIZE)
+    ]
+
+
+def build_rows(products: List[Products]) -> list:
+    fields = list(ProductResponseDTO.model_fields)
+    make_row = result_tuple(fields)
+    return [
+        make_row([
+            str(value) if name in ("item_id", "company_id") else value
+            for name, value in zip(
+                fields, (product.__dict__.get(field) for field in fields),
+            )
+        ])
+        for product in products
+    ]
+
+
+def measure(func: Callable[[], object]) -> float:
+    func()
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+
+    return best
+
+
+def main() -> None:
+    products = build_products()
+    rows = build_rows(products)
+
+    cases = (
+        (
+            "legacy to_dto (per item)",
+            lambda: [
+                legacy_to_dto(
+                    product, ProductResponseDTO,
+                ) for product in products
+            ],
+        ),
+        (
+            "to_dto (field map)",
+            lambda: [
+                to_dto(product, ProductResponseDTO) for product in products
+            ],
+        ),
+        (
+            "to_dto_list (TypeAdapter)",
+            lambda: to_dto_list(products, ProductResponseDTO),
+        ),
+        (
+            "rows_to_dto (no ORM)",
+            lambda: rows_to_dto(rows, ProductResponseDTO),
+        ),
+    )
+
+    baseline = None
+    for name, func in cases:
+        try:
+            elapsed = measure(func)
+        except Exception as e:
+            print(f"{name:<28} failed: {e.__class__.__name__}: {e}")
+            continue
+
+        baseline = baseline or elapsed
+        print(
+            f"{name:<28} {elapsed * 1e3:8.1f}ms "
+            f"{elapsed / SIZE * 1e6:6.2f}us/item x{baseline / elapsed:.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import asyncio
+import sys
+import timeit
+from typing import Callable, Dict
+from uuid import uuid4
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.dialects import postgresql
+
+from src.backend.models.products import Products
+from src.backend.models.storage import Storages
+from src.backend.models.users import Users
+
+# Накладные расходы горячих lookup-запросов до выполнения в БД:
+# сборка select() + ключ кеша против lambda_stmt. С флагом --db
+# дополнительно гоняет запросы через сессию к settings.db_url.
+# Запуск: python -m src.benchmarks.lookups [--db]
+
+NUMBER = 20000
+DB_NUMBER = 2000
+DIALECT = postgresql.asyncpg.dialect()
+
+
+def plain_lookups() -> Dict[str, Callable]:
+    return {
+        "storage by id": lambda value: select(Storages).filter(
+            Storages.storage_id == value,
+        ),
+        "product by barcode": lambda value: select(Products).filter(
+            Products.barcode == value,
+        ),
+        "user by number": lambda value: select(Users).filter(
+            Users.number == value,
+        ),
+    }
+
+
+def lambda_lookups() -> Dict[str, Callable]:
+    return {
+        "storage by id": lambda value: lambda_stmt(
+            lambda: select(Storages).filter(Storages.storage_id == value),
+        ),
+        "product by barcode": lambda value: lambda_stmt(
+            lambda: select(Products).filter(Products.barcode == value),
+        ),
+        "user by number": lambda value: lambda_stmt(
+            lambda: select(Users).filter(Users.number == value),
+        ),
+    }
+
+
+# На каждом execute движок строит statement и считает его cache key,
+# компиляция при попадании в кеш не повторяется
+def statement_overhead(build: Callable) -> float:
+    build(str(uuid4()))._generate_cache_key()
+    return timeit.timeit(
+        lambda: build(str(uuid4()))._generate_cache_key(),
+        number=NUMBER,
+    ) / NUMBER
+
+
+def compile_overhead(build: Callable) -> float:
+    return timeit.timeit(
+        lambda: build(str(uuid4())).compile(dialect=DIALECT),
+        number=NUMBER // 10,
+    ) / (NUMBER // 10)
+
+
+async def db_overhead(build: Callable) -> float:
+    from src.backend.core.database.async_engine import (engine,
+                                                        session_scope)
+
+    async with session_scope() as session:
+        await session.scalar(build(str(uuid4())))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(DB_NUMBER):
+            await session.scalar(build(str(uuid4())))
+
+        elapsed = loop.time() - started
+
+    await engine.dispose()
+    return elapsed / DB_NUMBER
+
+
+def report(title: str, old: float, new: float) -> None:
+    print(
+        f"{title:<24} select={old * 1e6:8.2f}us "
+        f"lambda={new * 1e6:8.2f}us x{old / new:.2f}",
+    )
+
+
+def main() -> None:
+    plain, lambdas = plain_lookups(), lambda_lookups()
+
+    print("statement + cache key")
+    for name in plain:
+        report(
+            name,
+            statement_overhead(plain[name]),
+            statement_overhead(lambdas[name]),
+        )
+
+    print("full compile (cache miss)")
+    for name in plain:
+        report(
+            name,
+            compile_overhead(plain[name]),
+            compile_overhead(lambdas[name]),
+        )
+
+    if "--db" in sys.argv:
+        print("round trip via session")
+        for name in plain:
+            report(
+                name,
+                asyncio.run(db_overhead(plain[name])),
+                asyncio.run(db_overhead(lambdas[name])),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from src.backend.core.utils.routing import (distance_matrix, plan_route,
+                                            rect_centers)
+
+# Маршрут по 200 стеллажам (заказ на 200 строк, каждая на своём
+# стеллаже): только nearest neighbour против nearest neighbour + 2-opt.
+# Цель - меньше 50ms на заказ. Запуск: python -m src.benchmarks.pick_route
+
+SIZE = 200
+ROUNDS = 20
+
+
+def build_storages() -> List[List[float]]:
+    storages = []
+    for _ in range(SIZE):
+        x, y = random.uniform(0, 200), random.uniform(0, 100)
+        storages.append([x, y, x + 2, y + 1])
+
+    return storages
+
+
+def main() -> None:
+    points = rect_centers(build_storages())
+    nodes = np.vstack(((0.0, 0.0), points))
+    dist = distance_matrix(nodes)
+
+    plan_route(points)
+    cases = (
+        ("nearest neighbour", dict(max_rounds=0)),
+        ("nearest neighbour + 2-opt", dict()),
+    )
+    for name, options in cases:
+        best, length = float("inf"), 0.0
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            order, length = plan_route(points, **options)
+            best = min(best, time.perf_counter() - started)
+
+        path = np.concatenate(([0], order + 1))
+        assert abs(dist[path[:-1], path[1:]].sum() - length) < 1e-6
+        print(f"{name:<28} {best * 1e3:8.2f}ms length {length:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
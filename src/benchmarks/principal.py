@@ -0,0 +1,69 @@
+import json
+import timeit
+from uuid import uuid4
+
+from src.backend.core.enums import AccessLevel
+from src.backend.models.users import Users
+from src.backend.services.auth.principal import Principal
+
+# Сравнение старого пути кеша пользователя (json + сборка ORM Users)
+# с упакованным Principal. Запуск: python -m src.benchmarks.principal
+
+COLUMNS = [column.name for column in Users.__table__.columns]
+NUMBER = 100000
+
+
+def build_principal() -> Principal:
+    return Principal(
+        uuid=uuid4(),
+        number="+79990001122",
+        company_id=uuid4(),
+        access={uuid4(): AccessLevel.employee for _ in range(5)},
+    )
+
+
+def old_payload(principal: Principal) -> str:
+    user = Users(
+        uuid=principal.uuid,
+        name="Employee",
+        number=principal.number,
+        company_id=principal.company_id,
+    )
+    return json.dumps(
+        {column: getattr(user, column) for column in COLUMNS},
+        default=str,
+    )
+
+
+def main() -> None:
+    principal = build_principal()
+    cached_json = old_payload(principal)
+    cached_bytes = principal.pack()
+
+    old_read = timeit.timeit(
+        lambda: Users(**json.loads(cached_json)), number=NUMBER,
+    )
+    new_read = timeit.timeit(
+        lambda: Principal.unpack(cached_bytes), number=NUMBER,
+    )
+    old_write = timeit.timeit(
+        lambda: old_payload(principal), number=NUMBER,
+    )
+    new_write = timeit.timeit(principal.pack, number=NUMBER)
+
+    print(
+        f"payload size: json={len(cached_json)}B "
+        f"packed={len(cached_bytes)}B",
+    )
+    for name, old, new in (
+        ("read (cache hit)", old_read, new_read),
+        ("write (cache miss)", old_write, new_write),
+    ):
+        print(
+            f"{name}: old={old / NUMBER * 1e6:.2f}us "
+            f"new={new / NUMBER * 1e6:.2f}us x{old / new:.1f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,59 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
 from fastapi import FastAPI
 
-app = FastAPI()
+from src.backend.core.config import settings
+from src.backend.core.database.async_engine import session_scope
+from src.backend.core.database.partitions import create_monthly_partitions
+from src.backend.core.exc.exceptions.exceptions import HTTPError
+from src.backend.core.utils.date import date_time
+from src.backend.core.utils.jwt import (start_revocation_sync,
+                                        stop_revocation_sync)
+from src.backend.models.report import Report
+from src.backend.routes import (auth, metrics, picking, products, reports,
+                                slotting, storages)
+from src.backend.services.products.scan import barcode_cache
+from src.backend.services.report_service import action_buffer
+
+
+# Партиции на ближайшие месяцы; основную работу делает задача
+# maintain_report_partitions, поэтому недоступная БД или ещё не
+# партиционированная reports не должны мешать старту
+async def ensure_report_partitions() -> None:
+    try:
+        async with session_scope() as session:
+            await create_monthly_partitions(
+                session,
+                Report.__tablename__,
+                datetime.now(timezone.utc).date(),
+                settings.report_partitions_ahead + 1,
+            )
+    except Exception as e:
+        print(f"{date_time(datetime.now())}.Report partitions: {e}")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await ensure_report_partitions()
+
+    action_buffer.start()
+    start_revocation_sync()
+    barcode_cache.start()
+    await barcode_cache.wait_ready(settings.scan_warm_timeout)
+    yield
+    await barcode_cache.stop()
+    await stop_revocation_sync()
+    await action_buffer.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_exception_handler(HTTPError, HTTPError.handler)
+app.include_router(auth.router)
+app.include_router(reports.router)
+app.include_router(reports.company_router)
+app.include_router(products.router)
+app.include_router(storages.router)
+app.include_router(picking.router)
+app.include_router(slotting.router)
+app.include_router(metrics.router)
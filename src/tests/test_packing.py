@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.backend.core.utils.packing import (fit_counts, shelf_dimensions,
+                                            unit_volume)
+
+
+def test_cubes_fill_shelf_grid():
+    fits = fit_counts([5, 5, 5], shelf_dimensions([[10, 10, 10]]))
+
+    assert fits.tolist() == [8]
+
+
+def test_rotation_lets_item_fit():
+    dims = shelf_dimensions([[10, 4, 4]])
+
+    assert fit_counts([4, 10, 4], dims).tolist() == [1]
+    assert fit_counts([4, 10, 4], dims, rotate=False).tolist() == [0]
+
+
+def test_occupied_space_lowers_free_height():
+    fits = fit_counts(
+        [5, 5, 5],
+        shelf_dimensions([[10, 10, 10]]),
+        occupied=np.array([500.0]),
+        space=np.array([1000.0]),
+    )
+
+    assert fits.tolist() == [4]
+
+
+def test_shelf_without_dimensions_uses_free_volume():
+    fits = fit_counts(
+        [5, 5, 5],
+        shelf_dimensions([None]),
+        occupied=np.array([0.0]),
+        space=np.array([600.0]),
+    )
+
+    assert fits.tolist() == [4]
+
+
+def test_item_without_dimensions_never_fits():
+    dims = shelf_dimensions([[10, 10, 10]])
+
+    assert fit_counts([5, 5], dims).tolist() == [0]
+    assert fit_counts([0, 5, 5], dims).tolist() == [0]
+    assert unit_volume([5, 5]) == 0.0
+    assert unit_volume([2, 3, 4]) == 24.0
@@ -0,0 +1,24 @@
+from uuid import uuid4
+
+import pytest
+
+from src.backend.core.exc.exceptions.exceptions import BadRequestError
+from src.backend.core.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    key = uuid4()
+    cursor = encode_cursor(["name", 3, key])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 3) == ("name", 3, str(key))
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(BadRequestError):
+        decode_cursor("not a cursor", 1)
+
+
+def test_cursor_with_wrong_size_is_rejected():
+    with pytest.raises(BadRequestError):
+        decode_cursor(encode_cursor([1, 2]), 1)
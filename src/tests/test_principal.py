@@ -0,0 +1,32 @@
+from uuid import uuid4
+
+import pytest
+
+from src.backend.core.enums import AccessLevel
+from src.backend.services.auth.principal import Principal
+
+
+def test_pack_round_trip():
+    warehouse = uuid4()
+    principal = Principal(
+        uuid=uuid4(),
+        number="+79990001122",
+        company_id=uuid4(),
+        access={warehouse: AccessLevel.regional_manager},
+    )
+
+    restored = Principal.unpack(principal.pack())
+
+    assert restored.uuid == principal.uuid
+    assert restored.number == principal.number
+    assert restored.company_id == principal.company_id
+    assert restored.access == principal.access
+    assert restored.level(str(warehouse)) == AccessLevel.regional_manager
+
+
+def test_unpack_rejects_other_versions():
+    data = bytearray(Principal(uuid4(), "1", uuid4()).pack())
+    data[0] += 1
+
+    with pytest.raises(ValueError):
+        Principal.unpack(bytes(data))
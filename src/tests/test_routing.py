@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.backend.core.utils.routing import distance_matrix, plan_route
+
+
+def test_points_on_a_line_are_visited_in_order():
+    order, length = plan_route(np.array([[3, 0], [1, 0], [4, 0], [2, 0]]))
+
+    assert order.tolist() == [1, 3, 0, 2]
+    assert length == 4.0
+
+
+def test_empty_route():
+    order, length = plan_route(np.empty((0, 2)))
+
+    assert order.tolist() == []
+    assert length == 0.0
+
+
+def test_route_visits_every_point_once():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 100, (200, 2))
+    start = (50.0, 0.0)
+    order, length = plan_route(points, start=start)
+
+    assert sorted(order.tolist()) == list(range(len(points)))
+    path = np.vstack((start, points[order]))
+    assert np.isclose(length, np.abs(np.diff(path, axis=0)).sum())
+
+
+def test_distance_matrix_metrics():
+    points = np.array([[0.0, 0.0], [3.0, 4.0]])
+
+    assert distance_matrix(points)[0, 1] == 7.0
+    assert distance_matrix(points, "euclidean")[0, 1] == 5.0
@@ -0,0 +1,128 @@
+from collections import defaultdict
+
+import numpy as np
+
+from src.backend.core.utils.slotting import plan_slotting
+
+
+def apply_moves(placements, moves):
+    stock = defaultdict(int)
+    for item, shelf, quantity in placements:
+        stock[(item, shelf)] += quantity
+
+    for item, source, sink, quantity in moves:
+        assert quantity > 0
+        assert stock[(item, source)] >= quantity
+        stock[(item, source)] -= quantity
+        stock[(item, sink)] += quantity
+
+    return stock
+
+
+def shelf_loads(stock, unit_volume, shelves):
+    loads = np.zeros(shelves)
+    for (item, shelf), quantity in stock.items():
+        if unit_volume[item] > 0:
+            loads[shelf] += quantity * unit_volume[item]
+
+    return loads
+
+
+def limits(placements, unit_volume, free):
+    limit = np.clip(np.asarray(free, dtype=float), 0, None)
+    for item, shelf, quantity in placements:
+        if unit_volume[item] > 0:
+            limit[shelf] += quantity * unit_volume[item]
+
+    return limit
+
+
+def test_empty_placements():
+    plan = plan_slotting([1.0], [1.0], [], [1.0], [10.0])
+
+    assert plan.moves == []
+    assert plan.unplaced.tolist() == [0]
+    assert plan.cost_before == plan.cost_after == 0.0
+
+
+def test_fast_mover_goes_to_nearest_shelf():
+    # товар 0 подбирают часто, но он лежит на дальней полке
+    placements = [(0, 1, 2), (1, 0, 2)]
+    plan = plan_slotting(
+        velocity=[100.0, 1.0],
+        unit_volume=[1.0, 1.0],
+        placements=placements,
+        distance=[1.0, 10.0],
+        free=[0.0, 0.0],
+    )
+
+    stock = apply_moves(placements, plan.moves)
+    assert stock[(0, 0)] == 2
+    assert stock[(1, 1)] == 2
+    assert plan.cost_after < plan.cost_before
+    assert plan.unplaced.tolist() == [0, 0]
+
+
+def test_items_without_volume_stay_in_place():
+    placements = [(0, 1, 3)]
+    plan = plan_slotting([5.0], [0.0], placements, [1.0, 2.0], [10.0, 0])
+
+    assert plan.moves == []
+
+
+def test_unplaced_remainder_keeps_its_space():
+    unit_volume = [2.5, 2.0, 1.5, 2.5]
+    placements = [(0, 0, 1), (1, 1, 1), (2, 0, 1)]
+    free = [0.0, 1.0]
+    plan = plan_slotting(
+        velocity=[1.0, 1.0, 1.0, 1.0],
+        unit_volume=unit_volume,
+        placements=placements,
+        distance=[1.0, 2.0],
+        free=free,
+    )
+
+    stock = apply_moves(placements, plan.moves)
+    loads = shelf_loads(stock, unit_volume, 2)
+    assert (loads <= limits(placements, unit_volume, free) + 1e-9).all()
+
+
+def check_random_plan(rng):
+    products = int(rng.integers(1, 6))
+    shelves = int(rng.integers(1, 5))
+    unit_volume = rng.choice([0.0, 0.5, 1.0, 1.5, 2.0, 2.5], products)
+    placements = [
+        (
+            int(rng.integers(products)),
+            int(rng.integers(shelves)),
+            int(rng.integers(1, 4)),
+        )
+        for _ in range(int(rng.integers(1, 7)))
+    ]
+    free = rng.uniform(-1, 3, shelves).round(1)
+
+    plan = plan_slotting(
+        velocity=rng.uniform(0, 10, products),
+        unit_volume=unit_volume,
+        placements=placements,
+        distance=rng.uniform(0, 20, shelves),
+        free=free,
+    )
+
+    stock = apply_moves(placements, plan.moves)
+    loads = shelf_loads(stock, unit_volume, shelves)
+    assert (loads <= limits(placements, unit_volume, free) + 1e-9).all()
+
+    totals = defaultdict(int)
+    for item, _, quantity in placements:
+        totals[item] += quantity
+    for item, total in totals.items():
+        assert sum(
+            quantity for (other, _), quantity in stock.items()
+            if other == item
+        ) == total
+
+
+def test_plan_never_overfills_shelves():
+    for seed in range(200):
+        check_random_plan(np.random.default_rng(seed))
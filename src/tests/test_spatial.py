@@ -0,0 +1,36 @@
+from src.backend.core.utils.spatial import GridIndex, normalize_boxes
+
+
+def make_index():
+    return GridIndex(
+        ["a", "b", "c", "wide"],
+        [[0, 0, 1, 1], [2, 0, 3, 1], [5, 5, 4, 4], [0, 10, 100, 20]],
+    )
+
+
+def test_normalize_boxes_orders_corners():
+    assert normalize_boxes([[5, 5, 4, 4]]).tolist() == [[4, 4, 5, 5]]
+
+
+def test_point_and_region_queries():
+    index = make_index()
+
+    assert index.at_point(0.5, 0.5).tolist() == [0]
+    assert index.at_point(4.5, 4.5).tolist() == [2]
+    assert index.at_point(10, 5).tolist() == []
+    assert index.in_region(0, 0, 3, 1).tolist() == [0, 1]
+    assert index.in_region(0, 0, 2.5, 1, contained=True).tolist() == [0]
+
+
+def test_boxes_spanning_many_cells_are_still_found():
+    index = make_index()
+
+    assert index.large.tolist() == [3]
+    assert index.at_point(50, 15).tolist() == [3]
+
+
+def test_nearest_sorted_by_distance():
+    closest, distances = make_index().nearest(2.5, 3, limit=2)
+
+    assert closest.tolist() == [2, 1]
+    assert distances[0] <= distances[1]